@@ -31,7 +31,7 @@ contract Ledger {
     ILido public LIDO;
 
     // vKSM precompile
-    IERC20 internal VKSM;
+    IERC20 public VKSM;
 
     // controller for sending xcm messages to relay chain
     IController internal CONTROLLER;
@@ -155,9 +155,13 @@ contract Ledger {
     }
 
     /**
-    * @notice Refresh allowances for ledger
+    * @notice Refresh allowances for ledger, allowed to call only by lido contract or ROLE_LEDGER_MANAGER
     */
-    function refreshAllowances() external auth(ROLE_LEDGER_MANAGER) {
+    function refreshAllowances() external {
+        require(
+            msg.sender == address(LIDO) || IAuthManager(LIDO.AUTH_MANAGER()).has(ROLE_LEDGER_MANAGER, msg.sender),
+            "LEDGER: UNAUTHOROZED"
+        );
         _refreshAllowances();
     }
 
@@ -295,6 +299,7 @@ contract Ledger {
         if (relayFreeBalance > 0) {
             CONTROLLER.transferToParachain(relayFreeBalance);
             transferDownwardBalance += relayFreeBalance;
+            LIDO.reportDownwardTransfer(relayFreeBalance);
         }
 
         cachedTotalBalance = _report.stashBalance;
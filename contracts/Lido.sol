@@ -5,9 +5,11 @@ pragma abicoder v2;
 import "@openzeppelin/contracts/token/ERC20/IERC20.sol";
 import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@openzeppelin/contracts/proxy/utils/Initializable.sol";
+import "@openzeppelin/contracts/utils/StorageSlot.sol";
 
 import "../interfaces/IOracleMaster.sol";
 import "../interfaces/ILedgerFactory.sol";
+import "../interfaces/ILedgerBeacon.sol";
 import "../interfaces/ILedger.sol";
 import "../interfaces/IController.sol";
 import "../interfaces/IAuthManager.sol";
@@ -19,6 +21,22 @@ import "./stKSM.sol";
 contract Lido is stKSM, Initializable {
     using SafeCast for uint256;
 
+    // Ledger registry and accounting record of two slots: stake and borrow read by every stakes flush share
+    // the first one, the second one is read only by registry changes, ledger callbacks and for ledgers
+    // which stake is increased by flush, stash account is kept in `ledgerStash`
+    struct LedgerData {
+        // this is the active stake on the ledger = [borrow] - unbonded funds - free funds
+        uint128 stake;
+        // this is the total amount of funds in the ledger = active stake + unbonded funds + free funds
+        uint128 borrow;
+        // index in `enabledLedgers` or `disabledLedgers` depending on LEDGER_ENABLED flag
+        uint32 index;
+        // LEDGER_EXISTS, LEDGER_ENABLED and LEDGER_PAUSED bits
+        uint8 flags;
+        // mirror of Ledger.transferDownwardBalance: funds sent from relay chain, but not returned to Lido yet
+        uint128 pendingDownward;
+    }
+
     // Records a deposit made by a user
     event Deposited(address indexed sender, uint256 amount);
 
@@ -85,11 +103,11 @@ contract Lido is stKSM, Initializable {
     // this is the amount of funds that should be sent to the WITHDRAWAL contract
     uint256 public bufferedRedeems;
 
-    // this is the active stake on the ledger = [ledgerBorrow] - unbonded funds - free funds
-    mapping(address => uint256) public ledgerStake;
+    // DEPRECATED: ledger active stake, moved to `ledgerData`, see migrateLedgers
+    mapping(address => uint256) private ledgerStakeDeprecated;
 
-    // this is the total amount of funds in the ledger = active stake + unbonded funds + free funds
-    mapping(address => uint256) public ledgerBorrow;
+    // DEPRECATED: ledger total funds, moved to `ledgerData`, see migrateLedgers
+    mapping(address => uint256) private ledgerBorrowDeprecated;
 
     // Disabled ledgers
     address[] private disabledLedgers;
@@ -139,10 +157,10 @@ contract Lido is stKSM, Initializable {
     // Ledger address by stash account id
     mapping(bytes32 => address) private ledgerByStash;
 
-    // Map to check ledger existence by address
+    // DEPRECATED: ledger existence, moved to `ledgerData` flags
     mapping(address => bool) private ledgerByAddress;
 
-    // Map to check ledger paused to redeem state
+    // DEPRECATED: ledger paused to redeem state, moved to `ledgerData` flags
     mapping(address => bool) private pausedledgers;
 
     /* fee interest in basis points.
@@ -159,6 +177,17 @@ contract Lido is stKSM, Initializable {
     // Missing member index
     uint256 internal constant MEMBER_NOT_FOUND = type(uint256).max;
 
+    // LedgerData flags
+    uint8 internal constant LEDGER_EXISTS = 1;
+    uint8 internal constant LEDGER_ENABLED = 2;
+    uint8 internal constant LEDGER_PAUSED = 4;
+
+    // Current storage layout version, see migrateLedgers
+    uint256 internal constant STORAGE_VERSION = 1;
+
+    // EIP-1967 proxy admin slot, bytes32(uint256(keccak256("eip1967.proxy.admin")) - 1)
+    bytes32 internal constant PROXY_ADMIN_SLOT = 0xb53127684a568b3173ae13b9f8a6016e243e63b6e8ee1178d6a717850b5d6103;
+
     // Spec manager role
     bytes32 internal constant ROLE_SPEC_MANAGER = keccak256("ROLE_SPEC_MANAGER");
 
@@ -192,6 +221,18 @@ contract Lido is stKSM, Initializable {
     // Token decimals
     uint8 internal _decimals;
 
+    // Ledger address => registry and accounting record
+    mapping(address => LedgerData) internal ledgerData;
+
+    // Ledger address => relaychain stash account, kept out of `ledgerData` which is read by stakes flush
+    mapping(address => bytes32) internal ledgerStash;
+
+    // Incremented on every change of ledger set, order or status, allows clients to cache ledgers list
+    uint256 public ledgersVersion;
+
+    // Version of storage layout, deployments of previous versions are migrated once on upgrade
+    uint256 public storageVersion;
+
     // Allow function calls only from member with specific role
     modifier auth(bytes32 role) {
         require(IAuthManager(AUTH_MANAGER).has(role, msg.sender), "LIDO: UNAUTHORIZED");
@@ -289,6 +330,8 @@ contract Lido is stKSM, Initializable {
         IWithdrawal(WITHDRAWAL).setStKSM(address(this));
 
         MAX_ALLOWABLE_DIFFERENCE = _maxAllowableDifference;
+
+        storageVersion = STORAGE_VERSION;
     }
 
     /**
@@ -384,29 +427,64 @@ contract Lido is stKSM, Initializable {
     * @return Array of bytes32 relaychain stash accounts
     */
     function getStashAccounts() public view returns (bytes32[] memory) {
-        bytes32[] memory _stashes = new bytes32[](enabledLedgers.length + disabledLedgers.length);
+        address[] memory _ledgers = getLedgerAddresses();
+        bytes32[] memory _stashes = new bytes32[](_ledgers.length);
 
-        for (uint i = 0; i < enabledLedgers.length + disabledLedgers.length; i++) {
-            address ledgerAddr = i < enabledLedgers.length ?
-                enabledLedgers[i] : disabledLedgers[i - enabledLedgers.length];
-                
-            _stashes[i] = bytes32(ILedger(ledgerAddr).stashAccount());
+        for (uint i = 0; i < _ledgers.length; i++) {
+            _stashes[i] = ledgerStash[_ledgers[i]];
         }
 
         return _stashes;
     }
 
+    /**
+    * @notice Return page of ledgers in the same order as `getLedgerAddresses`
+    * @dev Clients can cache the list while `ledgersVersion` is the same, stake and borrow are not versioned
+    * @param _offset - index of the first ledger
+    * @param _limit - maximum number of returned ledgers
+    * @return version - ledgers version, pages with different versions must not be combined
+    * @return total - total number of ledgers
+    * @return ledgers - ledger address, stash account, stake, borrow and status flags
+    */
+    function getLedgers(uint256 _offset, uint256 _limit)
+        external
+        view
+        returns (
+            uint256 version,
+            uint256 total,
+            Types.LedgerInfo[] memory ledgers
+        )
+    {
+        uint256 enabledLength = enabledLedgers.length;
+        total = enabledLength + disabledLedgers.length;
+        uint256 end = (_offset >= total || _limit > total - _offset) ? total : _offset + _limit;
+        ledgers = new Types.LedgerInfo[](end > _offset ? end - _offset : 0);
+
+        for (uint256 i = 0; i < ledgers.length; ++i) {
+            uint256 index = _offset + i;
+            address ledgerAddr = index < enabledLength ?
+                enabledLedgers[index] : disabledLedgers[index - enabledLength];
+            LedgerData storage data = ledgerData[ledgerAddr];
+            ledgers[i] = Types.LedgerInfo(ledgerAddr, ledgerStash[ledgerAddr], data.stake, data.borrow, data.flags);
+        }
+        version = ledgersVersion;
+    }
+
     /**
     * @notice Return ledger contract addresses
     * @dev Each ledger contract linked with single stash account on the relaychain side
     * @return Array of ledger contract addresses
     */
     function getLedgerAddresses() public view returns (address[] memory) {
-        address[] memory _ledgers = new address[](enabledLedgers.length + disabledLedgers.length);
+        uint256 enabledLength = enabledLedgers.length;
+        uint256 disabledLength = disabledLedgers.length;
+        address[] memory _ledgers = new address[](enabledLength + disabledLength);
 
-        for (uint i = 0; i < enabledLedgers.length + disabledLedgers.length; i++) {
-            _ledgers[i] = i < enabledLedgers.length ?
-                enabledLedgers[i] : disabledLedgers[i - enabledLedgers.length];
+        for (uint i = 0; i < enabledLength; i++) {
+            _ledgers[i] = enabledLedgers[i];
+        }
+        for (uint i = 0; i < disabledLength; i++) {
+            _ledgers[enabledLength + i] = disabledLedgers[i];
         }
 
         return _ledgers;
@@ -422,6 +500,30 @@ contract Lido is stKSM, Initializable {
         return ledgerByStash[_stashAccount];
     }
 
+    /**
+    * @notice Return active stake of ledger = borrow - unbonded funds - free funds
+    * @param _ledgerAddress - ledger contract address
+    */
+    function ledgerStake(address _ledgerAddress) external view returns (uint256) {
+        return ledgerData[_ledgerAddress].stake;
+    }
+
+    /**
+    * @notice Return total amount of funds in ledger = active stake + unbonded funds + free funds
+    * @param _ledgerAddress - ledger contract address
+    */
+    function ledgerBorrow(address _ledgerAddress) external view returns (uint256) {
+        return ledgerData[_ledgerAddress].borrow;
+    }
+
+    /**
+    * @notice Return amount of ledger funds being transferred from relay chain, see reportDownwardTransfer
+    * @param _ledgerAddress - ledger contract address
+    */
+    function ledgerPendingDownward(address _ledgerAddress) external view returns (uint256) {
+        return ledgerData[_ledgerAddress].pendingDownward;
+    }
+
     /**
     * @notice Stop pool routine operations (deposit, redeem, claimUnbonded),
     *         allowed to call only by ROLE_PAUSE_MANAGER
@@ -445,6 +547,7 @@ contract Lido is stKSM, Initializable {
            recommended to carefully calculate share value to avoid significant rebalancing.
     * @param _stashAccount - relaychain stash account id
     * @param _controllerAccount - controller account id for given stash
+    * @param _index - index of stash derivative account
     * @return created ledger address
     */
     function addLedger(
@@ -456,32 +559,33 @@ contract Lido is stKSM, Initializable {
         auth(ROLE_LEDGER_MANAGER)
         returns(address)
     {
-        require(LEDGER_BEACON != address(0), "LIDO: UNSPECIFIED_LEDGER_BEACON");
-        require(LEDGER_FACTORY != address(0), "LIDO: UNSPECIFIED_LEDGER_FACTORY");
-        require(ORACLE_MASTER != address(0), "LIDO: NO_ORACLE_MASTER");
-        require(enabledLedgers.length + disabledLedgers.length < MAX_LEDGERS_AMOUNT, "LIDO: LEDGERS_POOL_LIMIT");
-        require(ledgerByStash[_stashAccount] == address(0), "LIDO: STASH_ALREADY_EXISTS");
-
-        address ledger = ILedgerFactory(LEDGER_FACTORY).createLedger( 
-            _stashAccount,
-            _controllerAccount,
-            address(VKSM),
-            CONTROLLER,
-            RELAY_SPEC.minNominatorBalance,
-            RELAY_SPEC.ledgerMinimumActiveBalance,
-            RELAY_SPEC.maxUnlockingChunks
-        );
-
-        enabledLedgers.push(ledger);
-        ledgerByStash[_stashAccount] = ledger;
-        ledgerByAddress[ledger] = true;
-
-        IOracleMaster(ORACLE_MASTER).addLedger(ledger);
+        return _addLedger(_stashAccount, _controllerAccount, _index);
+    }
 
-        IController(CONTROLLER).newSubAccount(_index, _stashAccount, ledger);
+    /**
+    * @notice Add batch of new ledgers, allowed to call only by ROLE_LEDGER_MANAGER
+    * @dev Batched version of `addLedger`, every ledger is deployed with allowances already set
+    * @param _stashAccounts - relaychain stash accounts ids
+    * @param _controllerAccounts - controller accounts ids for given stashes
+    * @param _indexes - indexes of stash derivative accounts
+    * @return ledgers - created ledgers addresses
+    */
+    function addLedgers(
+        bytes32[] calldata _stashAccounts,
+        bytes32[] calldata _controllerAccounts,
+        uint16[] calldata _indexes
+    )
+        external
+        auth(ROLE_LEDGER_MANAGER)
+        returns(address[] memory ledgers)
+    {
+        uint256 length = _stashAccounts.length;
+        require(length == _controllerAccounts.length && length == _indexes.length, "LIDO: INCORRECT_INPUT");
 
-        emit LedgerAdd(ledger, _stashAccount, _controllerAccount);
-        return ledger;
+        ledgers = new address[](length);
+        for (uint256 i = 0; i < length; ++i) {
+            ledgers[i] = _addLedger(_stashAccounts[i], _controllerAccounts[i], _indexes[i]);
+        }
     }
 
     /**
@@ -500,7 +604,7 @@ contract Lido is stKSM, Initializable {
     */
     function emergencyPauseLedger(address _ledgerAddress) external auth(ROLE_LEDGER_MANAGER) {
         _disableLedger(_ledgerAddress);
-        pausedledgers[_ledgerAddress] = true;
+        ledgerData[_ledgerAddress].flags |= LEDGER_PAUSED;
         emit LedgerPaused(_ledgerAddress);
     }
 
@@ -509,8 +613,10 @@ contract Lido is stKSM, Initializable {
     * @param _ledgerAddress - target ledger address
     */
     function resumeLedger(address _ledgerAddress) external auth(ROLE_LEDGER_MANAGER) {
-        require(pausedledgers[_ledgerAddress], "LIDO: LEDGER_NOT_PAUSED");
-        delete pausedledgers[_ledgerAddress];
+        LedgerData storage data = ledgerData[_ledgerAddress];
+        require(data.flags & LEDGER_PAUSED != 0, "LIDO: LEDGER_NOT_PAUSED");
+        data.flags &= ~LEDGER_PAUSED;
+        ++ledgersVersion;
         emit LedgerResumed(_ledgerAddress);
     }
 
@@ -520,25 +626,20 @@ contract Lido is stKSM, Initializable {
     * @param _ledgerAddress - target ledger address
     */
     function removeLedger(address _ledgerAddress) external auth(ROLE_LEDGER_MANAGER) {
-        require(ledgerByAddress[_ledgerAddress], "LIDO: LEDGER_NOT_FOUND");
-        require(ledgerStake[_ledgerAddress] == 0, "LIDO: LEDGER_HAS_NON_ZERO_STAKE");
-        // uint256 ledgerIdx = _findDisabledLedger(_ledgerAddress);
-        uint256 ledgerIdx = _findLedger(_ledgerAddress, false);
-        require(ledgerIdx != type(uint256).max, "LIDO: LEDGER_NOT_DISABLED");
+        LedgerData memory data = ledgerData[_ledgerAddress];
+        require(data.flags & LEDGER_EXISTS != 0, "LIDO: LEDGER_NOT_FOUND");
+        require(data.stake == 0, "LIDO: LEDGER_HAS_NON_ZERO_STAKE");
+        require(data.flags & LEDGER_ENABLED == 0, "LIDO: LEDGER_NOT_DISABLED");
 
         ILedger ledger = ILedger(_ledgerAddress);
         require(ledger.isEmpty(), "LIDO: LEDGER_IS_NOT_EMPTY");
 
-        address lastLedger = disabledLedgers[disabledLedgers.length - 1];
-        disabledLedgers[ledgerIdx] = lastLedger;
-        disabledLedgers.pop();
+        _removeFromList(disabledLedgers, data.index);
 
-        delete ledgerByAddress[_ledgerAddress];
-        delete ledgerByStash[ledger.stashAccount()];
-
-        if (pausedledgers[_ledgerAddress]) {
-            delete pausedledgers[_ledgerAddress];
-        }
+        delete ledgerData[_ledgerAddress];
+        delete ledgerByStash[ledgerStash[_ledgerAddress]];
+        delete ledgerStash[_ledgerAddress];
+        ++ledgersVersion;
 
         IOracleMaster(ORACLE_MASTER).removeLedger(_ledgerAddress);
 
@@ -547,6 +648,35 @@ contract Lido is stKSM, Initializable {
         emit LedgerRemove(_ledgerAddress);
     }
 
+    /**
+    * @notice Move ledger registry and accounting of ledgers added before upgrade to `ledgerData`
+    *         and switch ledgers to `_ledgerRevision` implementation, allowed to call only once by proxy admin
+    * @dev Must be called in the upgrade transaction with ProxyAdmin.upgradeAndCall, ledger callbacks
+    *      fail with LIDO: NOT_FROM_LEDGER until the registry is migrated. Ledgers of the previous version
+    *      don't report downward transfers and the new ones call reportDownwardTransfer missing in the previous
+    *      Lido, so ledger beacon revision is switched by the same transaction which seeds `pendingDownward`.
+    *      New ledger implementation must be added to the beacon and Lido must have ROLE_BEACON_MANAGER
+    *      before the upgrade, see scripts/upgrade.py
+    * @param _ledgerRevision - ledger beacon revision of ledger implementation matching this Lido
+    */
+    function migrateLedgers(uint256 _ledgerRevision) external {
+        require(msg.sender == StorageSlot.getAddressSlot(PROXY_ADMIN_SLOT).value, "LIDO: NOT_PROXY_ADMIN");
+        require(storageVersion < STORAGE_VERSION, "LIDO: ALREADY_MIGRATED");
+        storageVersion = STORAGE_VERSION;
+
+        ILedgerBeacon(LEDGER_BEACON).setCurrentRevision(_ledgerRevision);
+
+        uint256 enabledLength = enabledLedgers.length;
+        for (uint256 i = 0; i < enabledLength; ++i) {
+            _indexLedger(enabledLedgers[i], i, LEDGER_EXISTS | LEDGER_ENABLED);
+        }
+        uint256 disabledLength = disabledLedgers.length;
+        for (uint256 i = 0; i < disabledLength; ++i) {
+            _indexLedger(disabledLedgers[i], i, LEDGER_EXISTS);
+        }
+        ++ledgersVersion;
+    }
+
     /**
     * @notice Nominate on behalf of gived array of stash accounts, allowed to call only by ROLE_STAKE_MANAGER
     * @dev Method spawns xcm call to relaychain
@@ -643,7 +773,7 @@ contract Lido is stKSM, Initializable {
     * @notice Distribute rewards earned by ledger, allowed to call only by ledger
     */
     function distributeRewards(uint256 _totalRewards, uint256 _ledgerBalance) external {
-        require(ledgerByAddress[msg.sender], "LIDO: NOT_FROM_LEDGER");
+        LedgerData storage data = _getCallerLedgerData();
 
         Types.Fee memory _fee = FEE;
 
@@ -652,8 +782,8 @@ contract Lido is stKSM, Initializable {
         assert(_feeDevTreasure>0);
 
         fundRaisedBalance += _totalRewards;
-        ledgerStake[msg.sender] += _totalRewards;
-        ledgerBorrow[msg.sender] += _totalRewards;
+        data.stake += _totalRewards.toUint128();
+        data.borrow += _totalRewards.toUint128();
 
         uint256 _rewards = _totalRewards * _feeDevTreasure / uint256(10000 - _fee.operators);
         uint256 denom = _getTotalPooledKSM()  - _rewards;
@@ -674,7 +804,7 @@ contract Lido is stKSM, Initializable {
     * @notice Distribute lossed by ledger, allowed to call only by ledger
     */
     function distributeLosses(uint256 _totalLosses, uint256 _ledgerBalance) external {
-        require(ledgerByAddress[msg.sender], "LIDO: NOT_FROM_LEDGER");
+        LedgerData storage data = _getCallerLedgerData();
 
         uint256 withdrawalBalance = IWithdrawal(WITHDRAWAL).totalBalanceForLosses();
         uint256 withdrawalPendingForClaiming = IWithdrawal(WITHDRAWAL).pendingForClaiming();
@@ -696,8 +826,9 @@ contract Lido is stKSM, Initializable {
         }
 
         // edge case when loss can be more than stake
-        ledgerStake[msg.sender] -= ledgerStake[msg.sender] >= lidoPart ? lidoPart : ledgerStake[msg.sender];
-        ledgerBorrow[msg.sender] -= _totalLosses;
+        uint128 _stake = data.stake;
+        data.stake = _stake >= lidoPart ? _stake - uint128(lidoPart) : 0;
+        data.borrow -= _totalLosses.toUint128();
 
         emit Losses(msg.sender, _totalLosses, _ledgerBalance);
     }
@@ -708,7 +839,7 @@ contract Lido is stKSM, Initializable {
     * @param _excess - excess of vKSM that was transfered
     */
     function transferFromLedger(uint256 _amount, uint256 _excess) external {
-        require(ledgerByAddress[msg.sender], "LIDO: NOT_FROM_LEDGER");
+        LedgerData storage data = _getCallerLedgerData();
 
         if (_excess > 0) { // some donations
             fundRaisedBalance += _excess; //just distribute it as rewards
@@ -716,19 +847,32 @@ contract Lido is stKSM, Initializable {
             VKSM.transferFrom(msg.sender, address(this), _excess);
         }
 
-        ledgerBorrow[msg.sender] -= _amount;
+        data.borrow -= _amount.toUint128();
+        // ledger returns all pending downward funds at once
+        data.pendingDownward = 0;
         VKSM.transferFrom(msg.sender, WITHDRAWAL, _amount);
     }
 
+    /**
+    * @notice Record downward transfer from relay chain initiated by ledger. Can be called only from ledger
+    * @dev Mirrors Ledger.transferDownwardBalance, so era flush doesn't call ledgers
+    * @param _amount - amount of vKSM being transfered to ledger
+    */
+    function reportDownwardTransfer(uint256 _amount) external {
+        LedgerData storage data = _getCallerLedgerData();
+        data.pendingDownward += _amount.toUint128();
+    }
+
     /**
     * @notice Transfer vKSM from LIDO to ledger. Can be called only from ledger
     * @param _amount - amount of transfered vKSM
     */
     function transferToLedger(uint256 _amount) external {
-        require(ledgerByAddress[msg.sender], "LIDO: NOT_FROM_LEDGER");
-        require(ledgerBorrow[msg.sender] + _amount <= ledgerStake[msg.sender], "LIDO: LEDGER_NOT_ENOUGH_STAKE");
+        LedgerData storage data = _getCallerLedgerData();
+        uint128 newBorrow = data.borrow + _amount.toUint128();
+        require(newBorrow <= data.stake, "LIDO: LEDGER_NOT_ENOUGH_STAKE");
 
-        ledgerBorrow[msg.sender] += _amount;
+        data.borrow = newBorrow;
         VKSM.transfer(msg.sender, _amount);
     }
 
@@ -748,53 +892,65 @@ contract Lido is stKSM, Initializable {
     */
     function _softRebalanceStakes() internal {
         uint256 totalStakeExcess = 0;
-        for (uint256 i = 0; i < enabledLedgers.length + disabledLedgers.length; ++i) {
-            address ledgerAddr = i < enabledLedgers.length ? 
-                enabledLedgers[i] : disabledLedgers[i - enabledLedgers.length];
+        // the amount of funds that won't be sent to the ledgers, Lido balance doesn't change in the loop
+        uint256 availableFunds = VKSM.balanceOf(address(this));
+        availableFunds = availableFunds > bufferedDeposits ? availableFunds - bufferedDeposits : 0;
+        uint256 enabledLength = enabledLedgers.length;
+        uint256 ledgersLength = enabledLength + disabledLedgers.length;
+        for (uint256 i = 0; i < ledgersLength; ++i) {
+            address ledgerAddr = i < enabledLength ?
+                enabledLedgers[i] : disabledLedgers[i - enabledLength];
+            LedgerData storage data = ledgerData[ledgerAddr];
+            // stake and borrow share one slot
+            (uint128 _stake, uint128 _borrow) = (data.stake, data.borrow);
 
             // consider an incorrect case when our records about the ledger are wrong:
             // the ledger's active stake > the ledger's total amount of funds
-            if (ledgerStake[ledgerAddr] > ledgerBorrow[ledgerAddr]) {
+            if (_stake > _borrow) {
 
-                uint256 ledgerStakeExcess = ledgerStake[ledgerAddr] - ledgerBorrow[ledgerAddr];
+                uint256 ledgerStakeExcess = _stake - _borrow;
 
                 // new total stake excess <= the amount of funds that won't be sent to the ledgers
-                if (totalStakeExcess + ledgerStakeExcess <= VKSM.balanceOf(address(this)) - bufferedDeposits) {
+                if (totalStakeExcess + ledgerStakeExcess <= availableFunds) {
                     totalStakeExcess += ledgerStakeExcess;
 
                     // correcting the ledger's active stake record
-                    ledgerStake[ledgerAddr] -= ledgerStakeExcess;
+                    data.stake = _borrow;
                 }
             }
         }
 
         // the amount of funds to be sent to the ledgers should decrease the ledgers' stake excess
-        bufferedDeposits += totalStakeExcess;
+        uint256 deposits = bufferedDeposits + totalStakeExcess;
+        uint256 redeems = bufferedRedeems;
 
-        if (bufferedDeposits > 0 || bufferedRedeems > 0) {
+        if (deposits > 0 || redeems > 0) {
             // first try to distribute redeems accross disabled ledgers
-            if (disabledLedgers.length > 0 && bufferedRedeems > 0) {
-                bufferedRedeems = _processDisabledLedgers(bufferedRedeems);
+            if (ledgersLength > enabledLength && redeems > 0) {
+                redeems = _processDisabledLedgers(redeems);
             }
 
             // NOTE: if we have deposits and redeems in one era we need to send all possible xcKSMs to Withdrawal
-            if (bufferedDeposits > 0 && bufferedRedeems > 0) {
-                uint256 maxImmediateTransfer = bufferedDeposits > bufferedRedeems ? bufferedRedeems : bufferedDeposits;
-                bufferedDeposits -= maxImmediateTransfer;
-                bufferedRedeems -= maxImmediateTransfer;
+            if (deposits > 0 && redeems > 0) {
+                uint256 maxImmediateTransfer = deposits > redeems ? redeems : deposits;
+                deposits -= maxImmediateTransfer;
+                redeems -= maxImmediateTransfer;
                 VKSM.transfer(WITHDRAWAL, maxImmediateTransfer);
             }
 
             // distribute remaining stakes and redeems accross enabled
-            if (enabledLedgers.length > 0) {
-                int256 stake = bufferedDeposits.toInt256() - bufferedRedeems.toInt256();
+            if (enabledLength > 0) {
+                int256 stake = deposits.toInt256() - redeems.toInt256();
                 if (stake != 0) {
                     _processEnabled(stake);
                 }
-                bufferedDeposits = 0;
-                bufferedRedeems = 0;
+                deposits = 0;
+                redeems = 0;
             }
         }
+
+        bufferedDeposits = deposits;
+        bufferedRedeems = redeems;
     }
 
     /**
@@ -808,20 +964,26 @@ contract Lido is stKSM, Initializable {
         uint256 stakesSum = 0;
         uint256 actualRedeems = 0;
 
+        // stakes of paused ledgers are zero in cache, flags and stake are read once per ledger
+        address[] memory ledgersCache = new address[](disabledLength);
+        uint256[] memory stakesCache = new uint256[](disabledLength);
         for (uint256 i = 0; i < disabledLength; ++i) {
-            if (!pausedledgers[disabledLedgers[i]]) {
-                stakesSum += ledgerStake[disabledLedgers[i]];
+            ledgersCache[i] = disabledLedgers[i];
+            LedgerData storage data = ledgerData[ledgersCache[i]];
+            if (data.flags & LEDGER_PAUSED == 0) {
+                stakesCache[i] = data.stake;
+                stakesSum += stakesCache[i];
             }
         }
 
         if (stakesSum == 0) return redeems;
 
         for (uint256 i = 0; i < disabledLength; ++i) {
-            if (!pausedledgers[disabledLedgers[i]]) {
-                uint256 currentStake = ledgerStake[disabledLedgers[i]];
+            uint256 currentStake = stakesCache[i];
+            if (currentStake > 0) {
                 uint256 decrement = redeems * currentStake / stakesSum;
                 decrement = decrement > currentStake ? currentStake : decrement;
-                ledgerStake[disabledLedgers[i]] = currentStake - decrement;
+                ledgerData[ledgersCache[i]].stake = uint128(currentStake - decrement);
                 actualRedeems += decrement;
             }
         }
@@ -852,8 +1014,8 @@ contract Lido is stKSM, Initializable {
             int256 diff = 0;
             for (uint256 i = 0; i < ledgersLength; ++i) {
                 ledgersCache[i] = enabledLedgers[i];
-                ledgerStakesCache[i] = int256(ledgerStake[ledgersCache[i]]);
-                ledgerStakePrevious[i] = ledgerStake[ledgersCache[i]];
+                ledgerStakePrevious[i] = ledgerData[ledgersCache[i]].stake;
+                ledgerStakesCache[i] = int256(ledgerStakePrevious[i]);
 
                 diff = int256(targetStake) - int256(ledgerStakesCache[i]);
                 if (_stake * diff > 0) {
@@ -879,7 +1041,7 @@ contract Lido is stKSM, Initializable {
             if (diffs[i] > 0) {
                 int256 change = diffs[i] * _stake / activeDiffsSum;
                 int256 newStake = ledgerStakesCache[i] + change;
-                ledgerStake[ledgersCache[i]] = uint256(newStake);
+                ledgerData[ledgersCache[i]].stake = uint256(newStake).toUint128();
                 ledgerStakesCache[i] = newStake;
                 totalChange += change;
             }
@@ -889,42 +1051,93 @@ contract Lido is stKSM, Initializable {
             int256 remaining = _stake - totalChange;
             if (remaining > 0) {
                 // just add to first ledger
-                ledgerStake[ledgersCache[0]] += uint256(remaining);
+                ledgerData[ledgersCache[0]].stake += uint256(remaining).toUint128();
             }
             else if (remaining < 0) {
                 for (uint256 i = 0; i < ledgersLength && remaining < 0; ++i) {
                     uint256 stake = uint256(ledgerStakesCache[i]);
                     if (stake > 0) {
                         uint256 decrement = stake > uint256(-remaining) ? uint256(-remaining) : stake;
-                        ledgerStake[ledgersCache[i]] -= decrement;
+                        ledgerData[ledgersCache[i]].stake -= uint128(decrement);
                         remaining += int256(decrement);
                     }
                 }
             }
         }
 
+        uint256 freeToTransferFunds = _getFreeToTransferFunds(ledgersCache, ledgerStakePrevious);
+        if (freeToTransferFunds > 0) {
+            VKSM.transfer(WITHDRAWAL, freeToTransferFunds);
+        }
+    }
+
+    /**
+    * @notice Return funds which ledgers won't get back because new deposits increased their stake
+    * @dev Pending downward transfers are mirrored in `ledgerData`, so ledgers aren't called
+    * @param _ledgers - enabled ledgers
+    * @param _stakesPrevious - ledgers stakes before distribution
+    */
+    function _getFreeToTransferFunds(address[] memory _ledgers, uint256[] memory _stakesPrevious) internal view returns (uint256 freeToTransferFunds) {
         // NOTE: this check used to catch cases when one user redeem some funds and another deposit in next era
         // so ledgers stake would increase and they return less xcKSMs and remaining funds would be locked on Lido
-        uint256 freeToTransferFunds = 0;
-        for (uint256 i = 0; i < ledgersLength; ++i) {
+        for (uint256 i = 0; i < _ledgers.length; ++i) {
+            LedgerData storage data = ledgerData[_ledgers[i]];
+            uint256 currentStake = data.stake;
+            // NOTE: the second slot with pendingDownward is read only if new deposits increase ledger stake
+            if (currentStake <= _stakesPrevious[i]) {
+                continue;
+            }
             // NOTE: protection from double sending of funds
-            uint256 updatedLedgerBorrow = ledgerBorrow[ledgersCache[i]] - uint256(ILedger(ledgersCache[i]).transferDownwardBalance());
-            if (
-                // NOTE: this means that we wait transfer from ledger
-                updatedLedgerBorrow > ledgerStakePrevious[i] &&
-                // NOTE: and new deposits increase ledger stake
-                ledgerStake[ledgersCache[i]] > ledgerStakePrevious[i]
-                ) {
-                    freeToTransferFunds += 
-                        ledgerStake[ledgersCache[i]] > updatedLedgerBorrow ? 
-                        updatedLedgerBorrow - ledgerStakePrevious[i] :
-                        ledgerStake[ledgersCache[i]] - ledgerStakePrevious[i];
+            uint256 updatedLedgerBorrow = data.borrow - data.pendingDownward;
+            // NOTE: this means that we wait transfer from ledger
+            if (updatedLedgerBorrow > _stakesPrevious[i]) {
+                freeToTransferFunds +=
+                    currentStake > updatedLedgerBorrow ?
+                    updatedLedgerBorrow - _stakesPrevious[i] :
+                    currentStake - _stakesPrevious[i];
             }
         }
+    }
 
-        if (freeToTransferFunds > 0) {
-            VKSM.transfer(WITHDRAWAL, uint256(freeToTransferFunds));
-        }
+    /**
+    * @notice Deploy new ledger for provided stash account and register it in oracle master and controller
+    * @param _stashAccount - relaychain stash account id
+    * @param _controllerAccount - controller account id for given stash
+    * @param _index - index of stash derivative account
+    * @return created ledger address
+    */
+    function _addLedger(bytes32 _stashAccount, bytes32 _controllerAccount, uint16 _index) internal returns(address) {
+        require(LEDGER_BEACON != address(0), "LIDO: UNSPECIFIED_LEDGER_BEACON");
+        require(LEDGER_FACTORY != address(0), "LIDO: UNSPECIFIED_LEDGER_FACTORY");
+        require(ORACLE_MASTER != address(0), "LIDO: NO_ORACLE_MASTER");
+        uint256 enabledLength = enabledLedgers.length;
+        require(enabledLength + disabledLedgers.length < MAX_LEDGERS_AMOUNT, "LIDO: LEDGERS_POOL_LIMIT");
+        require(ledgerByStash[_stashAccount] == address(0), "LIDO: STASH_ALREADY_EXISTS");
+
+        address ledger = ILedgerFactory(LEDGER_FACTORY).createLedger( 
+            _stashAccount,
+            _controllerAccount,
+            address(VKSM),
+            CONTROLLER,
+            RELAY_SPEC.minNominatorBalance,
+            RELAY_SPEC.ledgerMinimumActiveBalance,
+            RELAY_SPEC.maxUnlockingChunks
+        );
+        // NOTE: approvals made during ledger construction are not reliable for precompiles, so refresh them here
+        ILedger(ledger).refreshAllowances();
+
+        enabledLedgers.push(ledger);
+        ledgerByStash[_stashAccount] = ledger;
+        ledgerData[ledger] = LedgerData(0, 0, uint32(enabledLength), LEDGER_EXISTS | LEDGER_ENABLED, 0);
+        ledgerStash[ledger] = _stashAccount;
+        ++ledgersVersion;
+
+        IOracleMaster(ORACLE_MASTER).addLedger(ledger);
+
+        IController(CONTROLLER).newSubAccount(_index, _stashAccount, ledger);
+
+        emit LedgerAdd(ledger, _stashAccount, _controllerAccount);
+        return ledger;
     }
 
     /**
@@ -934,10 +1147,9 @@ contract Lido is stKSM, Initializable {
     * @param _maxUnlockingChunks - new maximum unlocking chunks
     */
     function _updateLedgerRelaySpecs(uint128 _minNominatorBalance, uint128 _minimumBalance, uint256 _maxUnlockingChunks) internal {
-        for (uint i = 0; i < enabledLedgers.length + disabledLedgers.length; i++) {
-            address ledgerAddress = i < enabledLedgers.length ?
-                enabledLedgers[i] : disabledLedgers[i - enabledLedgers.length];
-            ILedger(ledgerAddress).setRelaySpecs(_minNominatorBalance, _minimumBalance, _maxUnlockingChunks);
+        address[] memory _ledgers = getLedgerAddresses();
+        for (uint i = 0; i < _ledgers.length; i++) {
+            ILedger(_ledgers[i]).setRelaySpecs(_minNominatorBalance, _minimumBalance, _maxUnlockingChunks);
         }
     }
 
@@ -947,15 +1159,16 @@ contract Lido is stKSM, Initializable {
     * @param _ledgerAddress - target ledger address
     */
     function _disableLedger(address _ledgerAddress) internal {
-        require(ledgerByAddress[_ledgerAddress], "LIDO: LEDGER_NOT_FOUND");
-        uint256 ledgerIdx = _findLedger(_ledgerAddress, true);
-        require(ledgerIdx != type(uint256).max, "LIDO: LEDGER_NOT_ENABLED");
+        LedgerData storage data = ledgerData[_ledgerAddress];
+        require(data.flags & LEDGER_EXISTS != 0, "LIDO: LEDGER_NOT_FOUND");
+        require(data.flags & LEDGER_ENABLED != 0, "LIDO: LEDGER_NOT_ENABLED");
 
-        address lastLedger = enabledLedgers[enabledLedgers.length - 1];
-        enabledLedgers[ledgerIdx] = lastLedger;
-        enabledLedgers.pop();
+        _removeFromList(enabledLedgers, data.index);
 
+        data.index = uint32(disabledLedgers.length);
+        data.flags &= ~LEDGER_ENABLED;
         disabledLedgers.push(_ledgerAddress);
+        ++ledgersVersion;
 
         emit LedgerDisable(_ledgerAddress);
     }
@@ -976,17 +1189,48 @@ contract Lido is stKSM, Initializable {
     }
 
     /**
-    * @notice Returns enabled or disabled ledger index by given address
-    * @return enabled or disabled ledger index or uint256_max if not found
+    * @notice Fill `ledgerData` record from deprecated mappings, records which are already filled
+    *         keep their accounting and paused state. Pending downward transfer and stash are taken from ledger
     */
-    function _findLedger(address _ledgerAddress, bool _enabled) internal view returns(uint256) {
-        uint256 length = _enabled ? enabledLedgers.length : disabledLedgers.length;
-        for (uint256 i = 0; i < length; ++i) {
-            address ledgerAddress = _enabled ? enabledLedgers[i] : disabledLedgers[i];
-            if (ledgerAddress == _ledgerAddress) {
-                return i;
+    function _indexLedger(address _ledgerAddress, uint256 _index, uint8 _flags) internal {
+        LedgerData storage data = ledgerData[_ledgerAddress];
+        if (data.flags == 0) {
+            data.stake = ledgerStakeDeprecated[_ledgerAddress].toUint128();
+            data.borrow = ledgerBorrowDeprecated[_ledgerAddress].toUint128();
+            if (pausedledgers[_ledgerAddress]) {
+                _flags |= LEDGER_PAUSED;
             }
+            delete ledgerStakeDeprecated[_ledgerAddress];
+            delete ledgerBorrowDeprecated[_ledgerAddress];
+            delete ledgerByAddress[_ledgerAddress];
+            delete pausedledgers[_ledgerAddress];
+        } else {
+            _flags |= data.flags & LEDGER_PAUSED;
+        }
+        data.index = uint32(_index);
+        data.flags = _flags;
+        data.pendingDownward = ILedger(_ledgerAddress).transferDownwardBalance();
+        ledgerStash[_ledgerAddress] = ILedger(_ledgerAddress).stashAccount();
+    }
+
+    /**
+    * @notice Remove ledger from enabled or disabled list by its index, the last ledger takes its place
+    */
+    function _removeFromList(address[] storage _list, uint256 _index) internal {
+        uint256 last = _list.length - 1;
+        if (_index != last) {
+            address lastLedger = _list[last];
+            _list[_index] = lastLedger;
+            ledgerData[lastLedger].index = uint32(_index);
         }
-        return type(uint256).max;
+        _list.pop();
+    }
+
+    /**
+    * @notice Returns registry record of calling ledger, reverts if caller is not a ledger
+    */
+    function _getCallerLedgerData() internal view returns (LedgerData storage data) {
+        data = ledgerData[msg.sender];
+        require(data.flags & LEDGER_EXISTS != 0, "LIDO: NOT_FROM_LEDGER");
     }
 }
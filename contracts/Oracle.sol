@@ -13,14 +13,17 @@ contract Oracle {
 
     event Completed(uint256);
 
+    /// Maximum number of oracle members, limited by the report bitmask width
+    uint256 public constant MAX_MEMBERS = 256;
+
     // is already pushed flag
     bool public isPushed;
 
     // Current era report  hashes
     uint256[] internal currentReportVariants;
 
-    // Current era reports
-    Types.OracleData[] private currentReports;
+    // Variant which got quorum after quorum lowering, waits for report data to be pushed, zero if none
+    uint256 public quorumVariant;
 
     // Then oracle member push report, its bit is set
     uint256 internal currentReportBitmask;
@@ -31,6 +34,9 @@ contract Oracle {
     // linked ledger contract address
     address public LEDGER;
 
+    // era of the current reporting data, data of previous eras is cleared by the first report of a new era
+    uint64 public reportingEra;
+
     // Allows function calls only from OracleMaster
     modifier onlyOracleMaster() {
         require(msg.sender == ORACLE_MASTER);
@@ -54,7 +60,19 @@ contract Oracle {
     * @return is reported indicator
     */
     function isReported(uint256 _index) external view returns (bool) {
-        return (currentReportBitmask & (1 << _index)) != 0;
+        return _isCurrentEra() && (currentReportBitmask & (1 << _index)) != 0;
+    }
+
+    /**
+    * @notice Returns current report variants
+    * @return isPushed - true if report is already pushed to ledger
+    * @return variants - report hashes, the last byte of each is vote counter (see ReportUtils)
+    */
+    function getReportVariants() external view returns (bool, uint256[] memory) {
+        if (!_isCurrentEra()) {
+            return (false, new uint256[](0));
+        }
+        return (isPushed, currentReportVariants);
     }
 
     /**
@@ -65,6 +83,12 @@ contract Oracle {
     * @param _staking report data
     */
     function reportRelay(uint256 _index, uint256 _quorum, uint64 _eraId, Types.OracleData calldata _staking) external onlyOracleMaster {
+        // the first report of a new era
+        if (_eraId != reportingEra) {
+            _clearReporting();
+            reportingEra = _eraId;
+        }
+
         {
             uint256 mask = 1 << _index;
             uint256 reportBitmask = currentReportBitmask;
@@ -77,7 +101,11 @@ contract Oracle {
         }
 
         // convert staking report into 31 byte hash. The last byte is used for vote counting
-        uint256 variant = uint256(keccak256(abi.encode(_staking))) & ReportUtils.COUNT_OUTMASK;
+        uint256 variant = _getVariant(_staking);
+        if (quorumVariant != 0 && variant == quorumVariant) {
+            _push(_eraId, _staking);
+            return;
+        }
 
         uint256 i = 0;
         uint256 _length = currentReportVariants.length;
@@ -94,8 +122,8 @@ contract Oracle {
             if (_quorum == 1) {
                 _push(_eraId, _staking);
             } else {
+                // only hash is stored, report data is pushed from calldata of the quorum reaching report
                 currentReportVariants.push(variant + 1);
-                currentReports.push(_staking);
             }
         }
     }
@@ -108,15 +136,28 @@ contract Oracle {
     * @param _eraId current era id
     */
     function softenQuorum(uint8 _quorum, uint64 _eraId) external onlyOracleMaster {
+        // reports of previous eras are never pushed
+        if (_eraId != reportingEra || isPushed) {
+            return;
+        }
         (bool isQuorum, uint256 reportIndex) = _getQuorumReport(_quorum);
         if (isQuorum) {
-            Types.OracleData memory report = _getStakeReport(reportIndex);
-            _push(
-                _eraId, report
-            );
+            // report data isn't stored, it has to be resubmitted with pushQuorumReport
+            quorumVariant = currentReportVariants[reportIndex] & ReportUtils.COUNT_OUTMASK;
         }
     }
 
+    /**
+    * @notice Push report which got quorum after quorum lowering, allowed to call only by oracle master contract
+    * @param _eraId current era id
+    * @param _staking report data, its hash must be equal to the quorum variant
+    */
+    function pushQuorumReport(uint64 _eraId, Types.OracleData calldata _staking) external onlyOracleMaster {
+        require(_eraId == reportingEra && !isPushed, "ORACLE: NOTHING_TO_PUSH");
+        require(quorumVariant != 0 && _getVariant(_staking) == quorumVariant, "ORACLE: NOT_QUORUM_REPORT");
+        _push(_eraId, _staking);
+    }
+
     /**
     * @notice Clear data about current reporting, allowed to call only by oracle master contract
     */
@@ -125,13 +166,28 @@ contract Oracle {
     }
 
     /**
-    * @notice Returns report by given index
-    * @param _index oracle member index
-    * @return staking report data
+    * @notice Mark report of `_eraId` as pushed, allowed to call only by oracle master contract
+    * @dev Used when oracle replaces one which already pushed report of the era, see OracleMaster.migrateOracles
+    * @param _eraId current era id
+    */
+    function markPushed(uint64 _eraId) external onlyOracleMaster {
+        _clearReporting();
+        reportingEra = _eraId;
+        isPushed = true;
+    }
+
+    /**
+    * @notice Returns true if reporting data belongs to the current OracleMaster era
+    */
+    function _isCurrentEra() internal view returns (bool) {
+        return reportingEra == IOracleMaster(ORACLE_MASTER).eraId();
+    }
+
+    /**
+    * @notice Returns 31 byte report hash, the last byte is reserved for vote counting
     */
-    function _getStakeReport(uint256 _index) internal view returns (Types.OracleData storage staking) {
-        assert(_index < currentReports.length);
-        return currentReports[_index];
+    function _getVariant(Types.OracleData calldata _staking) internal pure returns (uint256) {
+        return uint256(keccak256(abi.encode(_staking))) & ReportUtils.COUNT_OUTMASK;
     }
 
     /**
@@ -142,15 +198,16 @@ contract Oracle {
         isPushed = false;
 
         delete currentReportVariants;
-        delete currentReports;
+        delete quorumVariant;
     }
 
     /**
     * @notice Push data to ledger
     */
-    function _push(uint64 _eraId, Types.OracleData memory report) internal {
+    function _push(uint64 _eraId, Types.OracleData calldata report) internal {
         ILedger(LEDGER).pushData(_eraId, report);
         isPushed = true;
+        emit Completed(_eraId);
     }
 
     /**
@@ -4,6 +4,7 @@ pragma abicoder v2;
 
 import "@openzeppelin/contracts/security/Pausable.sol";
 import "@openzeppelin/contracts/proxy/Clones.sol";
+import "@openzeppelin/contracts/utils/StorageSlot.sol";
 
 import "../interfaces/IOracle.sol";
 import "../interfaces/ILido.sol";
@@ -19,6 +20,7 @@ contract OracleMaster is Pausable {
     event MemberAdded(address member);
     event MemberRemoved(address member);
     event QuorumChanged(uint8 QUORUM);
+    event AnchorEraChanged(uint64 ANCHOR_ERA_ID, uint64 ANCHOR_TIMESTAMP, uint64 SECONDS_PER_ERA);
 
     // current era id
     uint64 public eraId;
@@ -48,12 +50,24 @@ contract OracleMaster is Pausable {
     // Relay seconds per era
     uint64 public SECONDS_PER_ERA;
 
+    // Oracle member => its index in `members` plus one, zero for non-members
+    mapping(address => uint256) internal memberIndexPlusOne;
+
+    // Version of storage layout, deployments of previous versions are migrated once on upgrade
+    uint256 public storageVersion;
+
     /// Maximum number of oracle committee members
     uint256 public constant MAX_MEMBERS = 255;
 
     // Missing member index
     uint256 internal constant MEMBER_NOT_FOUND = type(uint256).max;
 
+    // Current storage layout version, see migrateOracles
+    uint256 internal constant STORAGE_VERSION = 1;
+
+    // EIP-1967 proxy admin slot, bytes32(uint256(keccak256("eip1967.proxy.admin")) - 1)
+    bytes32 internal constant PROXY_ADMIN_SLOT = 0xb53127684a568b3173ae13b9f8a6016e243e63b6e8ee1178d6a717850b5d6103;
+
     // Spec manager role
     bytes32 internal constant ROLE_SPEC_MANAGER = keccak256("ROLE_SPEC_MANAGER");
 
@@ -91,9 +105,12 @@ contract OracleMaster is Pausable {
         require(ORACLE_CLONE == address(0), "OM: ALREADY_INITIALIZED");
         require(_oracleClone != address(0), "OM: INCORRECT_CLONE_ADDRESS");
         require(_quorum > 0 && _quorum < MAX_MEMBERS, "OM: INCORRECT_QUORUM");
+        // clone template can limit members count below MAX_MEMBERS, see addOracleMember
+        require(_quorum <= IOracle(_oracleClone).MAX_MEMBERS(), "OM: INCORRECT_QUORUM");
 
         ORACLE_CLONE = _oracleClone;
         QUORUM = _quorum;
+        storageVersion = STORAGE_VERSION;
     }
 
     /**
@@ -114,10 +131,11 @@ contract OracleMaster is Pausable {
     */
     function setQuorum(uint8 _quorum) external auth(ROLE_ORACLE_QUORUM_MANAGER) {
         require(_quorum > 0 && _quorum < MAX_MEMBERS, "OM: QUORUM_WONT_BE_MADE");
+        require(_quorum <= IOracle(ORACLE_CLONE).MAX_MEMBERS(), "OM: QUORUM_WONT_BE_MADE");
         uint8 oldQuorum = QUORUM;
         QUORUM = _quorum;
 
-        // If the QUORUM value lowered, check existing reports whether it is time to push
+        // If the QUORUM value lowered, check existing reports whether it is time to push (see pushQuorumReport)
         if (oldQuorum > _quorum) {
             address[] memory ledgers = ILido(LIDO).getLedgerAddresses();
             uint256 _length = ledgers.length;
@@ -186,6 +204,69 @@ contract OracleMaster is Pausable {
         return (lastEra, IOracle(oracleForLedger[ledger]).isReported(memberIdx));
     }
 
+    /**
+    * @notice Return last reported era and oracle is already reported indicators for all ledgers.
+              Used in oracle service to skip already reported stashes with one call
+    * @param _oracleMember - oracle member address
+    * @return lastEra - last reported era
+    * @return stashes - relaychain stash accounts, in the same order as `getStashAccounts`
+    * @return isReported - true if oracle member already reported for stash with the same index
+    */
+    function getReportedStatus(address _oracleMember)
+        external
+        view
+        returns (
+            uint64 lastEra,
+            bytes32[] memory stashes,
+            bool[] memory isReported
+        )
+    {
+        lastEra = eraId;
+        stashes = ILido(LIDO).getStashAccounts();
+        isReported = new bool[](stashes.length);
+
+        uint256 memberIdx = _getMemberId(_oracleMember);
+        if (memberIdx == MEMBER_NOT_FOUND) {
+            return (lastEra, stashes, isReported);
+        }
+
+        address[] memory ledgers = ILido(LIDO).getLedgerAddresses();
+        for (uint256 i = 0; i < ledgers.length; ++i) {
+            address oracle = oracleForLedger[ledgers[i]];
+            if (oracle != address(0)) {
+                isReported[i] = IOracle(oracle).isReported(memberIdx);
+            }
+        }
+    }
+
+    /**
+    * @notice Return current report variants for all ledgers. Used in oracle service to predict quorum locally
+    * @return lastEra - last reported era, variants are related to this era
+    * @return isPushed - true if report for ledger with the same index (see `getStashAccounts`) is already pushed
+    * @return variants - report hashes with vote counter in the last byte for each ledger
+    */
+    function getReportVariants()
+        external
+        view
+        returns (
+            uint64 lastEra,
+            bool[] memory isPushed,
+            uint256[][] memory variants
+        )
+    {
+        lastEra = eraId;
+        address[] memory ledgers = ILido(LIDO).getLedgerAddresses();
+        isPushed = new bool[](ledgers.length);
+        variants = new uint256[][](ledgers.length);
+
+        for (uint256 i = 0; i < ledgers.length; ++i) {
+            address oracle = oracleForLedger[ledgers[i]];
+            if (oracle != address(0)) {
+                (isPushed[i], variants[i]) = IOracle(oracle).getReportVariants();
+            }
+        }
+    }
+
     /**
     * @notice Stop pool routine operations (reportRelay), allowed to call only by ROLE_PAUSE_MANAGER
     */
@@ -208,8 +289,11 @@ contract OracleMaster is Pausable {
         require(_member != address(0), "OM: BAD_ARGUMENT");
         require(_getMemberId(_member) == MEMBER_NOT_FOUND, "OM: MEMBER_EXISTS");
         require(members.length < MAX_MEMBERS, "OM: MEMBERS_TOO_MANY");
+        // oracle template can support less members, see OraclePacked
+        require(members.length < IOracle(ORACLE_CLONE).MAX_MEMBERS(), "OM: MEMBERS_TOO_MANY");
 
         members.push(_member);
+        memberIndexPlusOne[_member] = members.length;
         emit MemberAdded(_member);
     }
 
@@ -220,23 +304,61 @@ contract OracleMaster is Pausable {
         uint256 index = _getMemberId(_member);
         require(index != MEMBER_NOT_FOUND, "OM: MEMBER_NOT_FOUND");
         uint256 last = members.length - 1;
-        if (index != last) members[index] = members[last];
+        if (index != last) {
+            address moved = members[last];
+            members[index] = moved;
+            memberIndexPlusOne[moved] = index + 1;
+        }
         members.pop();
+        delete memberIndexPlusOne[_member];
         emit MemberRemoved(_member);
 
+        // the moved member gets index of removed one, so oracles report bitmasks are not valid anymore:
         // delete the data for the last eraId, let remained oracles report it again
         _clearReporting();
     }
 
+    /**
+    * @notice Build member index for members added before upgrade and replace oracles of all ledgers
+    *         with clones of `_oracleClone`, allowed to call only once by proxy admin
+    * @dev Must be called in the upgrade transaction with ProxyAdmin.upgradeAndCall, reports fail with
+    *      OM: MEMBER_NOT_FOUND until members are indexed. Oracles of the previous version expect OracleMaster
+    *      to clear them on era change, so they are replaced. Votes of the current era which didn't get quorum
+    *      are dropped and members report them again, oracles which already pushed the era keep it pushed.
+    * @param _oracleClone - oracle clone template of the current version
+    */
+    function migrateOracles(address _oracleClone) external {
+        require(msg.sender == StorageSlot.getAddressSlot(PROXY_ADMIN_SLOT).value, "OM: NOT_PROXY_ADMIN");
+        require(storageVersion < STORAGE_VERSION, "OM: ALREADY_MIGRATED");
+        require(_oracleClone != address(0), "OM: INCORRECT_CLONE_ADDRESS");
+        uint256 length = members.length;
+        require(length <= IOracle(_oracleClone).MAX_MEMBERS(), "OM: MEMBERS_TOO_MANY");
+        require(QUORUM <= IOracle(_oracleClone).MAX_MEMBERS(), "OM: INCORRECT_QUORUM");
+        storageVersion = STORAGE_VERSION;
+        ORACLE_CLONE = _oracleClone;
+
+        for (uint256 i = 0; i < length; ++i) {
+            memberIndexPlusOne[members[i]] = i + 1;
+        }
+
+        address[] memory ledgers = ILido(LIDO).getLedgerAddresses();
+        uint256 ledgersLength = ledgers.length;
+        for (uint256 i = 0; i < ledgersLength; ++i) {
+            bool pushed = IOracle(oracleForLedger[ledgers[i]]).isPushed();
+            IOracle newOracle = _addOracle(ledgers[i]);
+            if (pushed) {
+                newOracle.markPushed(eraId);
+            }
+        }
+    }
+
     /**
     * @notice Add ledger to oracle set, allowed to call only by lido contract
     * @param _ledger Ledger contract
     */
     function addLedger(address _ledger) external onlyLido {
         require(ORACLE_CLONE != address(0), "OM: ORACLE_CLONE_UNINITIALIZED");
-        IOracle newOracle = IOracle(ORACLE_CLONE.cloneDeterministic(bytes32(uint256(uint160(_ledger)) << 96)));
-        newOracle.initialize(address(this), _ledger);
-        oracleForLedger[_ledger] = address(newOracle);
+        _addOracle(_ledger);
     }
 
     /**
@@ -258,20 +380,43 @@ contract OracleMaster is Pausable {
         uint256 memberIndex = _getMemberId(msg.sender);
         require(memberIndex != MEMBER_NOT_FOUND, "OM: MEMBER_NOT_FOUND");
 
-        address ledger = ILido(LIDO).findLedger(_report.stashAccount);
-        address oracle = oracleForLedger[ledger];
-        require(oracle != address(0), "OM: ORACLE_FOR_LEDGER_NOT_FOUND");
-        require(_eraId >= eraId, "OM: ERA_TOO_OLD");
+        address oracle = _getOracleForStash(_report.stashAccount);
+        _startEra(_eraId);
 
-        // new era
-        if (_eraId > eraId) {
-            require(_eraId <= _getCurrentEraId(), "OM: UNEXPECTED_NEW_ERA");
-            eraId = _eraId;
-            _clearReporting();
-            ILido(LIDO).flushStakes();
+        IOracle(oracle).reportRelay(memberIndex, QUORUM, _eraId, _report);
+    }
+
+    /**
+    * @notice Accept oracle committee member reports for many ledgers in one transaction
+    * @dev Every report is checked and voted the same way as by reportRelay, member lookup and
+    *      era transition are done once. Any failed report reverts the whole batch.
+    * @param _eraId relaychain era
+    * @param _reports relaychain data reports, one per ledger
+    */
+    function reportRelayBatch(uint64 _eraId, Types.OracleData[] calldata _reports) external whenNotPaused {
+        uint256 memberIndex = _getMemberId(msg.sender);
+        require(memberIndex != MEMBER_NOT_FOUND, "OM: MEMBER_NOT_FOUND");
+
+        _startEra(_eraId);
+
+        uint8 quorum = QUORUM;
+        uint256 _length = _reports.length;
+        for (uint256 i = 0; i < _length; ++i) {
+            require(_reports[i].isConsistent(), "OM: INCORRECT_REPORT");
+            address oracle = _getOracleForStash(_reports[i].stashAccount);
+            IOracle(oracle).reportRelay(memberIndex, quorum, _eraId, _reports[i]);
         }
+    }
 
-        IOracle(oracle).reportRelay(memberIndex, QUORUM, _eraId, _report);
+    /**
+    * @notice Push report which reached quorum after QUORUM lowering by setQuorum.
+    *         Oracles keep only report hashes, so report data is submitted again by any member.
+    * @param _report relaychain data report, its hash must match the variant which got quorum
+    */
+    function pushQuorumReport(Types.OracleData calldata _report) external whenNotPaused {
+        require(_getMemberId(msg.sender) != MEMBER_NOT_FOUND, "OM: MEMBER_NOT_FOUND");
+        address oracle = _getOracleForStash(_report.stashAccount);
+        IOracle(oracle).pushQuorumReport(eraId, _report);
     }
 
     /**
@@ -289,6 +434,8 @@ contract OracleMaster is Pausable {
         ANCHOR_ERA_ID = _anchorEraId;
         ANCHOR_TIMESTAMP = _anchorTimestamp;
         SECONDS_PER_ERA = _secondsPerEra;
+
+        emit AnchorEraChanged(_anchorEraId, _anchorTimestamp, _secondsPerEra);
     }
 
     /**
@@ -297,13 +444,44 @@ contract OracleMaster is Pausable {
     * @return member index
     */
     function _getMemberId(address _member) internal view returns (uint256) {
-        uint256 length = members.length;
-        for (uint256 i = 0; i < length; ++i) {
-            if (members[i] == _member) {
-                return i;
-            }
+        uint256 indexPlusOne = memberIndexPlusOne[_member];
+        return indexPlusOne == 0 ? MEMBER_NOT_FOUND : indexPlusOne - 1;
+    }
+
+    /**
+    * @notice Clone oracle for ledger from ORACLE_CLONE template
+    * @param _ledger ledger contract
+    */
+    function _addOracle(address _ledger) internal returns (IOracle newOracle) {
+        newOracle = IOracle(ORACLE_CLONE.cloneDeterministic(bytes32(uint256(uint160(_ledger)) << 96)));
+        newOracle.initialize(address(this), _ledger);
+        oracleForLedger[_ledger] = address(newOracle);
+    }
+
+    /**
+    * @notice Return oracle of ledger with given stash account, reverts if ledger is not found
+    */
+    function _getOracleForStash(bytes32 _stashAccount) internal view returns (address) {
+        address ledger = ILido(LIDO).findLedger(_stashAccount);
+        address oracle = oracleForLedger[ledger];
+        require(oracle != address(0), "OM: ORACLE_FOR_LEDGER_NOT_FOUND");
+        return oracle;
+    }
+
+    /**
+    * @notice Check reported era and switch to it if it is new
+    * @dev Lido stakes are flushed on era change, oracles clear reporting data of the previous era
+    *      on their first report of the new era, so the transition cost doesn't depend on ledgers count
+    */
+    function _startEra(uint64 _eraId) internal {
+        require(_eraId >= eraId, "OM: ERA_TOO_OLD");
+
+        // new era
+        if (_eraId > eraId) {
+            require(_eraId <= _getCurrentEraId(), "OM: UNEXPECTED_NEW_ERA");
+            eraId = _eraId;
+            ILido(LIDO).flushStakes();
         }
-        return MEMBER_NOT_FOUND;
     }
 
     /**
@@ -316,7 +494,8 @@ contract OracleMaster is Pausable {
     }
 
     /**
-    * @notice Delete interim data for current Era, free storage memory for each oracle
+    * @notice Delete interim data for current Era, free storage memory for each oracle.
+    *         Used on member removal only, era transitions are handled by oracles lazily
     */
     function _clearReporting() internal {
         address[] memory ledgers = ILido(LIDO).getLedgerAddresses();
@@ -0,0 +1,277 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+import "../interfaces/Types.sol";
+import "../interfaces/ILedger.sol";
+import "../interfaces/IOracleMaster.sol";
+
+import "./utils/ReportUtils.sol";
+
+
+/**
+* @notice Oracle clone template for small committees (up to MAX_MEMBERS members).
+*         Reporting state lives in one storage word, so a vote for an existing variant
+*         reads and writes one slot, and era reset is a single slot write.
+*
+*         Reporting state layout (bits):
+*           0..63    - era of reporting data
+*           64       - is pushed flag
+*           72..79   - number of variants
+*           80..87   - index of variant which got quorum after quorum lowering plus one, zero if none
+*           96..111  - reported members bitmask
+*           128..255 - vote counters, 8 bits per variant
+*/
+contract OraclePacked {
+    event Completed(uint256);
+
+    /// Maximum number of oracle members, limited by the bitmask width
+    uint256 public constant MAX_MEMBERS = 16;
+
+    uint256 internal constant ERA_MASK = type(uint64).max;
+    uint256 internal constant PUSHED_BIT = 1 << 64;
+    uint256 internal constant VARIANTS_OFFSET = 72;
+    uint256 internal constant QUORUM_VARIANT_OFFSET = 80;
+    uint256 internal constant BITMASK_OFFSET = 96;
+    uint256 internal constant COUNTERS_OFFSET = 128;
+
+    // Packed reporting state, see layout above
+    uint256 internal reportState;
+
+    // Report hashes of the current era, only first `variants` items are valid, the rest is garbage of previous eras
+    uint256[MAX_MEMBERS] internal variantHashes;
+
+    // oracle master contract address
+    address public ORACLE_MASTER;
+
+    // linked ledger contract address
+    address public LEDGER;
+
+    // Allows function calls only from OracleMaster
+    modifier onlyOracleMaster() {
+        require(msg.sender == ORACLE_MASTER);
+        _;
+    }
+
+    /**
+    * @notice Initialize oracle contract
+    * @param _oracleMaster oracle master address
+    * @param _ledger linked ledger address
+    */
+    function initialize(address _oracleMaster, address _ledger) external {
+        require(ORACLE_MASTER == address(0), "ORACLE: ALREADY_INITIALIZED");
+        ORACLE_MASTER = _oracleMaster;
+        LEDGER = _ledger;
+    }
+
+    /**
+    * @notice Returns era of the current reporting data
+    */
+    function reportingEra() external view returns (uint64) {
+        return uint64(reportState & ERA_MASK);
+    }
+
+    /**
+    * @notice Returns true if report for the current reporting era is already pushed to ledger
+    */
+    function isPushed() external view returns (bool) {
+        return reportState & PUSHED_BIT != 0;
+    }
+
+    /**
+    * @notice Returns variant which got quorum after quorum lowering and waits for report data, zero if none
+    */
+    function quorumVariant() external view returns (uint256) {
+        uint256 quorumIndex = _getQuorumVariantIndex(reportState);
+        return quorumIndex == 0 ? 0 : variantHashes[quorumIndex - 1];
+    }
+
+    /**
+    * @notice Returns true if member is already reported
+    * @param _index oracle member index
+    * @return is reported indicator
+    */
+    function isReported(uint256 _index) external view returns (bool) {
+        uint256 state = reportState;
+        return _index < MAX_MEMBERS && _isCurrentEra(state) && (state & (uint256(1) << (BITMASK_OFFSET + _index))) != 0;
+    }
+
+    /**
+    * @notice Returns current report variants
+    * @return isPushed - true if report is already pushed to ledger
+    * @return variants - report hashes, the last byte of each is vote counter (see ReportUtils)
+    */
+    function getReportVariants() external view returns (bool, uint256[] memory) {
+        uint256 state = reportState;
+        if (!_isCurrentEra(state)) {
+            return (false, new uint256[](0));
+        }
+        uint256 _length = _getVariantsCount(state);
+        uint256[] memory variants = new uint256[](_length);
+        for (uint256 i = 0; i < _length; ++i) {
+            variants[i] = variantHashes[i] | _getCount(state, i);
+        }
+        return (state & PUSHED_BIT != 0, variants);
+    }
+
+    /**
+    * @notice Accept oracle report data, allowed to call only by oracle master contract
+    * @param _index oracle member index
+    * @param _quorum the minimum number of voted oracle members to accept a variant
+    * @param _eraId current era id
+    * @param _staking report data
+    */
+    function reportRelay(uint256 _index, uint256 _quorum, uint64 _eraId, Types.OracleData calldata _staking) external onlyOracleMaster {
+        require(_index < MAX_MEMBERS, "ORACLE: MEMBER_INDEX_TOO_BIG");
+        uint256 state = reportState;
+        // the first report of a new era, previous era hashes are left as is
+        if (uint64(state & ERA_MASK) != _eraId) {
+            state = _eraId;
+        }
+
+        uint256 mask = uint256(1) << (BITMASK_OFFSET + _index);
+        require(state & mask == 0, "ORACLE: ALREADY_SUBMITTED");
+        state |= mask;
+
+        // return instantly if already got quorum and pushed data
+        if (state & PUSHED_BIT != 0) {
+            reportState = state;
+            return;
+        }
+
+        // convert staking report into 31 byte hash. The last byte is used for vote counting
+        uint256 variant = _getVariant(_staking);
+        uint256 quorumIndex = _getQuorumVariantIndex(state);
+        if (quorumIndex != 0 && variantHashes[quorumIndex - 1] == variant) {
+            reportState = state | PUSHED_BIT;
+            _push(_eraId, _staking);
+            return;
+        }
+
+        uint256 i = 0;
+        uint256 _length = _getVariantsCount(state);
+        // every member votes once, so variants count is limited by MAX_MEMBERS
+        while (i < _length && variantHashes[i] != variant) ++i;
+        if (i == _length) {
+            variantHashes[i] = variant;
+            state += uint256(1) << VARIANTS_OFFSET;
+        }
+
+        if (_getCount(state, i) + 1 >= _quorum) {
+            reportState = state | PUSHED_BIT;
+            _push(_eraId, _staking);
+        } else {
+            // increment variant counter, the only storage write of repeated vote
+            reportState = state + (uint256(1) << (COUNTERS_OFFSET + 8 * i));
+        }
+    }
+
+    /**
+    * @notice Change quorum threshold, allowed to call only by oracle master contract
+    * @dev Variant which reached the new threshold is marked to be pushed with pushQuorumReport
+    * @param _quorum new quorum threshold
+    * @param _eraId current era id
+    */
+    function softenQuorum(uint8 _quorum, uint64 _eraId) external onlyOracleMaster {
+        uint256 state = reportState;
+        // reports of previous eras are never pushed
+        if (uint64(state & ERA_MASK) != _eraId || state & PUSHED_BIT != 0) {
+            return;
+        }
+        (bool isQuorum, uint256 reportIndex) = _getQuorumReport(state, _quorum);
+        if (isQuorum) {
+            // report data isn't stored, it has to be resubmitted with pushQuorumReport
+            state &= ~(uint256(0xFF) << QUORUM_VARIANT_OFFSET);
+            reportState = state | ((reportIndex + 1) << QUORUM_VARIANT_OFFSET);
+        }
+    }
+
+    /**
+    * @notice Push report which got quorum after quorum lowering, allowed to call only by oracle master contract
+    * @param _eraId current era id
+    * @param _staking report data, its hash must be equal to the quorum variant
+    */
+    function pushQuorumReport(uint64 _eraId, Types.OracleData calldata _staking) external onlyOracleMaster {
+        uint256 state = reportState;
+        require(uint64(state & ERA_MASK) == _eraId && state & PUSHED_BIT == 0, "ORACLE: NOTHING_TO_PUSH");
+        uint256 quorumIndex = _getQuorumVariantIndex(state);
+        require(quorumIndex != 0 && variantHashes[quorumIndex - 1] == _getVariant(_staking), "ORACLE: NOT_QUORUM_REPORT");
+        reportState = state | PUSHED_BIT;
+        _push(_eraId, _staking);
+    }
+
+    /**
+    * @notice Clear data about current reporting, allowed to call only by oracle master contract
+    */
+    function clearReporting() external onlyOracleMaster {
+        reportState &= ERA_MASK;
+    }
+
+    /**
+    * @notice Mark report of `_eraId` as pushed, allowed to call only by oracle master contract
+    * @dev Used when oracle replaces one which already pushed report of the era, see OracleMaster.migrateOracles
+    * @param _eraId current era id
+    */
+    function markPushed(uint64 _eraId) external onlyOracleMaster {
+        reportState = uint256(_eraId) | PUSHED_BIT;
+    }
+
+    /**
+    * @notice Returns true if reporting data belongs to the current OracleMaster era
+    */
+    function _isCurrentEra(uint256 _state) internal view returns (bool) {
+        return uint64(_state & ERA_MASK) == IOracleMaster(ORACLE_MASTER).eraId();
+    }
+
+    /**
+    * @notice Returns 31 byte report hash, the last byte is reserved for vote counting
+    */
+    function _getVariant(Types.OracleData calldata _staking) internal pure returns (uint256) {
+        return uint256(keccak256(abi.encode(_staking))) & ReportUtils.COUNT_OUTMASK;
+    }
+
+    function _getVariantsCount(uint256 _state) internal pure returns (uint256) {
+        return uint8(_state >> VARIANTS_OFFSET);
+    }
+
+    function _getQuorumVariantIndex(uint256 _state) internal pure returns (uint256) {
+        return uint8(_state >> QUORUM_VARIANT_OFFSET);
+    }
+
+    function _getCount(uint256 _state, uint256 _index) internal pure returns (uint256) {
+        return uint8(_state >> (COUNTERS_OFFSET + 8 * _index));
+    }
+
+    /**
+    * @notice Push data to ledger
+    */
+    function _push(uint64 _eraId, Types.OracleData calldata report) internal {
+        ILedger(LEDGER).pushData(_eraId, report);
+        emit Completed(_eraId);
+    }
+
+    /**
+    * @notice Return whether the `_quorum` is reached and the final report can be pushed
+    */
+    function _getQuorumReport(uint256 _state, uint256 _quorum) internal pure returns (bool, uint256) {
+        uint256 _length = _getVariantsCount(_state);
+        if (_length == 0) {
+            return (false, type(uint256).max);
+        }
+
+        // choose the most frequent variant, ties aren't pushed
+        uint256 maxind = 0;
+        uint256 repeat = 0;
+        uint256 maxval = 0;
+        for (uint256 i = 0; i < _length; ++i) {
+            uint256 cur = _getCount(_state, i);
+            if (cur > maxval) {
+                maxind = i;
+                maxval = cur;
+                repeat = 0;
+            } else if (cur == maxval) {
+                ++repeat;
+            }
+        }
+        return (maxval >= _quorum && repeat == 0, maxind);
+    }
+}
@@ -82,12 +82,22 @@ contract RelayEncoder is IRelayEncoder {
     // @param blocked: Whether or not the validator is accepting more nominations
     // @returns The bytes associated with the encoded call
     function encode_nominate(uint256 [] memory nominees) external override view returns (bytes memory) {
-        if (nominees.length == 0) {
-            return bytes.concat(chain, hex"0500");
+        // every nominee is encoded as MultiAddress::Id, i.e. 00 prefix and 32 bytes account id,
+        // so the whole call is written into single buffer instead of growing concatenation
+        bytes memory header = bytes.concat(chain, hex"05", nominees.length.scaleCompactUint());
+        uint256 headerLength = header.length;
+        bytes memory result = new bytes(headerLength + 33 * nominees.length);
+        for (uint256 i = 0; i < headerLength; ++i) {
+            result[i] = header[i];
         }
-        bytes memory result = bytes.concat(chain, hex"05", nominees.length.scaleCompactUint());
+
         for (uint256 i = 0; i < nominees.length; ++i) {
-            result = bytes.concat(result, hex"00", bytes32(nominees[i]));
+            uint256 nominee = nominees[i];
+            // result is zero filled, so only account id is written after the prefix byte
+            uint256 offset = headerLength + 33 * i + 1;
+            assembly {
+                mstore(add(add(result, 32), offset), nominee)
+            }
         }
         return result;
     }
@@ -0,0 +1,12 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+
+// Contract which emits event with the same signature as Oracle, but isn't oracle of any ledger
+contract Completed_mock {
+    event Completed(uint256);
+
+    function complete(uint256 _eraId) external {
+        emit Completed(_eraId);
+    }
+}
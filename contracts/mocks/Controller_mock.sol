@@ -63,6 +63,10 @@ contract Controller_mock {
         senderToAccount[paraAddress] = accountId;
     }
 
+    function deleteSubAccount(address paraAddress) external {
+        delete senderToAccount[paraAddress];
+    }
+
     function getSenderAccount() internal returns(bytes32) {
         return senderToAccount[msg.sender];
     }
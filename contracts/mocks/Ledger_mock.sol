@@ -20,6 +20,9 @@ contract LedgerMock {
         LIDO = ILido(_lido);
     }
 
+    function refreshAllowances() external {
+    }
+
     function distributeRewards(uint256 _totalRewards, uint256 _balance) external {
         LIDO.distributeRewards(_totalRewards, _balance);
     }
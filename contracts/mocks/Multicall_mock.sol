@@ -0,0 +1,29 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+pragma abicoder v2;
+
+
+contract Multicall_mock {
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    /**
+    * @notice Execute batch of view calls in one eth_call, failed calls don't revert whole batch
+    * @param _calls - list of target and encoded call data
+    * @return results - success flag and raw return data for every call
+    */
+    function tryAggregate(Call[] calldata _calls) external view returns (Result[] memory results) {
+        results = new Result[](_calls.length);
+        for (uint256 i = 0; i < _calls.length; ++i) {
+            (bool success, bytes memory data) = _calls[i].target.staticcall(_calls[i].callData);
+            results[i] = Result(success, data);
+        }
+    }
+}
@@ -9,43 +9,58 @@ library Encoding {
     */
     function toLeBytes(uint256 value, uint256 len) internal pure returns(bytes memory) {
         bytes memory out = new bytes(len);
-        for (uint256 idx = 0; idx < len; ++idx) {
-            out[idx] = bytes1(uint8(value));
-            value = value >> 8;
+        unchecked {
+            for (uint256 idx = 0; idx < len; ++idx) {
+                out[idx] = bytes1(uint8(value));
+                value = value >> 8;
+            }
         }
         return out;
     }
 
     /**
     * @notice Converting uint256 value to bytes
+    * @dev Single byte, two and four byte modes are packed from the shifted value without loops
     * @param value - uint256 value
     */
     function scaleCompactUint(uint256 value) internal pure returns(bytes memory) {
-        if (value < 1<<6) {
-            return toLeBytes(value << 2, 1);
+        if (value < 1 << 6) {
+            return abi.encodePacked(uint8(value << 2));
         }
-        else if(value < 1 << 14) {
-            return toLeBytes((value << 2) + 1, 2);
+        if (value < 1 << 14) {
+            uint256 v = (value << 2) | 1;
+            return abi.encodePacked(uint8(v), uint8(v >> 8));
         }
-        else if(value < 1 << 30) {
-            return toLeBytes((value << 2) + 2, 4);
+        if (value < 1 << 30) {
+            uint256 v = (value << 2) | 2;
+            return abi.encodePacked(uint8(v), uint8(v >> 8), uint8(v >> 16), uint8(v >> 24));
         }
-        else {
-            uint256 numBytes = 0;
-            {
-                uint256 m = value;
-                for (; numBytes < 256 && m != 0; ++numBytes) {
-                    m = m >> 8;
-                }
-            }
 
-            bytes memory out = new bytes(numBytes + 1);
+        uint256 numBytes = _bytesLength(value);
+        bytes memory out = new bytes(numBytes + 1);
+        unchecked {
             out[0] = bytes1(uint8(((numBytes - 4) << 2) + 3));
-            for (uint256 i = 0; i < numBytes; ++i) {
-                out[i + 1] = bytes1(uint8(value & 0xFF));
+            for (uint256 i = 1; i <= numBytes; ++i) {
+                out[i] = bytes1(uint8(value));
                 value = value >> 8;
             }
-            return out;
+        }
+        return out;
+    }
+
+    /**
+    * @notice Return number of significant bytes of value
+    * @param value - uint256 value
+    */
+    function _bytesLength(uint256 value) private pure returns(uint256 numBytes) {
+        // binary search over byte boundaries instead of shifting byte by byte
+        unchecked {
+            if (value >> 128 != 0) { value >>= 128; numBytes += 16; }
+            if (value >> 64 != 0) { value >>= 64; numBytes += 8; }
+            if (value >> 32 != 0) { value >>= 32; numBytes += 4; }
+            if (value >> 16 != 0) { value >>= 16; numBytes += 2; }
+            if (value >> 8 != 0) { value >>= 8; numBytes += 1; }
+            if (value != 0) { numBytes += 1; }
         }
     }
-}
\ No newline at end of file
+}
@@ -0,0 +1,8 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.0;
+
+interface ILedgerBeacon {
+    function latestRevision() external view returns (uint256);
+
+    function setCurrentRevision(uint256 _newCurrentRevision) external;
+}
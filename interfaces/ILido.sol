@@ -16,6 +16,10 @@ interface ILido {
 
     function getLedgerAddresses() external view returns (address[] memory);
 
+    function getLedgers(uint256 offset, uint256 limit) external view returns (uint256 version, uint256 total, Types.LedgerInfo[] memory ledgers);
+
+    function ledgersVersion() external view returns (uint256);
+
     function ledgerStake(address ledger) external view returns (uint256);
 
     function transferFromLedger(uint256 amount, uint256 excess) external;
@@ -24,6 +28,8 @@ interface ILido {
 
     function transferToLedger(uint256 amount) external;
 
+    function reportDownwardTransfer(uint256 amount) external;
+
     function flushStakes() external;
 
     function findLedger(bytes32 stash) external view returns (address);
@@ -10,7 +10,17 @@ interface IOracle {
 
     function softenQuorum(uint8 quorum, uint64 _eraId) external;
 
+    function pushQuorumReport(uint64 eraId, Types.OracleData calldata staking) external;
+
     function clearReporting() external;
 
+    function markPushed(uint64 eraId) external;
+
+    function isPushed() external view returns (bool);
+
+    function MAX_MEMBERS() external view returns (uint256);
+
     function isReported(uint256 index) external view returns (bool);
+
+    function getReportVariants() external view returns (bool isPushed, uint256[] memory variants);
 }
\ No newline at end of file
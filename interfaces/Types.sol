@@ -48,6 +48,17 @@ interface Types {
         uint32 slashingSpans;
     }
 
+    struct LedgerInfo {
+        address ledger;
+        bytes32 stashAccount;
+        // active stake on the ledger
+        uint128 stake;
+        // total amount of funds in the ledger
+        uint128 borrow;
+        // Lido ledger flags: 1 - exists, 2 - enabled, 4 - paused
+        uint8 status;
+    }
+
     struct RelaySpec {
         uint16 maxValidatorsPerLedger;
         uint128 minNominatorBalance;
@@ -0,0 +1,141 @@
+import sys
+import shutil
+import random
+from pathlib import Path
+from brownie import *
+
+# scenario utilities and relay chain mock are shared with tests
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tests"))
+from helpers import RelayChain
+from scenarios import scenario_path, holder_account, relaunch_rpc, save_scenario, CHAIN_DB
+
+
+project.load(Path.home() / ".brownie" / "packages" / config["dependencies"][0])
+if hasattr(project, 'OpenzeppelinContracts410Project'):
+    OpenzeppelinContractsProject = project.OpenzeppelinContracts410Project
+else:
+    OpenzeppelinContractsProject = project.OpenzeppelinContractsProject
+
+
+# named scenarios
+SCENARIOS = {
+    'small': {'ledgers': 10, 'holders': 100, 'eras': 10},
+    'large': {'ledgers': 100, 'holders': 1000, 'eras': 50},
+}
+
+ERA_SEC = 60 * 60 * 6
+HOLDER_BALANCE = 10**4 * 10**18
+DEPOSIT_CAP = 10**8 * 10**18
+
+
+def deploy_with_proxy(contract, proxy_admin, *args):
+    owner = proxy_admin.owner()
+    logic_instance = contract.deploy({'from': owner})
+    encoded_inputs = logic_instance.initialize.encode_input(*args)
+
+    proxy_instance = OpenzeppelinContractsProject.TransparentUpgradeableProxy.deploy(
+        logic_instance,
+        proxy_admin,
+        encoded_inputs,
+        {'from': owner, 'gas_limit': 10**6}
+    )
+
+    OpenzeppelinContractsProject.TransparentUpgradeableProxy.remove(proxy_instance)
+    return (contract.at(proxy_instance.address, owner=owner), logic_instance)
+
+
+def deploy_protocol(admin):
+    '''
+    Deploy the same protocol setup as tests fixtures do (see tests/conftest.py)
+    '''
+    proxy_admin = OpenzeppelinContractsProject.ProxyAdmin.deploy({'from': admin})
+    vksm = vKSM_mock.deploy({'from': admin})
+
+    (auth_manager, _) = deploy_with_proxy(AuthManager, proxy_admin, admin)
+    for role in ('ROLE_SPEC_MANAGER', 'ROLE_BEACON_MANAGER', 'ROLE_PAUSE_MANAGER', 'ROLE_FEE_MANAGER',
+                 'ROLE_LEDGER_MANAGER', 'ROLE_STAKE_MANAGER', 'ROLE_ORACLE_MEMBERS_MANAGER',
+                 'ROLE_ORACLE_QUORUM_MANAGER', 'ROLE_SET_TREASURY', 'ROLE_SET_DEVELOPERS'):
+        auth_manager.addByString(role, admin, {'from': admin})
+
+    oracle_clone = Oracle.deploy({'from': admin})
+    oracle_master = OracleMaster.deploy({'from': admin})
+    oracle_master.initialize(oracle_clone, 1, {'from': admin})
+
+    withdrawal = Withdrawal.deploy({'from': admin})
+    withdrawal.initialize(35, vksm, {'from': admin})
+
+    controller = Controller_mock.deploy({'from': admin})
+    developers = accounts.add()
+    treasury = accounts.add()
+
+    ledger_clone = Ledger.deploy({'from': admin})
+    (lido, lido_impl) = deploy_with_proxy(
+        Lido, proxy_admin, auth_manager, vksm, controller, developers, treasury,
+        oracle_master, withdrawal, DEPOSIT_CAP, 3000
+    )
+    ledger_beacon = LedgerBeacon.deploy(ledger_clone, lido, {'from': admin})
+    ledger_factory = LedgerFactory.deploy(lido, ledger_beacon, {'from': admin})
+    lido.setLedgerBeacon(ledger_beacon, {'from': admin})
+    lido.setLedgerFactory(ledger_factory, {'from': admin})
+
+    owner = proxy_admin.owner()
+    lido_token = LidoToken.deploy({'from': admin})
+    proxy_admin.upgrade(lido, lido_token, {'from': owner})
+    LidoToken.at(lido, owner=admin).setTokenInfo("TST", "TST", 12, {'from': admin})
+    proxy_admin.upgrade(lido, lido_impl, {'from': owner})
+    lido = Lido.at(lido, owner=admin)
+
+    lido.setRelaySpec((16, 1, 0, 32), {'from': admin})
+    oracle_master.setAnchorEra(0, chain.time(), ERA_SEC, {'from': admin})
+
+    return {
+        'lido': lido,
+        'vKSM': vksm,
+        'oracle_master': oracle_master,
+        'withdrawal': withdrawal,
+        'controller': controller,
+    }
+
+
+def build(name, params):
+    print(f"Building scenario '{name}': {params}")
+    path = scenario_path(name)
+    shutil.rmtree(path, ignore_errors=True)
+    (path / CHAIN_DB).mkdir(parents=True)
+    relaunch_rpc(path / CHAIN_DB)
+
+    admin = accounts[0]
+    contracts = deploy_protocol(admin)
+    lido = contracts['lido']
+    vksm = contracts['vKSM']
+
+    relay = RelayChain(lido, vksm, contracts['oracle_master'], accounts, chain)
+    stashes = [hex(0x10 * (i + 1)) for i in range(params['ledgers'])]
+    relay.new_ledgers(stashes, [hex(int(stash, 16) + 1) for stash in stashes])
+
+    holders = [holder_account(name, i) for i in range(params['holders'])]
+    for holder in holders:
+        vksm.transfer(holder, HOLDER_BALANCE, {'from': admin})
+        vksm.approve(lido, 2**255, {'from': holder})
+
+    # the same history for every build of a scenario
+    rnd = random.Random(name)
+    for era in range(params['eras']):
+        for holder in rnd.sample(holders, max(1, len(holders) // params['eras'])):
+            lido.deposit(rnd.randint(1, 100) * 10**18, {'from': holder})
+        rewards = [rnd.randint(0, 10**18) for _ in relay.ledgers]
+        relay.new_era(rewards)
+        print(f"Era {relay.era} is reported, total pooled: {lido.getTotalPooledKSM()}")
+
+    save_scenario(name, params, contracts, relay, len(holders))
+    relaunch_rpc()
+    print(f"Scenario '{name}' is saved to {path}")
+
+
+def main(name='large'):
+    '''
+    Build scenario chain state once and save it to disk, usage:
+        brownie run build_scenario main large
+    Tests load saved scenarios with `scenario` fixture.
+    '''
+    build(name, SCENARIOS[name])
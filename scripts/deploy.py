@@ -9,6 +9,10 @@ import yaml
 from pathlib import Path
 from colorama import Fore, Back, Style, init
 import os
+import asyncio
+import aiohttp
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.submitter import Submitter
 
 init(autoreset=True)
 
@@ -63,6 +67,8 @@ DEPLOYMENTS = load_deployments(NETWORK)
 CONFS = 1
 GAS_PRICE = "100 gwei"
 GAS_LIMIT = 10*10**6
+# ledgers added by one transaction
+LEDGERS_BATCH_SIZE = 10
 
 
 
@@ -75,6 +81,40 @@ def get_opts(sender, gas_price=GAS_PRICE, gas_limit=GAS_LIMIT):
     return {'from': sender, 'gas_price': gas_price, 'gas_limit': gas_limit}
 
 
+def send_pipelined(calls):
+    '''
+    Send list of independent (sender, contract method, args) calls. Transactions of one sender are
+    signed with local nonces, broadcast in one batch and awaited together; senders without
+    local key (e.g. node-unlocked accounts) fall back to sequential brownie transactions
+    '''
+    by_sender = {}
+    for (sender, method, args) in calls:
+        by_sender.setdefault(str(sender), []).append((method, args))
+
+    async def send_all():
+        async with aiohttp.ClientSession() as session:
+            rpc = JsonRpc(session, web3.provider.endpoint_uri)
+            submitters = [
+                Submitter(rpc, accounts.at(sender).private_key, GAS_LIMIT, gas_price=Wei(GAS_PRICE))
+                for sender in local
+            ]
+            return await asyncio.gather(*[
+                submitter.send_batch([(method._address, method.encode_input(*args)) for (method, args) in by_sender[sender]])
+                for (submitter, sender) in zip(submitters, local)
+            ])
+
+    local = [sender for sender in by_sender if hasattr(accounts.at(sender), 'private_key')]
+    for sender in by_sender:
+        if sender not in local:
+            for (method, args) in by_sender[sender]:
+                method(*args, get_opts(sender))
+
+    for (sender, receipts) in zip(local, asyncio.run(send_all()) if len(local) > 0 else []):
+        for ((method, args), receipt) in zip(by_sender[sender], receipts):
+            if receipt is None or int(receipt['status'], 16) != 1:
+                raise Exception(f'{method.abi["name"]}{tuple(args)} from {sender} failed: {receipt}')
+
+
 def get_deployment(container):
     info = container.get_verification_info()
     name = info['contract_name']
@@ -169,8 +209,8 @@ def deploy_auth_manager(deployer, proxy_admin, auth_super_admin):
     return deploy_with_proxy(AuthManager, proxy_admin, deployer, auth_super_admin)
 
 
-def deploy_oracle_clone(deployer):
-    return deploy(Oracle, deployer)
+def deploy_oracle_clone(deployer, packed=False):
+    return deploy(OraclePacked if packed else Oracle, deployer)
 
 
 def deploy_oracle_master(deployer, proxy_admin, oracle_clone, oracle_quorum):
@@ -258,14 +298,16 @@ def main():
 
     auth_manager = deploy_auth_manager(deployer, proxy_admin, auth_super_admin)
 
+    role_calls = []
     for role in roles:
         print(f"{Fore.GREEN}Setting role: {role}")
         if auth_manager.has(web3.solidityKeccak(["string"], [role]), roles[role]):
             print(f"{Fore.YELLOW}Role {role} already setted, skipping..")
         else:
-            auth_manager.addByString(role, roles[role], get_opts(deployer))
+            role_calls.append((deployer, auth_manager.addByString, (role, roles[role])))
+    send_pipelined(role_calls)
 
-    oracle_clone = deploy_oracle_clone(deployer)
+    oracle_clone = deploy_oracle_clone(deployer, CONFIG.get('oracle_packed', False))
 
     oracle_master = deploy_oracle_master(deployer, proxy_admin, oracle_clone, oracle_quorum)
 
@@ -273,14 +315,15 @@ def main():
 
     lido = deploy_lido(deployer, proxy_admin, auth_manager, vksm, controller, treasury, developers, oracle_master, withdrawal, deposit_cap, max_difference)
 
-    lido.setTokenInfo(token_name, token_symbol, token_decimals, get_opts(CONFIG['deployer']))
-
     print(f"\n{Fore.GREEN}Configuring controller...")
-    controller.setLido(lido, get_opts(deployer))
-    controller.setMaxWeight(xcm_max_weight, get_opts(roles['ROLE_CONTROLLER_MANAGER']))
-    controller.setWeights([w | (1<<65) for w in xcm_weights], get_opts(roles['ROLE_CONTROLLER_MANAGER']))
-    controller.setReverseTransferFee(reverse_transfer_fee, get_opts(roles['ROLE_CONTROLLER_MANAGER']))
-    controller.setTransferFee(transfer_fee, get_opts(roles['ROLE_CONTROLLER_MANAGER']))
+    send_pipelined([
+        (deployer, lido.setTokenInfo, (token_name, token_symbol, token_decimals)),
+        (deployer, controller.setLido, (lido,)),
+        (roles['ROLE_CONTROLLER_MANAGER'], controller.setMaxWeight, (xcm_max_weight,)),
+        (roles['ROLE_CONTROLLER_MANAGER'], controller.setWeights, ([w | (1<<65) for w in xcm_weights],)),
+        (roles['ROLE_CONTROLLER_MANAGER'], controller.setReverseTransferFee, (reverse_transfer_fee,)),
+        (roles['ROLE_CONTROLLER_MANAGER'], controller.setTransferFee, (transfer_fee,)),
+    ])
 
     ledger_clone = deploy_ledger_clone(deployer)
 
@@ -289,30 +332,29 @@ def main():
     ledger_factory = deploy_leger_factory(deployer, lido, ledger_beacon)
 
     print(f'\n{Fore.GREEN}Lido configuration...')
-    lido.setLedgerBeacon(ledger_beacon, get_opts(roles['ROLE_BEACON_MANAGER']))
-    lido.setLedgerFactory(ledger_factory, get_opts(roles['ROLE_BEACON_MANAGER']))
-    lido.setRelaySpec((max_validators_per_ledger, min_nominator_bond, min_active_balance, max_unlocking_chunks), get_opts(roles['ROLE_SPEC_MANAGER']))
-    oracle_master.setAnchorEra(0, 1, era_sec, get_opts(roles['ROLE_SPEC_MANAGER']))
+    send_pipelined([
+        (roles['ROLE_BEACON_MANAGER'], lido.setLedgerBeacon, (ledger_beacon,)),
+        (roles['ROLE_BEACON_MANAGER'], lido.setLedgerFactory, (ledger_factory,)),
+        (roles['ROLE_SPEC_MANAGER'], lido.setRelaySpec, ((max_validators_per_ledger, min_nominator_bond, min_active_balance, max_unlocking_chunks),)),
+        (roles['ROLE_SPEC_MANAGER'], oracle_master.setAnchorEra, (0, 1, era_sec)),
+    ])
 
     print(f'\n{Fore.GREEN}Adding oracle members...')
     for oracle in oracles:
         print(f"{Fore.YELLOW}Adding oracle member: {oracle}")
-        oracle_master.addOracleMember(oracle, get_opts(roles['ROLE_ORACLE_MEMBERS_MANAGER']))
+    send_pipelined([(roles['ROLE_ORACLE_MEMBERS_MANAGER'], oracle_master.addOracleMember, (oracle,)) for oracle in oracles])
 
-    ledgers = []
     print(f'\n{Fore.GREEN}Adding ledgers...')
-    for i in range(len(stashes)):
-        s_bytes = ss58decode(stashes[i])
-        print(f"{Fore.GREEN}Added ledger, idx: {stash_idxs[i]} stash: {stashes[i]}")
-        lido.addLedger(s_bytes, s_bytes, stash_idxs[i], get_opts(roles['ROLE_LEDGER_MANAGER']))
-        ledgers.append(lido.findLedger(s_bytes))
+    stashes_bytes = [ss58decode(stash) for stash in stashes]
+    for i in range(0, len(stashes), LEDGERS_BATCH_SIZE):
+        batch = slice(i, i + LEDGERS_BATCH_SIZE)
+        # NOTE: ledgers allowances are refreshed by lido in the same transaction
+        lido.addLedgers(stashes_bytes[batch], stashes_bytes[batch], stash_idxs[batch], get_opts(roles['ROLE_LEDGER_MANAGER']))
+        for (stash, idx) in zip(stashes[batch], stash_idxs[batch]):
+            print(f"{Fore.GREEN}Added ledger, idx: {idx} stash: {stash}")
 
     wStKSM = deploy_wstksm(deployer, lido, vksm, token_decimals)
 
-    for ledger in ledgers:
-        print("Refreshing allowances for ledger:", ledger)
-        Ledger.at(ledger).refreshAllowances(get_opts(roles['ROLE_LEDGER_MANAGER']))
-
     print(f'\n{Fore.GREEN}Sending vKSM to Controller...')
     vksm_contract = vKSM_mock.at(vksm)
     vksm_contract.transfer(controller, CONFIG['controller_initial_balance'], get_opts(deployer))
@@ -0,0 +1,4 @@
+'''
+Oracle service: reads ledgers state from the relay chain and reports it to OracleMaster, usage:
+    python -m scripts.oracle --help
+'''
@@ -0,0 +1,94 @@
+import argparse
+import asyncio
+import logging
+import os
+
+import aiohttp
+
+from .rpc import JsonRpc
+from .relay import RelayClient
+from .parachain import OracleMasterClient
+from .submitter import Submitter, GAS_LIMIT
+from .service import OracleService, POLL_INTERVAL, ERA_MARGIN
+from .metrics import start_metrics_server
+from .store import StateStore
+from .sharding import HashRing, SharedNonceManager, ShardWorker, Coordinator
+from .subscription import SubscriptionTrigger, subscribe_active_era, subscribe_logs
+
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s: %(message)s'
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m scripts.oracle', description='Relay chain oracle member daemon')
+    parser.add_argument('--relay-url', default=os.getenv('RELAY_URL', 'http://localhost:9933'), help='relay chain node HTTP RPC')
+    parser.add_argument('--para-url', default=os.getenv('PARA_URL', 'http://localhost:9944'), help='parachain EVM node HTTP RPC')
+    parser.add_argument('--oracle-master', default=os.getenv('ORACLE_MASTER'), required=os.getenv('ORACLE_MASTER') is None, help='OracleMaster contract address')
+    parser.add_argument('--relay-ws', default=os.getenv('RELAY_WS'), help='relay chain node websocket RPC, enables subscriptions instead of polling')
+    parser.add_argument('--para-ws', default=os.getenv('PARA_WS'), help='parachain EVM node websocket RPC, required with --relay-ws')
+    parser.add_argument('--gas-limit', type=int, default=GAS_LIMIT)
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL, help='seconds between checks while current era is not reported')
+    parser.add_argument('--era-margin', type=float, default=ERA_MARGIN, help='seconds to wait after era boundary')
+    parser.add_argument('--workers', type=int, default=1, help='worker processes, stashes are split between them')
+    parser.add_argument('--state-db', default=os.getenv('ORACLE_STATE_DB'), help='SQLite file to keep state between restarts')
+    parser.add_argument('--metrics-host', default=os.getenv('METRICS_HOST', '127.0.0.1'))
+    parser.add_argument('--metrics-port', type=int, default=os.getenv('METRICS_PORT'), help='serve Prometheus metrics on /metrics, disabled if not set, worker N uses port + N')
+    args = parser.parse_args()
+    if args.relay_ws is not None and args.para_ws is None:
+        parser.error('--para-ws is required with --relay-ws')
+    return args
+
+
+async def main(args, shard=None):
+    '''
+    @param shard - (worker index, shared nonce counter, nonce allocations, rebalance epoch) in worker process, see sharding.Coordinator
+    '''
+    # NOTE: member key is taken only from environment to keep it out of process list
+    private_key = os.environ['ORACLE_PRIVATE_KEY']
+    index = shard[0] if shard is not None else 0
+    store = None
+    if args.state_db is not None:
+        store = StateStore(args.state_db if shard is None else f'{args.state_db}.{index}')
+    async with aiohttp.ClientSession() as session:
+        para_rpc = JsonRpc(session, args.para_url)
+        relay = RelayClient(JsonRpc(session, args.relay_url))
+        oracle_master = OracleMasterClient(para_rpc, args.oracle_master)
+        submitter = Submitter(para_rpc, private_key, args.gas_limit)
+        if shard is None:
+            service = OracleService(relay, oracle_master, submitter, args.poll_interval, args.era_margin, store)
+        else:
+            (_, counter, allocations, epoch) = shard
+            submitter.nonces = SharedNonceManager(counter, allocations, index)
+            service = ShardWorker(
+                relay, oracle_master, submitter, args.poll_interval, args.era_margin, store,
+                HashRing(range(args.workers)), index, epoch,
+            )
+        logging.getLogger(__name__).info("oracle member %s started", service.submitter.address)
+        metrics = None
+        if args.metrics_port is not None:
+            metrics = await start_metrics_server(args.metrics_host, args.metrics_port + index)
+        try:
+            if args.relay_ws is not None:
+                # OracleMaster changes and Lido ledger set changes make service check the current era again
+                addresses = [oracle_master.address, await oracle_master.get_lido()]
+                await SubscriptionTrigger(
+                    service,
+                    subscribe_active_era(session, args.relay_ws),
+                    subscribe_logs(session, args.para_ws, addresses),
+                ).run()
+            else:
+                await service.run()
+        finally:
+            if metrics is not None:
+                await metrics.cleanup()
+            if store is not None:
+                store.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    args = parse_args()
+    if args.workers > 1:
+        Coordinator(args, args.workers).run()
+    else:
+        asyncio.run(main(args))
@@ -0,0 +1,202 @@
+'''
+Historical backfill: rebuild reports of past eras from an archive relay node and compare them
+with reports accepted by OracleMaster (decoded from reportRelay calldata)
+
+    python -m scripts.oracle.backfill --from-era 100 --to-era 3000 --output reports.jsonl
+'''
+import argparse
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+
+import aiohttp
+
+from .rpc import JsonRpc
+from .relay import RelayClient
+from .parachain import OracleMasterClient
+from .report import OracleData, LedgerStatus
+
+
+log = logging.getLogger(__name__)
+
+
+# concurrent relay eras
+WORKERS = 16
+# concurrent relay requests of era boundaries search
+SEARCH_CONCURRENCY = 32
+# parachain blocks per eth_getLogs request
+LOGS_BLOCK_RANGE = 10000
+
+
+def report_to_json(report):
+    return {
+        field: '0x' + value.hex() if isinstance(value, bytes) else value
+        for (field, value) in report._asdict().items()
+    }
+
+
+def report_from_json(data):
+    return OracleData(**{
+        **data,
+        'stash_account': bytes.fromhex(data['stash_account'][2:]),
+        'controller_account': bytes.fromhex(data['controller_account'][2:]),
+        'unlocking': [tuple(chunk) for chunk in data['unlocking']],
+    })
+
+
+def diff_reports(report, accepted):
+    '''
+    @return names of fields which differ, None if there is no accepted report for stash with relay ledger
+    '''
+    if accepted is None:
+        if report.stake_status == LedgerStatus.NONE and report.stash_balance == 0:
+            return []
+        return None
+    return [field for field in OracleData._fields if getattr(report, field) != getattr(accepted, field)]
+
+
+class EraBlocks:
+    '''
+    The first relay block of each era, found by bisection of Staking.ActiveEra over block numbers.
+    Eras are searched from the middle of the range, so the known boundaries narrow down the rest.
+    '''
+    relay = None
+    # block number => active era
+    eras = None
+
+    def __init__(self, relay, concurrency=SEARCH_CONCURRENCY):
+        self.relay = relay
+        self.eras = {}
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def era_at(self, number):
+        if number not in self.eras:
+            async with self._semaphore:
+                era_id = await self.relay.get_active_era(await self.relay.get_block_hash(number))
+            self.eras[number] = era_id if era_id is not None else -1
+        return self.eras[number]
+
+    async def first_block(self, era_id, lo, hi):
+        # era_at(lo) < era_id <= era_at(hi)
+        while hi - lo > 1:
+            middle = (lo + hi) // 2
+            if await self.era_at(middle) < era_id:
+                lo = middle
+            else:
+                hi = middle
+        return hi
+
+    async def search(self, eras, lo, hi):
+        if len(eras) == 0:
+            return {}
+        middle = len(eras) // 2
+        block = await self.first_block(eras[middle], lo, hi)
+        (left, right) = await asyncio.gather(self.search(eras[:middle], lo, block), self.search(eras[middle + 1:], block, hi))
+        return {**left, eras[middle]: block, **right}
+
+    async def find(self, from_era, to_era):
+        '''
+        @return dict era id => the first block number, eras never active on relay chain are missing
+        '''
+        head = await self.relay.get_block_number(await self.relay.get_finalized_head())
+        if await self.era_at(0) >= from_era:
+            raise ValueError(f'era {from_era} is not after genesis')
+        if await self.era_at(head) < to_era:
+            raise ValueError(f'era {to_era} is not started at finalized block {head}')
+        blocks = await self.search(list(range(from_era, to_era + 1)), 0, head)
+        return {era_id: block for (era_id, block) in blocks.items() if self.eras[block] == era_id}
+
+
+async def get_accepted_reports(oracle_master, from_block, to_block, concurrency=WORKERS):
+    '''
+    @return dict (era id, stash) => report accepted by OracleMaster in parachain block range
+    '''
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(start):
+        async with semaphore:
+            logs = await oracle_master.get_completed_logs(start, min(start + LOGS_BLOCK_RANGE - 1, to_block))
+            return await oracle_master.get_accepted_reports(logs)
+
+    chunks = await asyncio.gather(*[fetch(start) for start in range(from_block, to_block + 1, LOGS_BLOCK_RANGE)])
+    return {(era_id, report.stash_account): report for chunk in chunks for (era_id, report) in chunk}
+
+
+async def backfill(relay, era_blocks, stashes, accepted, output, workers=WORKERS):
+    '''
+    Rebuild reports of all `stashes` at the first block of every era and write them with accepted
+    reports and differences to `output` as JSON lines, eras are written in completion order
+    @return Counter of results: match, mismatch, not_reported
+    '''
+    queue = asyncio.Queue()
+    for item in sorted(era_blocks.items()):
+        queue.put_nowait(item)
+    summary = Counter()
+
+    async def worker():
+        while not queue.empty():
+            (era_id, number) = queue.get_nowait()
+            reports = await relay.get_reports(stashes, await relay.get_block_hash(number))
+            for report in reports:
+                accepted_report = accepted.get((era_id, report.stash_account))
+                diff = diff_reports(report, accepted_report)
+                if diff is None:
+                    summary['not_reported'] += 1
+                elif accepted_report is not None:
+                    summary['mismatch' if len(diff) > 0 else 'match'] += 1
+                output.write(json.dumps({
+                    'era': era_id,
+                    'relay_block': number,
+                    'report': report_to_json(report),
+                    'accepted': report_to_json(accepted_report) if accepted_report is not None else None,
+                    'diff': diff,
+                }) + '\n')
+            output.flush()
+
+    await asyncio.gather(*[worker() for _ in range(workers)])
+    return summary
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog='python -m scripts.oracle.backfill', description='Rebuild and check oracle reports of past eras')
+    parser.add_argument('--relay-url', default=os.getenv('RELAY_URL', 'http://localhost:9933'), help='relay chain archive node HTTP RPC')
+    parser.add_argument('--para-url', default=os.getenv('PARA_URL', 'http://localhost:9944'), help='parachain EVM archive node HTTP RPC')
+    parser.add_argument('--oracle-master', default=os.getenv('ORACLE_MASTER'), required=os.getenv('ORACLE_MASTER') is None, help='OracleMaster contract address')
+    parser.add_argument('--from-era', type=int, required=True)
+    parser.add_argument('--to-era', type=int, required=True)
+    parser.add_argument('--from-block', type=int, default=0, help='the first parachain block to search accepted reports')
+    parser.add_argument('--to-block', type=int, help='the last parachain block to search accepted reports, latest by default')
+    parser.add_argument('--stash', action='append', default=[], help='stash account to rebuild, all current and reported stashes by default')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='eras fetched concurrently')
+    parser.add_argument('--output', required=True, help='JSON lines file of rebuilt reports')
+    return parser.parse_args()
+
+
+async def main(args):
+    async with aiohttp.ClientSession() as session:
+        relay = RelayClient(JsonRpc(session, args.relay_url))
+        oracle_master = OracleMasterClient(JsonRpc(session, args.para_url), args.oracle_master)
+        to_block = args.to_block if args.to_block is not None else await oracle_master.get_block_number()
+
+        (era_blocks, accepted) = await asyncio.gather(
+            EraBlocks(relay).find(args.from_era, args.to_era),
+            get_accepted_reports(oracle_master, args.from_block, to_block, args.workers),
+        )
+        log.info("%d eras found on relay chain, %d accepted reports", len(era_blocks), len(accepted))
+
+        stashes = [bytes.fromhex(stash[2:]) for stash in args.stash]
+        if len(stashes) == 0:
+            stashes = list(dict.fromkeys(await oracle_master.get_stash_accounts() + [stash for (_, stash) in accepted]))
+
+        with open(args.output, 'w') as output:
+            summary = await backfill(relay, era_blocks, stashes, accepted, output, args.workers)
+        log.info("%s", dict(summary))
+
+
+if __name__ == '__main__':
+    from .__main__ import LOG_FORMAT
+
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    asyncio.run(main(parse_args()))
@@ -0,0 +1,169 @@
+'''
+Prometheus text format metrics without external dependencies, served by in-process aiohttp endpoint
+'''
+import time
+from contextlib import contextmanager
+
+from aiohttp import web
+
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+GAS_BUCKETS = (100_000, 200_000, 300_000, 500_000, 750_000, 1_000_000, 2_000_000, 5_000_000, 10_000_000)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if len(pairs) == 0:
+        return ''
+    escaped = [(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for (name, value) in pairs]
+    return '{' + ','.join(f'{name}="{value}"' for (name, value) in escaped) + '}'
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    type = None
+    name = None
+    help = None
+    labels = ()
+
+    def __init__(self, name, help, labels=(), registry=None):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f'{self.name}: expected labels {self.labels}, got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def get(self, **labels):
+        return self._values.get(self._key(labels))
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} {self.type}']
+        for (key, value) in sorted(self._values.items()):
+            lines.extend(self._render_value(key, value))
+        return lines
+
+    def _render_value(self, key, value):
+        return [f'{self.name}{_format_labels(self.labels, key)} {_format_value(value)}']
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, value=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + value
+
+
+class Gauge(Metric):
+    type = 'gauge'
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def remove(self, **labels):
+        self._values.pop(self._key(labels), None)
+
+
+class Histogram(Metric):
+    type = 'histogram'
+    buckets = LATENCY_BUCKETS
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS, registry=None):
+        super().__init__(name, help, labels, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        if key not in self._values:
+            # per bucket counts, sum, count
+            self._values[key] = [[0] * len(self.buckets), 0, 0]
+        state = self._values[key]
+        for (i, bound) in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+        state[1] += value
+        state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - started, **labels)
+
+    def _render_value(self, key, value):
+        (buckets, total, count) = value
+        lines = [
+            f'{self.name}_bucket{_format_labels(self.labels, key, [("le", bound)])} {bucket}'
+            for (bound, bucket) in zip(self.buckets, buckets)
+        ]
+        lines.append(f'{self.name}_bucket{_format_labels(self.labels, key, [("le", "+Inf")])} {count}')
+        lines.append(f'{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}')
+        lines.append(f'{self.name}_count{_format_labels(self.labels, key)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+
+    def render(self):
+        return '\n'.join(line for metric in self.metrics for line in metric.render()) + '\n'
+
+
+REGISTRY = Registry()
+
+
+RELAY_FETCH_SECONDS = Histogram(
+    'oracle_relay_fetch_seconds', 'Relay chain storage round trip latency by storage item', ['item'],
+)
+RPC_ERRORS = Counter(
+    'oracle_rpc_errors_total', 'JSON-RPC calls failed with error response or transport error', ['method'],
+)
+TX_INCLUSION_SECONDS = Histogram(
+    'oracle_tx_inclusion_seconds', 'Time from the first broadcast of transaction to its receipt',
+)
+TX_RETRIES = Counter(
+    'oracle_tx_retries_total', 'Resent transactions: replaced as stuck, rejected by node, cancelled after nonce gap, reverted out of gas, reverted batch split', ['reason'],
+)
+REPORT_BATCH_GAS_USED = Histogram(
+    'oracle_report_batch_gas_used', 'Gas used by reportRelayBatch transaction, pushed is true if Oracle Completed event shows its report pushed to ledger', ['pushed'],
+    buckets=GAS_BUCKETS,
+)
+INVALID_REPORTS = Counter(
+    'oracle_invalid_reports_total', 'Reports not submitted because pre-validation predicts revert', ['reason'],
+)
+STASH_REPORT_LAG = Gauge(
+    'oracle_stash_report_lag_eras', 'Relay active era minus the last era reported by this member for stash', ['stash'],
+)
+LAST_REPORTED_ERA = Gauge(
+    'oracle_last_reported_era', 'The last era reported by this member for all stashes',
+)
+
+
+async def start_metrics_server(host, port, registry=REGISTRY):
+    '''
+    Serve `registry` on http://host:port/metrics
+    @return aiohttp AppRunner, call `cleanup` to stop
+    '''
+    async def handle(request):
+        return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8')
+
+    app = web.Application()
+    app.router.add_get('/metrics', handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
@@ -0,0 +1,252 @@
+import asyncio
+from collections import namedtuple
+
+from eth_utils import keccak, to_checksum_address
+
+try:
+    from eth_abi import encode as abi_encode, decode as abi_decode
+except ImportError:
+    # eth-abi < 4.0
+    from eth_abi import encode_abi as abi_encode, decode_abi as abi_decode
+
+from .report import ORACLE_DATA_ABI, decode_oracle_data
+
+
+ANCHOR_ERA_CHANGED_TOPIC = '0x' + keccak(text='AnchorEraChanged(uint64,uint64,uint64)').hex()
+# Oracle event emitted when report is pushed to ledger
+COMPLETED_TOPIC = '0x' + keccak(text='Completed(uint256)').hex()
+
+
+# see Types.LedgerInfo
+LEDGER_INFO_ABI = '(address,bytes32,uint128,uint128,uint8)'
+LedgerInfo = namedtuple('LedgerInfo', ['ledger', 'stash_account', 'stake', 'borrow', 'status'])
+# ledgers per Lido.getLedgers call
+LEDGERS_PAGE_SIZE = 100
+
+
+def function_selector(signature):
+    return keccak(text=signature)[:4]
+
+
+def encode_call(name, arg_types, args):
+    return function_selector(f"{name}({','.join(arg_types)})") + abi_encode(arg_types, args)
+
+
+REPORT_RELAY_SELECTOR = function_selector(f'reportRelay(uint64,{ORACLE_DATA_ABI})')
+REPORT_RELAY_BATCH_SELECTOR = function_selector(f'reportRelayBatch(uint64,{ORACLE_DATA_ABI}[])')
+PUSH_QUORUM_REPORT_SELECTOR = function_selector(f'pushQuorumReport({ORACLE_DATA_ABI})')
+
+
+def decode_reports(data):
+    '''
+    @return reports decoded from OracleMaster.reportRelay, reportRelayBatch or pushQuorumReport calldata,
+    None for other calls
+    '''
+    if data[:4] == REPORT_RELAY_SELECTOR:
+        (_, report) = abi_decode(['uint64', ORACLE_DATA_ABI], data[4:])
+        return [decode_oracle_data(report)]
+    if data[:4] == REPORT_RELAY_BATCH_SELECTOR:
+        (_, reports) = abi_decode(['uint64', ORACLE_DATA_ABI + '[]'], data[4:])
+        return [decode_oracle_data(report) for report in reports]
+    if data[:4] == PUSH_QUORUM_REPORT_SELECTOR:
+        (report,) = abi_decode([ORACLE_DATA_ABI], data[4:])
+        return [decode_oracle_data(report)]
+    return None
+
+
+async def batch_call(rpc, calls, block='latest'):
+    '''
+    Execute list of (address, name, arg types, args, result types) view calls in one JSON-RPC batch
+    @return list of decoded results
+    '''
+    results = await rpc.batch([
+        ('eth_call', [{'to': address, 'data': '0x' + encode_call(name, arg_types, args).hex()}, block])
+        for (address, name, arg_types, args, _) in calls
+    ])
+    return [abi_decode(call[4], bytes.fromhex(result[2:])) for (call, result) in zip(calls, results)]
+
+
+class OracleMasterClient:
+    '''
+    OracleMaster views and calldata encoding
+    '''
+    rpc = None
+    address = None
+    # oracle => stash account of its ledger
+    oracle_stashes = None
+
+    def __init__(self, rpc, address):
+        self.rpc = rpc
+        self.address = to_checksum_address(address)
+        self.oracle_stashes = {}
+
+    async def call(self, name, arg_types, args, result_types, block='latest', to=None):
+        data = encode_call(name, arg_types, args)
+        result = await self.rpc.call('eth_call', {'to': to or self.address, 'data': '0x' + data.hex()}, block)
+        return abi_decode(result_types, bytes.fromhex(result[2:]))
+
+    async def get_stash_accounts(self):
+        (stashes,) = await self.call('getStashAccounts', [], [], ['bytes32[]'])
+        return list(stashes)
+
+    async def get_block_number(self):
+        return int(await self.rpc.call('eth_blockNumber'), 16)
+
+    async def get_latest_block(self):
+        '''
+        @return (number, timestamp) of the latest parachain block
+        '''
+        block = await self.rpc.call('eth_getBlockByNumber', 'latest', False)
+        return (int(block['number'], 16), int(block['timestamp'], 16))
+
+    async def get_reported_status(self, member, block='latest'):
+        '''
+        @return (last era, stashes, is reported by member flags)
+        '''
+        (last_era, stashes, reported) = await self.call(
+            'getReportedStatus', ['address'], [member], ['uint64', 'bytes32[]', 'bool[]'], block
+        )
+        return (last_era, list(stashes), list(reported))
+
+    async def get_report_variants(self, block='latest'):
+        '''
+        @return (last era, is pushed flags, report variants) for all ledgers in stash accounts order
+        '''
+        (last_era, is_pushed, variants) = await self.call(
+            'getReportVariants', [], [], ['uint64', 'bool[]', 'uint256[][]'], block
+        )
+        return (last_era, list(is_pushed), [list(ledger_variants) for ledger_variants in variants])
+
+    async def get_quorum(self, block='latest'):
+        (quorum,) = await self.call('QUORUM', [], [], ['uint8'], block)
+        return quorum
+
+    async def get_era_id(self):
+        (era_id,) = await self.call('eraId', [], [], ['uint64'])
+        return era_id
+
+    async def get_current_era_id(self):
+        (era_id,) = await self.call('getCurrentEraId', [], [], ['uint64'])
+        return era_id
+
+    async def get_anchor_era(self, block='latest'):
+        '''
+        @return (ANCHOR_ERA_ID, ANCHOR_TIMESTAMP, SECONDS_PER_ERA)
+        '''
+        results = await asyncio.gather(*[
+            self.call(name, [], [], ['uint64'], block) for name in ('ANCHOR_ERA_ID', 'ANCHOR_TIMESTAMP', 'SECONDS_PER_ERA')
+        ])
+        return tuple(result[0] for result in results)
+
+    async def get_anchor_era_changes(self, from_block, to_block):
+        '''
+        @return list of (ANCHOR_ERA_ID, ANCHOR_TIMESTAMP, SECONDS_PER_ERA) set by setAnchorEra in block range
+        '''
+        logs = await self.rpc.call('eth_getLogs', {
+            'address': self.address,
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+            'topics': [ANCHOR_ERA_CHANGED_TOPIC],
+        })
+        return [tuple(abi_decode(['uint64', 'uint64', 'uint64'], bytes.fromhex(log['data'][2:]))) for log in logs]
+
+    async def get_lido(self):
+        (lido,) = await self.call('LIDO', [], [], ['address'])
+        return to_checksum_address(lido)
+
+    async def get_ledgers_version(self, lido):
+        '''
+        @return Lido ledgers version, it changes with ledger set, order or status
+        '''
+        (version,) = await self.call('ledgersVersion', [], [], ['uint256'], to=lido)
+        return version
+
+    async def get_ledgers(self, lido, page_size=LEDGERS_PAGE_SIZE):
+        '''
+        Read all Lido ledgers page by page, reading restarts if ledgers change between pages
+        @return (ledgers version, list of LedgerInfo)
+        '''
+        while True:
+            ledgers = []
+            (version, total, page) = await self.call(
+                'getLedgers', ['uint256', 'uint256'], [0, page_size], ['uint256', 'uint256', LEDGER_INFO_ABI + '[]'], to=lido
+            )
+            ledgers.extend(page)
+            while len(ledgers) < total:
+                (page_version, total, page) = await self.call(
+                    'getLedgers', ['uint256', 'uint256'], [len(ledgers), page_size], ['uint256', 'uint256', LEDGER_INFO_ABI + '[]'], to=lido
+                )
+                if page_version != version:
+                    break
+                ledgers.extend(page)
+            else:
+                return (version, [LedgerInfo(to_checksum_address(ledger), *rest) for (ledger, *rest) in ledgers])
+
+    async def get_oracles(self, block='latest'):
+        '''
+        @return oracles of Lido ledgers at `block`
+        '''
+        (lido,) = await self.call('LIDO', [], [], ['address'], block)
+        (ledgers,) = await self.call('getLedgerAddresses', [], [], ['address[]'], block, to=lido)
+        oracles = await batch_call(self.rpc, [(self.address, 'getOracle', ['address'], [ledger], ['address']) for ledger in ledgers], block)
+        return [to_checksum_address(oracle) for (oracle,) in oracles if int(oracle, 16) != 0]
+
+    async def get_completed_logs(self, from_block, to_block):
+        '''
+        @return Completed logs in block range emitted by oracles of ledgers at the first or the last block of range
+        '''
+        (first, last) = await asyncio.gather(self.get_oracles(hex(from_block)), self.get_oracles(hex(to_block)))
+        oracles = list(dict.fromkeys(first + last))
+        if len(oracles) == 0:
+            return []
+        return await self.rpc.call('eth_getLogs', {
+            'address': oracles,
+            'fromBlock': hex(from_block),
+            'toBlock': hex(to_block),
+            'topics': [COMPLETED_TOPIC],
+        })
+
+    async def get_oracle_stashes(self, oracles):
+        '''
+        @return stash accounts of oracles ledgers, ledger and stash of oracle never change so they are cached
+        '''
+        missing = [oracle for oracle in dict.fromkeys(oracles) if oracle not in self.oracle_stashes]
+        if len(missing) > 0:
+            ledgers = await batch_call(self.rpc, [(oracle, 'LEDGER', [], [], ['address']) for oracle in missing])
+            stashes = await batch_call(self.rpc, [(ledger, 'stashAccount', [], [], ['bytes32']) for (ledger,) in ledgers])
+            self.oracle_stashes.update((oracle, stash) for (oracle, (stash,)) in zip(missing, stashes))
+        return [self.oracle_stashes[oracle] for oracle in oracles]
+
+    async def get_accepted_reports(self, logs):
+        '''
+        Decode reports pushed to ledgers from calldata of transactions which emitted Completed `logs`,
+        reports of a batch are matched to logs by oracle ledger stash
+        @return list of (era id, report)
+        '''
+        tx_hashes = list(dict.fromkeys(log['transactionHash'] for log in logs))
+        if len(tx_hashes) == 0:
+            return []
+        (txs, stashes) = await asyncio.gather(
+            self.rpc.batch([('eth_getTransactionByHash', [tx_hash]) for tx_hash in tx_hashes]),
+            self.get_oracle_stashes([to_checksum_address(log['address']) for log in logs]),
+        )
+        # Completed data is pushed era id
+        pushed = {(log['transactionHash'], stash): int(log['data'], 16) for (log, stash) in zip(logs, stashes)}
+        accepted = []
+        for (tx_hash, tx) in zip(tx_hashes, txs):
+            if tx['to'] is None or to_checksum_address(tx['to']) != self.address:
+                continue
+            for report in decode_reports(bytes.fromhex(tx['input'][2:])) or []:
+                if (tx_hash, report.stash_account) in pushed:
+                    accepted.append((pushed[(tx_hash, report.stash_account)], report))
+        return accepted
+
+    def encode_report_relay(self, era_id, report):
+        return encode_call('reportRelay', ['uint64', ORACLE_DATA_ABI], [era_id, tuple(report)])
+
+    def encode_report_relay_batch(self, era_id, reports):
+        return encode_call('reportRelayBatch', ['uint64', ORACLE_DATA_ABI + '[]'], [era_id, [tuple(report) for report in reports]])
+
+    def encode_push_quorum_report(self, report):
+        return encode_call('pushQuorumReport', [ORACLE_DATA_ABI], [tuple(report)])
+
@@ -0,0 +1,98 @@
+from eth_utils import keccak
+
+from .parachain import abi_encode
+from .submitter import GAS_LIMIT
+from .report import ORACLE_DATA_ABI, OracleData
+
+
+# see ReportUtils.COUNT_OUTMASK
+COUNT_OUTMASK = (2**256 - 1) ^ 0xFF
+
+# OracleMaster and Oracle checks, variant search and bitmask update
+VOTE_BASE_GAS = 150_000
+# new storage slot
+SSTORE_GAS = 22_100
+# storage slots of new variant: hash with vote counter and variants length
+VARIANT_SLOTS = 2
+# the first report of an era clears oracle data of the previous era, see Oracle.reportingEra
+RESET_GAS = 100_000
+# calldata, ABI decoding and hashing of one report word: unlocking chunk is two words, claimed reward era is one
+REPORT_WORD_GAS = 1_000
+# pushing to ledger sends XCM messages, so the worst case limit is used
+PUSH_GAS_LIMIT = GAS_LIMIT
+# expected gas of pushing report to ledger, used only to pack reports into batches,
+# batches which don't fit PUSH_GAS_LIMIT are split by service
+PUSH_GAS = 1_000_000
+
+
+def report_variant(report):
+    '''
+    Same as Oracle: keccak256(abi.encode(report)) & COUNT_OUTMASK
+    '''
+    return int.from_bytes(keccak(abi_encode([ORACLE_DATA_ABI], [tuple(report)])), 'big') & COUNT_OUTMASK
+
+
+def will_push(report, is_pushed, variants, quorum):
+    '''
+    Predict whether report submission reaches quorum and pushes report to ledger (see Oracle.reportRelay)
+    @param is_pushed - report for current era is already pushed
+    @param variants - current report variants with vote counter in the last byte
+    @param quorum - OracleMaster.QUORUM
+    '''
+    if is_pushed:
+        return False
+    variant = report_variant(report)
+    for current in variants:
+        if current & COUNT_OUTMASK == variant:
+            return (current & 0xFF) + 1 >= quorum
+    return quorum == 1
+
+
+def quorum_variant(variants, quorum):
+    '''
+    Mirror of Oracle._getQuorumReport: the most frequent variant if it is the only one with
+    at least `quorum` votes, such variant waits for OracleMaster.pushQuorumReport after quorum lowering
+    @return variant hash or None
+    '''
+    counts = [variant & 0xFF for variant in variants]
+    if len(counts) == 0 or max(counts) < quorum or counts.count(max(counts)) > 1:
+        return None
+    return variants[counts.index(max(counts))] & COUNT_OUTMASK
+
+
+def vote_gas_limit(report):
+    '''
+    Upper bound of gas for report which doesn't reach quorum: new variant hash in storage (report data
+    isn't stored), clearing of the previous era data and passing of report arrays
+    '''
+    report = OracleData(*report)
+    words = 2 * len(report.unlocking) + len(report.claimed_rewards)
+    return VOTE_BASE_GAS + RESET_GAS + SSTORE_GAS * VARIANT_SLOTS + REPORT_WORD_GAS * words
+
+
+def batch_gas_limit(reports, pushes):
+    '''
+    Gas limit of reportRelayBatch: votes are summed, batch with pushes gets the worst case limit
+    '''
+    if any(pushes):
+        return PUSH_GAS_LIMIT
+    return min(sum(vote_gas_limit(report) for report in reports), PUSH_GAS_LIMIT)
+
+
+def pack_batches(reports, pushes):
+    '''
+    Split reports into reportRelayBatch transactions with expected gas not above PUSH_GAS_LIMIT
+    @return list of batches, each is a list of report indices
+    '''
+    batches = []
+    (batch, batch_gas) = ([], 0)
+    for (i, (report, push)) in enumerate(zip(reports, pushes)):
+        gas = PUSH_GAS if push else vote_gas_limit(report)
+        if len(batch) > 0 and batch_gas + gas > PUSH_GAS_LIMIT:
+            batches.append(batch)
+            (batch, batch_gas) = ([], 0)
+        batch.append(i)
+        batch_gas += gas
+    if len(batch) > 0:
+        batches.append(batch)
+    return batches
@@ -0,0 +1,186 @@
+import time
+
+from .scale import ScaleReader, storage_key, twox64_concat, blake2_128_concat
+from .report import build_report
+from .metrics import RELAY_FETCH_SECONDS
+
+
+# keys per one state_queryStorageAt request, nodes limit request size
+QUERY_KEYS_LIMIT = 256
+
+
+def decode_account_id(data):
+    return ScaleReader(data).account()
+
+
+def decode_active_era(data):
+    # ActiveEraInfo { index: EraIndex, start: Option<u64> }
+    return ScaleReader(data).u32()
+
+
+def decode_staking_ledger(data):
+    # StakingLedger { stash, total, active, unlocking: Vec<UnlockChunk>, claimed_rewards: Vec<EraIndex> }
+    reader = ScaleReader(data)
+    return {
+        'stash': reader.account(),
+        'total': reader.compact(),
+        'active': reader.compact(),
+        'unlocking': reader.vec(lambda: (reader.compact(), reader.compact())),
+        'claimed_rewards': reader.vec(reader.u32),
+    }
+
+
+def decode_nominations(data):
+    # Nominations { targets: Vec<AccountId>, submitted_in: EraIndex, suppressed: bool }
+    reader = ScaleReader(data)
+    return {
+        'targets': reader.vec(reader.account),
+        'submitted_in': reader.u32(),
+        'suppressed': reader.bool(),
+    }
+
+
+def decode_validator_prefs(data):
+    # ValidatorPrefs { commission: Compact<Perbill>, blocked: bool }
+    reader = ScaleReader(data)
+    return {'commission': reader.compact(), 'blocked': reader.bool()}
+
+
+def decode_account_info(data):
+    # AccountInfo { nonce, consumers, providers, sufficients, data: AccountData }
+    reader = ScaleReader(data)
+    reader.read(16)
+    return {
+        'free': reader.u128(),
+        'reserved': reader.u128(),
+        'misc_frozen': reader.u128(),
+        'fee_frozen': reader.u128(),
+    }
+
+
+def decode_slashing_spans(data):
+    # SlashingSpans { span_index, last_start, last_nonzero_slash, prior: Vec<EraIndex> }
+    reader = ScaleReader(data)
+    reader.read(12)
+    # current span + prior spans, see pallet_staking::slashing::SlashingSpans::iter
+    return len(reader.vec(reader.u32)) + 1
+
+
+def active_era_key():
+    return storage_key('Staking', 'ActiveEra')
+
+
+def bonded_key(stash):
+    return storage_key('Staking', 'Bonded', twox64_concat(stash))
+
+
+def ledger_key(controller):
+    return storage_key('Staking', 'Ledger', blake2_128_concat(controller))
+
+
+def nominators_key(stash):
+    return storage_key('Staking', 'Nominators', twox64_concat(stash))
+
+
+def validators_key(stash):
+    return storage_key('Staking', 'Validators', twox64_concat(stash))
+
+
+def account_key(stash):
+    return storage_key('System', 'Account', blake2_128_concat(stash))
+
+
+def slashing_spans_key(stash):
+    return storage_key('Staking', 'SlashingSpans', twox64_concat(stash))
+
+
+def _decode(decoder, data):
+    return decoder(data) if data is not None else None
+
+
+class RelayClient:
+    '''
+    Relay chain state reader over substrate JSON-RPC
+    '''
+    rpc = None
+
+    def __init__(self, rpc):
+        self.rpc = rpc
+
+    async def get_finalized_head(self):
+        return await self.rpc.call('chain_getFinalizedHead')
+
+    async def get_block_hash(self, number):
+        return await self.rpc.call('chain_getBlockHash', number)
+
+    async def get_block_number(self, block_hash):
+        header = await self.rpc.call('chain_getHeader', block_hash)
+        return int(header['number'], 16)
+
+    async def get_storage(self, key, block_hash):
+        value = await self.rpc.call('state_getStorage', '0x' + key.hex(), block_hash)
+        return bytes.fromhex(value[2:]) if value is not None else None
+
+    async def get_active_era(self, block_hash):
+        with RELAY_FETCH_SECONDS.time(item='Staking.ActiveEra'):
+            value = await self.get_storage(active_era_key(), block_hash)
+        return _decode(decode_active_era, value)
+
+    async def query_storage(self, keys, block_hash, items=()):
+        '''
+        Read many storage keys at one block: one state_queryStorageAt per chunk, all chunks in one JSON-RPC batch
+        @param items - names of storage items in `keys`, round trip latency is recorded for each of them
+        @return dict key => value bytes or None
+        '''
+        chunks = [keys[i:i + QUERY_KEYS_LIMIT] for i in range(0, len(keys), QUERY_KEYS_LIMIT)]
+        started = time.monotonic()
+        change_sets = await self.rpc.batch([
+            ('state_queryStorageAt', [['0x' + key.hex() for key in chunk], block_hash]) for chunk in chunks
+        ])
+        for item in items:
+            RELAY_FETCH_SECONDS.observe(time.monotonic() - started, item=item)
+        values = dict.fromkeys(keys)
+        for change_set in change_sets:
+            for block_changes in change_set:
+                for (key, value) in block_changes['changes']:
+                    values[bytes.fromhex(key[2:])] = bytes.fromhex(value[2:]) if value is not None else None
+        return values
+
+    async def get_reports(self, stashes, block_hash):
+        '''
+        Build reports for all stashes from relay chain state pinned at `block_hash`.
+        Requires two round trips: stash keyed items first, then ledgers of bonded controllers.
+        '''
+        stash_keys = [
+            (bonded_key(stash), nominators_key(stash), validators_key(stash), account_key(stash), slashing_spans_key(stash))
+            for stash in stashes
+        ]
+        values = await self.query_storage(
+            [key for keys in stash_keys for key in keys],
+            block_hash,
+            ('Staking.Bonded', 'Staking.Nominators', 'Staking.Validators', 'System.Account', 'Staking.SlashingSpans'),
+        )
+
+        controllers = [_decode(decode_account_id, values[keys[0]]) for keys in stash_keys]
+        ledger_keys = [ledger_key(controller) for controller in controllers if controller is not None]
+        values.update(await self.query_storage(ledger_keys, block_hash, ('Staking.Ledger',)))
+
+        reports = []
+        for (stash, controller, (_, nominators, validators, account, slashing_spans)) in zip(stashes, controllers, stash_keys):
+            ledger = None
+            if controller is not None:
+                ledger = _decode(decode_staking_ledger, values[ledger_key(controller)])
+            reports.append(build_report(
+                stash,
+                controller,
+                ledger,
+                _decode(decode_nominations, values[nominators]),
+                _decode(decode_validator_prefs, values[validators]),
+                _decode(decode_account_info, values[account]),
+                _decode(decode_slashing_spans, values[slashing_spans]),
+            ))
+        return reports
+
+    async def get_report(self, stash, block_hash):
+        (report,) = await self.get_reports([stash], block_hash)
+        return report
@@ -0,0 +1,86 @@
+from collections import namedtuple
+from enum import IntEnum
+
+
+# see Types.LedgerStatus
+class LedgerStatus(IntEnum):
+    IDLE = 0
+    NOMINATOR = 1
+    VALIDATOR = 2
+    NONE = 3
+
+
+# see Types.OracleData
+OracleData = namedtuple('OracleData', [
+    'stash_account',
+    'controller_account',
+    'stake_status',
+    'active_balance',
+    'total_balance',
+    'unlocking',
+    'claimed_rewards',
+    'stash_balance',
+    'slashing_spans',
+])
+
+ORACLE_DATA_ABI = '(bytes32,bytes32,uint8,uint128,uint128,(uint128,uint64)[],uint32[],uint128,uint32)'
+
+# unlocking chunks limit, see LedgerUtils.isConsistent
+MAX_UNLOCKING_CHUNKS = 255
+
+
+def decode_oracle_data(values):
+    '''
+    Build OracleData from ABI decoded Types.OracleData tuple
+    '''
+    (stash, controller, status, active, total, unlocking, claimed, stash_balance, spans) = values
+    return OracleData(stash, controller, status, active, total, [tuple(chunk) for chunk in unlocking], list(claimed), stash_balance, spans)
+
+
+def is_consistent(report):
+    '''
+    Mirror of LedgerUtils.isConsistent, OracleMaster rejects inconsistent reports
+    '''
+    unlocking = sum(balance for (balance, _) in report.unlocking)
+    return (
+        len(report.unlocking) < MAX_UNLOCKING_CHUNKS
+        and report.total_balance == report.active_balance + unlocking
+        and report.stash_balance >= report.total_balance
+    )
+
+
+def build_report(stash, controller, ledger, nominations, validator_prefs, account, slashing_spans):
+    '''
+    Build report from decoded relay chain storage of one stash
+    @param stash - stash account id
+    @param controller - Staking.Bonded value, None if stash is not bonded
+    @param ledger - Staking.Ledger value of controller
+    @param nominations - Staking.Nominators value
+    @param validator_prefs - Staking.Validators value
+    @param account - System.Account value of stash
+    @param slashing_spans - Staking.SlashingSpans value
+    '''
+    if controller is None or ledger is None:
+        status = LedgerStatus.NONE
+    elif validator_prefs is not None:
+        status = LedgerStatus.VALIDATOR
+    elif nominations is not None:
+        status = LedgerStatus.NOMINATOR
+    else:
+        status = LedgerStatus.IDLE
+
+    if ledger is None:
+        ledger = {'total': 0, 'active': 0, 'unlocking': [], 'claimed_rewards': []}
+
+    return OracleData(
+        stash_account=stash,
+        controller_account=controller if controller is not None else stash,
+        stake_status=int(status),
+        active_balance=ledger['active'],
+        total_balance=ledger['total'],
+        unlocking=[tuple(chunk) for chunk in ledger['unlocking']],
+        claimed_rewards=list(ledger['claimed_rewards']),
+        # bonded funds are locked, but still a part of free balance
+        stash_balance=account['free'] if account is not None else 0,
+        slashing_spans=slashing_spans if slashing_spans is not None else 0,
+    )
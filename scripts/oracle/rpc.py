@@ -0,0 +1,74 @@
+import asyncio
+import itertools
+
+import aiohttp
+
+from .metrics import RPC_ERRORS
+
+
+class RpcError(Exception):
+    '''
+    JSON-RPC error response
+    '''
+    code = None
+    data = None
+
+    def __init__(self, error):
+        super().__init__(error.get('message', 'unknown error'))
+        self.code = error.get('code')
+        self.data = error.get('data')
+
+
+class JsonRpc:
+    '''
+    Async JSON-RPC over HTTP client, `session` is aiohttp.ClientSession shared by all clients
+    '''
+    url = None
+    session = None
+
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+        self._ids = itertools.count(1)
+
+    def _request(self, method, params):
+        return {'jsonrpc': '2.0', 'id': next(self._ids), 'method': method, 'params': list(params)}
+
+    async def _post(self, payload, methods):
+        try:
+            async with self.session.post(self.url, json=payload) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            for method in set(methods):
+                RPC_ERRORS.inc(method=method)
+            raise
+
+    async def call(self, method, *params):
+        response = await self._post(self._request(method, params), [method])
+        if 'error' in response:
+            RPC_ERRORS.inc(method=method)
+            raise RpcError(response['error'])
+        return response['result']
+
+    async def batch(self, calls, return_errors=False):
+        '''
+        Send list of (method, params) in one JSON-RPC batch, results are returned in the same order
+        @param return_errors - return RpcError in place of failed call result instead of raising it
+        '''
+        if len(calls) == 0:
+            return []
+        requests = [self._request(method, params) for (method, params) in calls]
+        responses = {response['id']: response for response in await self._post(requests, [method for (method, _) in calls])}
+        results = []
+        for request in requests:
+            response = responses[request['id']]
+            if 'error' not in response:
+                results.append(response['result'])
+                continue
+            RPC_ERRORS.inc(method=request['method'])
+            if return_errors:
+                results.append(RpcError(response['error']))
+            else:
+                raise RpcError(response['error'])
+        return results
@@ -0,0 +1,79 @@
+from hashlib import blake2b
+
+import xxhash
+
+
+def twox128(data):
+    return b''.join(xxhash.xxh64(data, seed=i).intdigest().to_bytes(8, 'little') for i in range(2))
+
+
+def twox64_concat(data):
+    return xxhash.xxh64(data, seed=0).intdigest().to_bytes(8, 'little') + data
+
+
+def blake2_128_concat(data):
+    return blake2b(data, digest_size=16).digest() + data
+
+
+def storage_key(pallet, item, map_key=b''):
+    '''
+    Substrate storage key: twox128(pallet) ++ twox128(item) ++ hashed map key
+    '''
+    return twox128(pallet.encode()) + twox128(item.encode()) + map_key
+
+
+class ScaleReader:
+    '''
+    Minimal SCALE decoder for the relay chain types used by the oracle
+    '''
+    data = b''
+    offset = 0
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def read(self, length):
+        assert self.offset + length <= len(self.data), "SCALE: unexpected end of data"
+        chunk = self.data[self.offset:self.offset + length]
+        self.offset += length
+        return chunk
+
+    def uint(self, size):
+        return int.from_bytes(self.read(size), 'little')
+
+    def u8(self):
+        return self.uint(1)
+
+    def u32(self):
+        return self.uint(4)
+
+    def u64(self):
+        return self.uint(8)
+
+    def u128(self):
+        return self.uint(16)
+
+    def bool(self):
+        return self.u8() != 0
+
+    def account(self):
+        return self.read(32)
+
+    def compact(self):
+        mode = self.data[self.offset] & 0b11
+        if mode == 0b00:
+            return self.u8() >> 2
+        elif mode == 0b01:
+            return self.uint(2) >> 2
+        elif mode == 0b10:
+            return self.uint(4) >> 2
+        else:
+            length = (self.u8() >> 2) + 4
+            return self.uint(length)
+
+    def vec(self, decode_item):
+        return [decode_item() for _ in range(self.compact())]
+
+    def option(self, decode_item):
+        return decode_item() if self.bool() else None
@@ -0,0 +1,23 @@
+class EraSchedule:
+    '''
+    Parachain era clock, same as OracleMaster._getCurrentEraId:
+    ANCHOR_ERA_ID + (timestamp - ANCHOR_TIMESTAMP) / SECONDS_PER_ERA
+    '''
+    anchor_era_id = None
+    anchor_timestamp = None
+    seconds_per_era = None
+
+    def __init__(self, anchor_era_id, anchor_timestamp, seconds_per_era):
+        self.anchor_era_id = anchor_era_id
+        self.anchor_timestamp = anchor_timestamp
+        self.seconds_per_era = seconds_per_era
+
+    def era_at(self, timestamp):
+        # OracleMaster reverts on timestamps before anchor, here the anchor era is returned
+        return self.anchor_era_id + max(int(timestamp) - self.anchor_timestamp, 0) // self.seconds_per_era
+
+    def era_start(self, era_id):
+        return self.anchor_timestamp + (era_id - self.anchor_era_id) * self.seconds_per_era
+
+    def next_era_start(self, timestamp):
+        return self.era_start(self.era_at(timestamp) + 1)
@@ -0,0 +1,294 @@
+import asyncio
+import logging
+
+from .quorum import will_push, pack_batches, batch_gas_limit, quorum_variant, report_variant, PUSH_GAS_LIMIT
+from .schedule import EraSchedule
+from .validation import ReportValidator
+from .parachain import COMPLETED_TOPIC
+from .metrics import REPORT_BATCH_GAS_USED, TX_RETRIES, STASH_REPORT_LAG, LAST_REPORTED_ERA, INVALID_REPORTS
+
+
+log = logging.getLogger(__name__)
+
+
+# retry interval while started era is not reported yet
+POLL_INTERVAL = 60
+# delay after era boundary, covers relay chain finalization and parachain block time
+ERA_MARGIN = 30
+
+
+class OracleService:
+    '''
+    Oracle member daemon: on every new relay chain era reports all ledgers to OracleMaster,
+    between eras sleeps until the next era boundary computed from OracleMaster anchor parameters
+    '''
+    relay = None
+    oracle_master = None
+    submitter = None
+    poll_interval = POLL_INTERVAL
+    era_margin = ERA_MARGIN
+    last_era = None
+    # era id => stashes already reported by this member
+    reported = None
+    # stash => the last era reported by this member, stashes are considered up to date on the first sight
+    stash_eras = None
+    # optional StateStore, keeps the last reported era and relay snapshots between restarts
+    store = None
+    # optional predicate selecting stashes reported by this process, see sharding.HashRing
+    owns = None
+    validator = None
+    # cached OracleMaster era clock, checked for setAnchorEra changes up to `schedule_block`
+    schedule = None
+    schedule_block = None
+    # parachain timestamp of `schedule_block` and local loop time when it was fetched
+    schedule_timestamp = None
+    schedule_checked_at = None
+
+    def __init__(self, relay, oracle_master, submitter, poll_interval=POLL_INTERVAL, era_margin=ERA_MARGIN, store=None, owns=None):
+        self.relay = relay
+        self.oracle_master = oracle_master
+        self.submitter = submitter
+        self.poll_interval = poll_interval
+        self.era_margin = era_margin
+        self.store = store
+        self.owns = owns
+        self.validator = ReportValidator(oracle_master)
+        self.last_era = store.get_last_era() if store is not None else None
+        self.reported = {}
+        self.stash_eras = {}
+
+    async def get_schedule(self):
+        '''
+        Load anchor parameters once, later only look for AnchorEraChanged events since the last check
+        @return (schedule, latest parachain block timestamp)
+        '''
+        (block, timestamp) = await self.oracle_master.get_latest_block()
+        if self.schedule is None:
+            self.schedule = EraSchedule(*await self.oracle_master.get_anchor_era(hex(block)))
+        elif block > self.schedule_block:
+            changes = await self.oracle_master.get_anchor_era_changes(self.schedule_block + 1, block)
+            if len(changes) > 0:
+                log.info("anchor era changed: %s", changes[-1])
+                self.schedule = EraSchedule(*changes[-1])
+        self.schedule_block = max(block, self.schedule_block or 0)
+        self.schedule_timestamp = timestamp
+        self.schedule_checked_at = asyncio.get_running_loop().time()
+        return (self.schedule, timestamp)
+
+    def next_delay(self):
+        '''
+        Seconds to sleep before the next iteration: until the next era boundary plus margin if the current
+        era is reported, otherwise poll interval (relay chain era can be finalized later than expected)
+        '''
+        if self.schedule is None:
+            return self.poll_interval
+        now = self.schedule_timestamp + asyncio.get_running_loop().time() - self.schedule_checked_at
+        if self.last_era is None or self.last_era < self.schedule.era_at(now):
+            return self.poll_interval
+        return max(self.schedule.next_era_start(now) + self.era_margin - now, 0)
+
+    async def get_era_state(self, era_id):
+        '''
+        Read reporting state of all ledgers at one parachain block
+        @return (stashes which are not reported by this member for `era_id` yet, stash => (is pushed, variants), quorum)
+        '''
+        block = hex(await self.oracle_master.get_block_number())
+        ((last_era, stashes, is_reported), (_, is_pushed, variants), quorum) = await asyncio.gather(
+            self.oracle_master.get_reported_status(self.submitter.address, block),
+            self.oracle_master.get_report_variants(block),
+            self.oracle_master.get_quorum(block),
+        )
+        if self.owns is not None:
+            # the rest of stashes is reported by other shard workers
+            owned = [i for (i, stash) in enumerate(stashes) if self.owns(stash)]
+            (stashes, is_reported, is_pushed, variants) = (
+                [values[i] for i in owned] for values in (stashes, is_reported, is_pushed, variants)
+            )
+        if last_era != era_id:
+            # OracleMaster keeps reporting data only for the last reported era
+            is_reported = [False] * len(stashes)
+            is_pushed = [False] * len(stashes)
+            variants = [[]] * len(stashes)
+
+        if era_id not in self.reported:
+            # reported flags are loaded once per era, after that the local cache is used
+            self.reported = {era_id: {stash for (stash, flag) in zip(stashes, is_reported) if flag}}
+            if self.store is not None:
+                self.reported[era_id].update(
+                    stash for (stash, (_, status)) in self.store.get_receipts(era_id).items() if status == 1
+                )
+
+        pending = [stash for stash in stashes if stash not in self.reported[era_id]]
+        return (pending, dict(zip(stashes, zip(is_pushed, variants))), quorum)
+
+    async def submit_reports(self, era_id, reports, variants, quorum):
+        '''
+        Submit reports in reportRelayBatch transactions with gas limit depending on the predicted quorum
+        @return receipts in reports order, reports of one batch share its receipt
+        '''
+        pushes = []
+        for report in reports:
+            (is_pushed, report_variants) = variants[report.stash_account]
+            pushes.append(will_push(report, is_pushed, report_variants, quorum))
+
+        receipts = [None] * len(reports)
+        batches = pack_batches(reports, pushes)
+        while len(batches) > 0:
+            txs = [(
+                self.oracle_master.address,
+                self.oracle_master.encode_report_relay_batch(era_id, [reports[i] for i in batch]),
+                batch_gas_limit([reports[i] for i in batch], [pushes[i] for i in batch]),
+            ) for batch in batches]
+            retry = []
+            for (batch, tx, receipt) in zip(batches, txs, await self.submitter.send_batch(txs)):
+                for i in batch:
+                    receipts[i] = receipt
+                if receipt is None:
+                    continue
+                pushed = any(log['topics'][:1] == [COMPLETED_TOPIC] for log in receipt['logs'])
+                REPORT_BATCH_GAS_USED.observe(int(receipt['gasUsed'], 16), pushed=str(pushed).lower())
+                if int(receipt['status'], 16) == 1:
+                    continue
+                if int(receipt['gasUsed'], 16) == tx[2] and tx[2] < PUSH_GAS_LIMIT:
+                    # quorum can be reached by other members reports between prediction and inclusion,
+                    # batch which ran out of gas is resent with limit for pushing
+                    for i in batch:
+                        pushes[i] = True
+                    retry.append(batch)
+                    TX_RETRIES.inc(reason='out_of_gas')
+                elif len(batch) > 1:
+                    # one failed report reverts the whole batch, halves are resent to isolate it
+                    retry.extend([batch[:len(batch) // 2], batch[len(batch) // 2:]])
+                    TX_RETRIES.inc(reason='split')
+            batches = retry
+        return receipts
+
+    def update_lag(self, era_id):
+        for (stash, stash_era) in self.stash_eras.items():
+            STASH_REPORT_LAG.set(max(era_id - stash_era, 0), stash='0x' + stash.hex())
+
+    async def get_reports(self, era_id, stashes, block_hash):
+        '''
+        Fetch relay reports for `stashes`, snapshots saved in store for `era_id` are reused,
+        so resubmitted report has exactly the same bytes
+        '''
+        if self.store is None:
+            return await self.relay.get_reports(stashes, block_hash)
+
+        saved = self.store.get_reports(era_id)
+        missing = [stash for stash in stashes if stash not in saved]
+        if len(missing) > 0:
+            fetched = await self.relay.get_reports(missing, block_hash)
+            self.store.save_reports(era_id, block_hash, fetched)
+            saved.update(zip(missing, fetched))
+        return [saved[stash] for stash in stashes]
+
+    async def push_quorum_reports(self, era_id, variants, quorum, block_hash):
+        '''
+        Oracles keep only report hashes, so reports which got quorum after quorum lowering are submitted
+        again with OracleMaster.pushQuorumReport. Only stashes reported by this member are checked.
+        @return receipts of sent transactions
+        '''
+        waiting = [
+            stash for stash in self.reported[era_id]
+            if stash in variants and not variants[stash][0] and quorum_variant(variants[stash][1], quorum) is not None
+        ]
+        if len(waiting) == 0:
+            return []
+        reports = [
+            report for report in await self.get_reports(era_id, waiting, block_hash)
+            if report_variant(report) == quorum_variant(variants[report.stash_account][1], quorum)
+        ]
+        log.info("era %d: pushing %d of %d reports which got quorum after quorum lowering", era_id, len(reports), len(waiting))
+        return await self.submitter.send_batch([
+            (self.oracle_master.address, self.oracle_master.encode_push_quorum_report(report), PUSH_GAS_LIMIT)
+            for report in reports
+        ])
+
+    async def validate_reports(self, era_id, stashes, reports):
+        '''
+        Drop reports which would revert on OracleMaster or ledger checks, they need operator attention
+        @return (stashes, reports) passed validation
+        '''
+        errors = await self.validator.validate(era_id, reports)
+        for (stash, error) in zip(stashes, errors):
+            if error is not None:
+                log.error("era %d: report for stash 0x%s is not submitted, expected revert: %s", era_id, stash.hex(), error)
+                INVALID_REPORTS.inc(reason=error)
+        valid = [i for (i, error) in enumerate(errors) if error is None]
+        return ([stashes[i] for i in valid], [reports[i] for i in valid])
+
+    async def report_era(self, era_id, block_hash):
+        '''
+        Fetch reports for all stashes at relay `block_hash` and submit them for `era_id`
+        @return list of (stash, receipt)
+        '''
+        (stashes, variants, quorum) = await self.get_era_state(era_id)
+        for stash in set(self.stash_eras) - set(variants):
+            # ledger is removed
+            del self.stash_eras[stash]
+            STASH_REPORT_LAG.remove(stash='0x' + stash.hex())
+        for stash in variants:
+            self.stash_eras.setdefault(stash, era_id - 1)
+        for stash in self.reported[era_id]:
+            self.stash_eras[stash] = era_id
+
+        await self.push_quorum_reports(era_id, variants, quorum, block_hash)
+
+        reports = await self.get_reports(era_id, stashes, block_hash)
+        (stashes, reports) = await self.validate_reports(era_id, stashes, reports)
+        receipts = await self.submit_reports(era_id, reports, variants, quorum)
+        if self.store is not None:
+            self.store.save_receipts(era_id, zip(stashes, receipts))
+        for (stash, receipt) in zip(stashes, receipts):
+            if receipt is None:
+                log.error("era %d: report for stash 0x%s is not accepted by node", era_id, stash.hex())
+            elif int(receipt['status'], 16) == 1:
+                self.reported[era_id].add(stash)
+                self.stash_eras[stash] = era_id
+            else:
+                log.error("era %d: report for stash 0x%s reverted, tx %s", era_id, stash.hex(), receipt['transactionHash'])
+        log.info("era %d: reported %d stashes", era_id, len(stashes))
+        # era is repeated on the next iteration if some transactions were not accepted
+        if all(receipt is not None for receipt in receipts):
+            self.last_era = era_id
+            LAST_REPORTED_ERA.set(era_id)
+            if self.store is not None:
+                self.store.set_last_era(era_id)
+        self.update_lag(era_id)
+        return list(zip(stashes, receipts))
+
+    async def run_once(self):
+        '''
+        Report relay active era if it is new and already started on the parachain side
+        @return reported era id or None
+        '''
+        block_hash = await self.relay.get_finalized_head()
+        (era_id, (schedule, timestamp)) = await asyncio.gather(
+            self.relay.get_active_era(block_hash),
+            self.get_schedule(),
+        )
+        if era_id is None or (self.last_era is not None and era_id <= self.last_era):
+            return None
+        self.update_lag(era_id)
+
+        # OracleMaster rejects eras from the future (see OM: UNEXPECTED_NEW_ERA)
+        if era_id > schedule.era_at(timestamp):
+            return None
+
+        await self.report_era(era_id, block_hash)
+        return era_id
+
+    async def run(self):
+        while True:
+            try:
+                await self.run_once()
+                delay = self.next_delay()
+            except Exception:
+                log.exception("oracle iteration failed")
+                delay = self.poll_interval
+            log.debug("next check in %d seconds", delay)
+            await self.sleep(delay)
+
+    async def sleep(self, delay):
+        await asyncio.sleep(delay)
@@ -0,0 +1,229 @@
+'''
+Multi-process oracle: stashes are split between worker processes by consistent hashing,
+all workers share one member key and take nonces from the coordinator's shared counter
+'''
+import asyncio
+import bisect
+import logging
+import multiprocessing
+import os
+
+import aiohttp
+from eth_utils import keccak
+
+from .rpc import JsonRpc, RpcError
+from .parachain import OracleMasterClient
+from .service import OracleService
+from .submitter import Submitter
+
+
+log = logging.getLogger(__name__)
+
+
+# virtual nodes per worker on the hash ring, smooths stashes distribution
+VNODES = 64
+# seconds between checks of rebalance epoch while worker sleeps, it is a shared memory read
+REBALANCE_CHECK_INTERVAL = 1
+
+
+def _ring_point(data):
+    return int.from_bytes(keccak(data)[:8], 'big')
+
+
+class HashRing:
+    '''
+    Consistent hashing of stash accounts to workers: adding or removing ledgers doesn't move other stashes
+    '''
+    points = None
+    workers = None
+
+    def __init__(self, workers, vnodes=VNODES):
+        ring = sorted((_ring_point(f'{worker}:{i}'.encode()), worker) for worker in workers for i in range(vnodes))
+        self.points = [point for (point, _) in ring]
+        self.workers = [worker for (_, worker) in ring]
+
+    def owner(self, stash):
+        return self.workers[bisect.bisect(self.points, _ring_point(bytes(stash))) % len(self.points)]
+
+    def partition(self, stashes):
+        '''
+        @return dict worker => owned stashes
+        '''
+        shards = {worker: [] for worker in self.workers}
+        for stash in stashes:
+            shards[self.owner(stash)].append(stash)
+        return shards
+
+
+class SharedNonceManager:
+    '''
+    NonceManager of worker `index` for processes sharing one key. The next nonce is kept in `counter`
+    and nonces allocated but not sent yet are kept in `allocations` as (first nonce, count) pair
+    of the worker, both are created and initialized by coordinator, see Coordinator.take_allocation
+    '''
+    counter = None
+    allocations = None
+    index = None
+
+    def __init__(self, counter, allocations, index):
+        self.counter = counter
+        self.allocations = allocations
+        self.index = index
+
+    async def allocate(self, count):
+        with self.counter.get_lock():
+            assert self.counter.value >= 0, "nonce counter isn't initialized by coordinator"
+            # worker sends one batch at a time, nonces are left unsent only by failed send_batch
+            if self.allocations[2 * self.index + 1] != 0:
+                # they could be sent or not, worker exits and coordinator cancels them
+                raise SystemExit(f"worker {self.index}: nonces from {self.allocations[2 * self.index]} are not sent")
+            nonce = self.counter.value
+            self.counter.value += count
+            self.allocations[2 * self.index] = nonce
+            self.allocations[2 * self.index + 1] = count
+            return nonce
+
+    def mark_sent(self, nonce, count):
+        with self.counter.get_lock():
+            self.allocations[2 * self.index + 1] = 0
+
+
+class ShardWorker(OracleService):
+    '''
+    Oracle service reporting only stashes owned by worker `index`.
+    Coordinator increments `epoch` when ledger set changes, then the current era is checked again
+    to report added stashes without waiting for the next era.
+    '''
+    index = None
+    epoch = None
+    seen_epoch = None
+
+    def __init__(self, relay, oracle_master, submitter, poll_interval, era_margin, store, ring, index, epoch):
+        super().__init__(relay, oracle_master, submitter, poll_interval, era_margin, store, lambda stash: ring.owner(stash) == index)
+        self.index = index
+        self.epoch = epoch
+        self.seen_epoch = epoch.value
+
+    async def sleep(self, delay):
+        deadline = asyncio.get_running_loop().time() + delay
+        while asyncio.get_running_loop().time() < deadline:
+            if self.epoch.value != self.seen_epoch:
+                self.seen_epoch = self.epoch.value
+                log.info("worker %d: ledger set changed, checking current era", self.index)
+                self.last_era = None
+                return
+            await asyncio.sleep(min(REBALANCE_CHECK_INTERVAL, deadline - asyncio.get_running_loop().time()))
+
+
+def run_worker(index, args, counter, allocations, epoch):
+    from .__main__ import main, LOG_FORMAT
+
+    logging.basicConfig(level=logging.INFO, format=f'worker {index}: {LOG_FORMAT}')
+    asyncio.run(main(args, (index, counter, allocations, epoch)))
+
+
+class Coordinator:
+    '''
+    Starts `workers` processes and polls Lido ledgersVersion to make workers rebalance when ledgers change.
+    Lido deployed before ledgersVersion has no such view, then stash accounts are compared instead.
+    Coordinator owns nonces of the member key: it initializes the shared counter before workers start and
+    cancels nonces allocated by exited workers, which could be never sent and block all workers transactions.
+    '''
+    args = None
+    workers = None
+    processes = None
+    # Lido without ledgersVersion, stash accounts are compared instead
+    legacy_lido = False
+    # (first nonce, count) taken from exited workers and not cancelled yet
+    gaps = None
+
+    def __init__(self, args, workers):
+        self.args = args
+        self.workers = workers
+        self.processes = []
+        self.gaps = []
+        context = multiprocessing.get_context('spawn')
+        self._context = context
+        self.counter = context.Value('q', -1)
+        self.allocations = context.Array('q', 2 * workers, lock=False)
+        self.epoch = context.Value('q', 0)
+
+    def _start_worker(self, index):
+        process = self._context.Process(
+            target=run_worker, args=(index, self.args, self.counter, self.allocations, self.epoch), daemon=True
+        )
+        process.start()
+        return process
+
+    def take_allocation(self, index):
+        '''
+        Move nonces allocated by worker `index` and not sent to gaps, it is called after worker exits
+        '''
+        with self.counter.get_lock():
+            (nonce, count) = (self.allocations[2 * index], self.allocations[2 * index + 1])
+            self.allocations[2 * index + 1] = 0
+        if count > 0:
+            self.gaps.append((nonce, count))
+
+    async def fill_gaps(self, submitter):
+        '''
+        Cancel nonces of gaps, including the ones which exited worker could send before exit
+        '''
+        while len(self.gaps) > 0:
+            (nonce, count) = self.gaps[0]
+            log.warning("cancelling nonces %d..%d allocated by exited worker", nonce, nonce + count - 1)
+            await submitter.cancel_nonces(nonce, count)
+            self.gaps.pop(0)
+
+    async def get_ledgers_state(self, oracle_master, lido):
+        '''
+        @return Lido ledgers version or, for Lido without ledgersVersion, tuple of stash accounts
+        '''
+        if not self.legacy_lido:
+            try:
+                return await oracle_master.get_ledgers_version(lido)
+            except RpcError as error:
+                log.warning("Lido has no ledgersVersion (%s), stash accounts are compared until restart", error)
+                self.legacy_lido = True
+        return tuple(await oracle_master.get_stash_accounts())
+
+    async def watch(self):
+        ring = HashRing(range(self.workers))
+        async with aiohttp.ClientSession() as session:
+            para_rpc = JsonRpc(session, self.args.para_url)
+            submitter = Submitter(para_rpc, os.environ['ORACLE_PRIVATE_KEY'])
+            self.counter.value = int(await para_rpc.call('eth_getTransactionCount', submitter.address, 'pending'), 16)
+            self.processes = [self._start_worker(index) for index in range(self.workers)]
+
+            oracle_master = OracleMasterClient(para_rpc, self.args.oracle_master)
+            lido = await oracle_master.get_lido()
+            state = await self.get_ledgers_state(oracle_master, lido)
+            log.info("stashes per worker: %s", {w: len(s) for (w, s) in ring.partition(await oracle_master.get_stash_accounts()).items()})
+            while True:
+                await asyncio.sleep(self.args.poll_interval)
+                for (index, process) in enumerate(self.processes):
+                    if not process.is_alive():
+                        log.error("worker %d exited with code %s, restarting", index, process.exitcode)
+                        self.take_allocation(index)
+                        self.processes[index] = self._start_worker(index)
+                try:
+                    await self.fill_gaps(submitter)
+                except Exception:
+                    log.exception("nonces cancellation failed, retrying on the next poll")
+                try:
+                    last_state = state
+                    state = await self.get_ledgers_state(oracle_master, lido)
+                    if state != last_state:
+                        with self.epoch.get_lock():
+                            self.epoch.value += 1
+                        stashes = await oracle_master.get_stash_accounts()
+                        log.info("ledger set changed, stashes per worker: %s", {w: len(s) for (w, s) in ring.partition(stashes).items()})
+                except Exception:
+                    log.exception("ledger set check failed")
+
+    def run(self):
+        try:
+            asyncio.run(self.watch())
+        finally:
+            for process in self.processes:
+                process.terminate()
@@ -0,0 +1,95 @@
+import sqlite3
+
+from .parachain import abi_encode, abi_decode
+from .report import ORACLE_DATA_ABI, decode_oracle_data
+from .quorum import report_variant
+
+
+# reports of older eras are removed from store
+HISTORY_ERAS = 28
+
+
+def encode_report(report):
+    return abi_encode([ORACLE_DATA_ABI], [tuple(report)])
+
+
+def decode_report(data):
+    (report,) = abi_decode([ORACLE_DATA_ABI], data)
+    return decode_oracle_data(report)
+
+
+class StateStore:
+    '''
+    SQLite oracle member state: the last reported era and per era, per stash relay snapshots
+    (ABI encoded reports), their variant hashes and submission results
+    '''
+    db = None
+
+    def __init__(self, path):
+        self.db = sqlite3.connect(path)
+        with self.db:
+            self.db.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER)')
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS reports (
+                    era_id INTEGER NOT NULL,
+                    stash BLOB NOT NULL,
+                    relay_block TEXT NOT NULL,
+                    report BLOB NOT NULL,
+                    report_hash BLOB NOT NULL,
+                    tx_hash TEXT,
+                    status INTEGER,
+                    PRIMARY KEY (era_id, stash)
+                )
+            ''')
+
+    def close(self):
+        self.db.close()
+
+    def get_last_era(self):
+        row = self.db.execute("SELECT value FROM meta WHERE key = 'last_era'").fetchone()
+        return row[0] if row is not None else None
+
+    def set_last_era(self, era_id):
+        with self.db:
+            self.db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_era', ?)", (era_id,))
+            self.db.execute('DELETE FROM reports WHERE era_id <= ?', (era_id - HISTORY_ERAS,))
+
+    def save_reports(self, era_id, relay_block, reports):
+        '''
+        Save relay snapshots of `era_id`, the existing ones are kept to resubmit the same report bytes
+        '''
+        with self.db:
+            self.db.executemany(
+                'INSERT OR IGNORE INTO reports (era_id, stash, relay_block, report, report_hash) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (era_id, bytes(report.stash_account), relay_block, encode_report(report), report_variant(report).to_bytes(32, 'big'))
+                    for report in reports
+                ],
+            )
+
+    def get_reports(self, era_id):
+        '''
+        @return dict stash => report saved for `era_id`
+        '''
+        rows = self.db.execute('SELECT stash, report FROM reports WHERE era_id = ?', (era_id,))
+        return {bytes(stash): decode_report(report) for (stash, report) in rows}
+
+    def save_receipts(self, era_id, results):
+        '''
+        @param results - list of (stash, receipt), receipt is None if transaction was not accepted by node
+        '''
+        with self.db:
+            self.db.executemany(
+                'UPDATE reports SET tx_hash = ?, status = ? WHERE era_id = ? AND stash = ?',
+                [
+                    (receipt['transactionHash'], int(receipt['status'], 16), era_id, bytes(stash))
+                    for (stash, receipt) in results if receipt is not None
+                ],
+            )
+
+    def get_receipts(self, era_id):
+        '''
+        @return dict stash => (tx hash, status) for submitted reports of `era_id`
+        '''
+        rows = self.db.execute('SELECT stash, tx_hash, status FROM reports WHERE era_id = ? AND tx_hash IS NOT NULL', (era_id,))
+        return {bytes(stash): (tx_hash, status) for (stash, tx_hash, status) in rows}
@@ -0,0 +1,250 @@
+import asyncio
+import logging
+
+from eth_account import Account
+
+from .rpc import RpcError
+from .metrics import TX_INCLUSION_SECONDS, TX_RETRIES
+
+
+log = logging.getLogger(__name__)
+
+
+GAS_LIMIT = 10 * 10**6
+# gas of empty self transfer which cancels transaction with the same nonce
+CANCEL_GAS_LIMIT = 21_000
+RECEIPT_POLL_INTERVAL = 1
+# pending transaction is replaced by the same one with higher gas price after this time (seconds)
+REPLACE_AFTER = 60
+# nodes accept replacement only with at least +10% gas price
+GAS_PRICE_BUMP = 1.125
+# seconds between attempts to broadcast cancellation rejected by node
+CANCEL_RETRY_INTERVAL = 5
+
+
+class NonceManager:
+    '''
+    Local nonce allocator: node is asked for pending nonce only on the first use
+    '''
+    rpc = None
+    address = None
+
+    def __init__(self, rpc, address):
+        self.rpc = rpc
+        self.address = address
+        self._next = None
+        self._lock = asyncio.Lock()
+
+    async def allocate(self, count):
+        '''
+        Reserve `count` consecutive nonces, return the first one
+        '''
+        async with self._lock:
+            if self._next is None:
+                self._next = int(await self.rpc.call('eth_getTransactionCount', self.address, 'pending'), 16)
+            nonce = self._next
+            self._next += count
+            return nonce
+
+    def mark_sent(self, nonce, count):
+        '''
+        Nonces from `nonce` are broadcast or cancelled, one process has nothing to track
+        '''
+
+
+class PendingTx:
+    to = None
+    data = None
+    gas_limit = None
+    nonce = None
+    gas_price = None
+    # all broadcast versions of transaction with the same nonce
+    hashes = None
+    first_sent_at = None
+    sent_at = None
+    receipt = None
+
+    def __init__(self, to, data, gas_limit, nonce, gas_price):
+        self.to = to
+        self.data = data
+        self.gas_limit = gas_limit
+        self.nonce = nonce
+        self.gas_price = gas_price
+        self.hashes = []
+
+
+class Submitter:
+    '''
+    Pipelined transactions submitter: nonces are assigned locally, the whole batch is signed and
+    broadcast in one request, receipts of all transactions are polled together and
+    transactions pending for too long are replaced with higher gas price
+    '''
+    rpc = None
+    account = None
+    nonces = None
+    gas_limit = GAS_LIMIT
+    gas_price = None
+    replace_after = REPLACE_AFTER
+
+    def __init__(self, rpc, private_key, gas_limit=GAS_LIMIT, gas_price=None, replace_after=REPLACE_AFTER, nonces=None):
+        self.rpc = rpc
+        self.account = Account.from_key(private_key)
+        self.gas_limit = gas_limit
+        # use node gas price if not set
+        self.gas_price = gas_price
+        self.replace_after = replace_after
+        self.nonces = nonces if nonces is not None else NonceManager(rpc, self.account.address)
+        self._chain_id = None
+
+    @property
+    def address(self):
+        return self.account.address
+
+    async def _sign(self, tx):
+        if self._chain_id is None:
+            self._chain_id = int(await self.rpc.call('eth_chainId'), 16)
+        signed = self.account.sign_transaction({
+            'to': tx.to,
+            'data': tx.data,
+            'nonce': tx.nonce,
+            'gas': tx.gas_limit,
+            'gasPrice': tx.gas_price,
+            'value': 0,
+            'chainId': self._chain_id,
+        })
+        # eth-account renamed rawTransaction in 0.13
+        return bytes(getattr(signed, 'raw_transaction', None) or signed.rawTransaction)
+
+    async def _broadcast(self, txs):
+        '''
+        Broadcast transactions in one JSON-RPC batch in nonce order
+        @return list of RpcError or None for every transaction
+        '''
+        raw_txs = [await self._sign(tx) for tx in txs]
+        results = await self.rpc.batch(
+            [('eth_sendRawTransaction', ['0x' + raw_tx.hex()]) for raw_tx in raw_txs], return_errors=True
+        )
+        now = asyncio.get_running_loop().time()
+        errors = []
+        for (tx, result) in zip(txs, results):
+            if isinstance(result, RpcError):
+                errors.append(result)
+            else:
+                tx.hashes.append(result)
+                tx.sent_at = now
+                if tx.first_sent_at is None:
+                    tx.first_sent_at = now
+                errors.append(None)
+        return errors
+
+    async def _replace(self, txs):
+        for tx in txs:
+            tx.gas_price = int(tx.gas_price * GAS_PRICE_BUMP)
+        TX_RETRIES.inc(len(txs), reason='replaced')
+        for (tx, error) in zip(txs, await self._broadcast(txs)):
+            # previous version could be already included, then receipt is found on the next poll
+            if error is not None:
+                log.warning("replacement of tx with nonce %d failed: %s", tx.nonce, error)
+            else:
+                log.warning("tx with nonce %d replaced by %s, gas price %d", tx.nonce, tx.hashes[-1], tx.gas_price)
+
+    async def _wait_receipts(self, txs):
+        pending = list(txs)
+        while len(pending) > 0:
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+            calls = [('eth_getTransactionReceipt', [tx_hash]) for tx in pending for tx_hash in tx.hashes]
+            receipts = iter(await self.rpc.batch(calls))
+            now = asyncio.get_running_loop().time()
+            for tx in pending:
+                for receipt in [next(receipts) for _ in tx.hashes]:
+                    if receipt is not None:
+                        tx.receipt = receipt
+                if tx.receipt is not None:
+                    TX_INCLUSION_SECONDS.observe(now - tx.first_sent_at)
+            pending = [tx for tx in pending if tx.receipt is None]
+
+            stuck = [tx for tx in pending if now - tx.sent_at >= self.replace_after]
+            if len(stuck) > 0:
+                await self._replace(stuck)
+
+    async def _nonce_used(self, nonce):
+        return int(await self.rpc.call('eth_getTransactionCount', self.address, 'latest'), 16) > nonce
+
+    async def _cancel(self, txs):
+        '''
+        Replace transactions with empty self transfers: the first one fills the nonce gap, transactions
+        already queued after the gap are replaced with higher gas price, so their calls are never executed.
+        Rejected cancellation is broadcast again with higher gas price until node accepts it or its nonce
+        is used, so every allocated nonce is used and the next batch continues after them.
+        @return cancellations accepted by node
+        '''
+        for tx in txs:
+            if len(tx.hashes) > 0:
+                tx.gas_price = int(tx.gas_price * GAS_PRICE_BUMP)
+            tx.to = self.address
+            tx.data = b''
+            tx.gas_limit = CANCEL_GAS_LIMIT
+        TX_RETRIES.inc(len(txs), reason='cancelled')
+        errors = await self._broadcast(txs)
+        accepted = []
+        for (tx, error) in zip(txs, errors):
+            while error is not None:
+                log.error("cancellation of tx with nonce %d failed: %s", tx.nonce, error)
+                # queued transaction could be included before its cancellation
+                if await self._nonce_used(tx.nonce):
+                    break
+                await asyncio.sleep(CANCEL_RETRY_INTERVAL)
+                tx.gas_price = int(tx.gas_price * GAS_PRICE_BUMP)
+                TX_RETRIES.inc(reason='cancelled')
+                (error,) = await self._broadcast([tx])
+            if error is None:
+                # the original transaction is found as well if it is included before cancellation
+                accepted.append(tx)
+        return accepted
+
+    async def send_batch(self, txs):
+        '''
+        Send list of (to, data) or (to, data, gas limit) transactions with consecutive nonces
+        @return receipts in the same order, None for transactions rejected by node
+        '''
+        if len(txs) == 0:
+            return []
+        (nonce, gas_price) = await asyncio.gather(
+            self.nonces.allocate(len(txs)),
+            self._get_gas_price(),
+        )
+        pending = [
+            PendingTx(tx[0], tx[1], tx[2] if len(tx) > 2 else self.gas_limit, nonce + i, gas_price)
+            for (i, tx) in enumerate(txs)
+        ]
+
+        errors = await self._broadcast(pending)
+        rejected = [i for (i, error) in enumerate(errors) if error is not None]
+        cancelled = []
+        if len(rejected) > 0:
+            log.error("tx with nonce %d rejected: %s", pending[rejected[0]].nonce, errors[rejected[0]])
+            TX_RETRIES.inc(len(pending) - rejected[0], reason='rejected')
+            # the rest of batch is queued behind the nonce gap, it is cancelled instead of being
+            # left in the pool, otherwise its calls are executed whenever the gap is filled
+            cancelled = await self._cancel(pending[rejected[0]:])
+            pending = pending[:rejected[0]]
+
+        # nonces of the whole batch are used, the next batch continues after them
+        self.nonces.mark_sent(nonce, len(txs))
+        await self._wait_receipts(pending + cancelled)
+        receipts = [tx.receipt for tx in pending]
+        return receipts + [None] * (len(txs) - len(receipts))
+
+    async def cancel_nonces(self, nonce, count):
+        '''
+        Fill `count` nonces from `nonce` which were allocated by another process with empty self transfers,
+        transactions which could be already sent with them are replaced with higher gas price
+        '''
+        gas_price = int(await self._get_gas_price() * GAS_PRICE_BUMP)
+        txs = [PendingTx(self.address, b'', CANCEL_GAS_LIMIT, nonce + i, gas_price) for i in range(count)]
+        await self._wait_receipts(await self._cancel(txs))
+
+    async def _get_gas_price(self):
+        if self.gas_price is not None:
+            return self.gas_price
+        return int(await self.rpc.call('eth_gasPrice'), 16)
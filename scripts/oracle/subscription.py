@@ -0,0 +1,193 @@
+import asyncio
+import itertools
+import logging
+
+import aiohttp
+
+from .rpc import RpcError
+from .relay import active_era_key, decode_active_era
+from .metrics import RPC_ERRORS
+
+
+log = logging.getLogger(__name__)
+
+
+# reconnect delays (seconds), doubled after every failed attempt
+BACKOFF_MIN = 1
+BACKOFF_MAX = 60
+HEARTBEAT = 30
+# retry interval while pushed relay era is not finalized or not started on the parachain side yet
+RETRY_INTERVAL = 6
+
+
+class Subscription:
+    '''
+    JSON-RPC pub-sub over websocket: yields notification results, reconnects with exponential backoff
+    and subscribes again. `resume` is called after reconnect with a request function to fetch
+    items missed while disconnected, they are yielded before new notifications.
+    '''
+    session = None
+    url = None
+    method = None
+    params = None
+    resume = None
+    backoff_min = BACKOFF_MIN
+    backoff_max = BACKOFF_MAX
+
+    def __init__(self, session, url, method, params, resume=None, backoff_min=BACKOFF_MIN, backoff_max=BACKOFF_MAX):
+        self.session = session
+        self.url = url
+        self.method = method
+        self.params = params
+        self.resume = resume
+        self.backoff_min = backoff_min
+        self.backoff_max = backoff_max
+        self._ids = itertools.count(1)
+
+    async def _request(self, ws, buffer, method, params):
+        '''
+        Send request and wait for its response, notifications received meanwhile are kept in `buffer`
+        '''
+        request_id = next(self._ids)
+        await ws.send_json({'jsonrpc': '2.0', 'id': request_id, 'method': method, 'params': list(params)})
+        async for message in ws:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                break
+            data = message.json()
+            if data.get('id') != request_id:
+                buffer.append(data)
+                continue
+            if 'error' in data:
+                RPC_ERRORS.inc(method=method)
+                raise RpcError(data['error'])
+            return data['result']
+        raise ConnectionError('websocket closed')
+
+    async def __aiter__(self):
+        backoff = self.backoff_min
+        connected = False
+        while True:
+            try:
+                async with self.session.ws_connect(self.url, heartbeat=HEARTBEAT) as ws:
+                    buffer = []
+                    subscription = await self._request(ws, buffer, self.method, self.params)
+                    if connected and self.resume is not None:
+                        for item in await self.resume(lambda method, *params: self._request(ws, buffer, method, params)):
+                            yield item
+                    connected = True
+                    backoff = self.backoff_min
+
+                    for data in buffer:
+                        if data.get('params', {}).get('subscription') == subscription:
+                            yield data['params']['result']
+                    async for message in ws:
+                        if message.type != aiohttp.WSMsgType.TEXT:
+                            break
+                        data = message.json()
+                        if data.get('params', {}).get('subscription') == subscription:
+                            yield data['params']['result']
+                log.warning("%s: subscription %s closed", self.url, self.method)
+            except RpcError as e:
+                # already counted by _request with the method of the failed request
+                log.warning("%s: subscription %s failed: %s", self.url, self.method, e)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError) as e:
+                RPC_ERRORS.inc(method=self.method)
+                log.warning("%s: subscription %s failed: %s", self.url, self.method, e)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.backoff_max)
+
+
+def subscribe_active_era(session, url, **kwargs):
+    '''
+    Relay chain Staking.ActiveEra storage changes, node sends the current value right after subscription,
+    so nothing is missed after reconnect
+    '''
+    return Subscription(session, url, 'state_subscribeStorage', [['0x' + active_era_key().hex()]], **kwargs)
+
+
+def _log_position(event):
+    return (int(event['blockNumber'], 16), int(event['logIndex'], 16))
+
+
+def subscribe_logs(session, url, address, **kwargs):
+    '''
+    Logs of contract `address` (or list of addresses), logs missed while disconnected are requested
+    with eth_getLogs from the block of the last seen log
+    '''
+    subscription = Subscription(session, url, 'eth_subscribe', ['logs', {'address': address}], **kwargs)
+    last_seen = None
+
+    async def resume(request):
+        if last_seen is None:
+            return []
+        events = await request('eth_getLogs', {'address': address, 'fromBlock': hex(last_seen[0]), 'toBlock': 'latest'})
+        return [event for event in events if _log_position(event) > last_seen]
+
+    subscription.resume = resume
+
+    async def events():
+        nonlocal last_seen
+        async for event in subscription:
+            position = _log_position(event)
+            if last_seen is not None and position <= last_seen:
+                continue
+            last_seen = position
+            yield event
+
+    return events()
+
+
+class SubscriptionTrigger:
+    '''
+    Runs OracleService on pushed relay era changes and parachain contracts events instead of polling
+    '''
+    service = None
+    active_eras = None
+    oracle_master_logs = None
+    retry_interval = RETRY_INTERVAL
+    # the latest relay active era pushed by node
+    target_era = None
+
+    def __init__(self, service, active_eras, oracle_master_logs, retry_interval=RETRY_INTERVAL):
+        self.service = service
+        self.active_eras = active_eras
+        self.oracle_master_logs = oracle_master_logs
+        self.retry_interval = retry_interval
+        self.wake = asyncio.Event()
+
+    async def watch_active_era(self):
+        async for change_set in self.active_eras:
+            for (_, value) in change_set['changes']:
+                if value is None:
+                    continue
+                era_id = decode_active_era(bytes.fromhex(value[2:]))
+                if self.target_era is None or era_id > self.target_era:
+                    log.info("relay active era %d", era_id)
+                    self.target_era = era_id
+                    self.wake.set()
+
+    async def watch_oracle_master(self):
+        async for event in self.oracle_master_logs:
+            # members, quorum, era anchor or ledgers changed: check the current era again
+            log.info("event of %s in block %d", event.get('address'), int(event['blockNumber'], 16))
+            self.service.last_era = None
+            self.wake.set()
+
+    def is_done(self):
+        return self.target_era is None or (self.service.last_era is not None and self.service.last_era >= self.target_era)
+
+    async def report(self):
+        while True:
+            await self.wake.wait()
+            self.wake.clear()
+            try:
+                await self.service.run_once()
+            except Exception:
+                log.exception("oracle iteration failed")
+            if not self.is_done() and not self.wake.is_set():
+                # finalized relay head or parachain era clock is behind the pushed era
+                asyncio.get_running_loop().call_later(self.retry_interval, self.wake.set)
+
+    async def run(self):
+        self.wake.set()
+        await asyncio.gather(self.watch_active_era(), self.watch_oracle_master(), self.report())
@@ -0,0 +1,130 @@
+from collections import namedtuple
+
+from .parachain import batch_call
+from .report import is_consistent
+
+
+ZERO_ADDRESS = '0x' + '00' * 20
+
+# Ledger storage used by pushData before the balance difference check
+LedgerState = namedtuple('LedgerState', [
+    'cached_total_balance',
+    'total_balance',
+    'locked_balance',
+    'transfer_upward_balance',
+    'transfer_downward_balance',
+    'pending_bonds',
+    # VKSM.balanceOf(ledger)
+    'vksm_balance',
+])
+
+LEDGER_STATE_CALLS = [
+    'cachedTotalBalance', 'totalBalance', 'lockedBalance', 'transferUpwardBalance', 'transferDownwardBalance', 'pendingBonds',
+]
+
+
+def process_relay_transfers(state, report):
+    '''
+    Mirror of Ledger._processRelayTransfers
+    @return (cachedTotalBalance after completed transfers, true if all transfers are completed and report is checked further)
+    '''
+    cached_total_balance = state.cached_total_balance
+    downward = state.transfer_downward_balance
+    if downward > 0 and state.vksm_balance >= downward:
+        cached_total_balance -= downward
+        downward = 0
+
+    upward = state.transfer_upward_balance
+    if upward > 0:
+        ledger_free_balance = state.total_balance - state.locked_balance
+        free_balance_diff = (report.stash_balance - report.total_balance) - ledger_free_balance
+        if free_balance_diff >= upward - state.pending_bonds:
+            cached_total_balance += upward
+            upward = 0
+
+    return (cached_total_balance, downward == 0 and upward == 0)
+
+
+def validate_report(report, state, total_supply, max_difference):
+    '''
+    Apply OracleMaster.reportRelay and Ledger.pushData checks to report
+    @param state - LedgerState of report ledger
+    @param total_supply - Lido.totalSupply
+    @param max_difference - Lido.MAX_ALLOWABLE_DIFFERENCE, base points of total supply
+    @return revert reason or None
+    '''
+    if not is_consistent(report):
+        return 'OM: INCORRECT_REPORT'
+
+    (cached_total_balance, processed) = process_relay_transfers(state, report)
+    if processed and total_supply > 0:
+        difference = abs(report.stash_balance - cached_total_balance) * 10000 // total_supply
+        if difference >= max_difference:
+            return 'LEDGER: DIFFERENCE_EXCEEDS_BALANCE'
+    return None
+
+
+class ReportValidator:
+    '''
+    Checks reports before submission, Lido and ledgers values are fetched once per era
+    '''
+    oracle_master = None
+    era_id = None
+    total_supply = None
+    max_difference = None
+    # stash => LedgerState of the current era
+    states = None
+
+    def __init__(self, oracle_master):
+        self.oracle_master = oracle_master
+        self.states = {}
+        self._lido = None
+
+    async def _load(self, era_id, stashes, block):
+        rpc = self.oracle_master.rpc
+        if self._lido is None:
+            self._lido = await self.oracle_master.get_lido()
+        if era_id != self.era_id:
+            ((total_supply,), (max_difference,)) = await batch_call(rpc, [
+                (self._lido, 'totalSupply', [], [], ['uint256']),
+                (self._lido, 'MAX_ALLOWABLE_DIFFERENCE', [], [], ['uint128']),
+            ], block)
+            (self.era_id, self.total_supply, self.max_difference, self.states) = (era_id, total_supply, max_difference, {})
+
+        missing = [stash for stash in stashes if stash not in self.states]
+        if len(missing) == 0:
+            return
+        ledgers = [ledger for (ledger,) in await batch_call(rpc, [
+            (self._lido, 'findLedger', ['bytes32'], [stash], ['address']) for stash in missing
+        ], block)]
+        # unknown stashes are rejected by OracleMaster
+        known = [(stash, ledger) for (stash, ledger) in zip(missing, ledgers) if ledger != ZERO_ADDRESS]
+        (missing, ledgers) = ([stash for (stash, _) in known], [ledger for (_, ledger) in known])
+
+        # ledger state and vKSM token address, then vKSM balances
+        size = len(LEDGER_STATE_CALLS)
+        values = await batch_call(rpc, [
+            (ledger, name, [], [], ['uint128']) for ledger in ledgers for name in LEDGER_STATE_CALLS
+        ] + [(ledger, 'VKSM', [], [], ['address']) for ledger in ledgers], block)
+        balances = await batch_call(rpc, [
+            (token, 'balanceOf', ['address'], [ledger], ['uint256'])
+            for ((token,), ledger) in zip(values[len(ledgers) * size:], ledgers)
+        ], block)
+
+        for (i, stash) in enumerate(missing):
+            fields = [value for (value,) in values[i * size:(i + 1) * size]]
+            self.states[stash] = LedgerState(*fields, balances[i][0])
+
+    async def validate(self, era_id, reports, block='latest'):
+        '''
+        @return list of revert reasons (None for valid report) in reports order
+        '''
+        await self._load(era_id, [report.stash_account for report in reports], block)
+        errors = []
+        for report in reports:
+            state = self.states.get(report.stash_account)
+            if state is None:
+                errors.append('OM: ORACLE_FOR_LEDGER_NOT_FOUND')
+            else:
+                errors.append(validate_report(report, state, self.total_supply, self.max_difference))
+        return errors
@@ -50,4 +50,11 @@ def main():
         i *= 2
         nominees.append(i)
 
+    # nominate with full size account ids, gas of local encoder for typical nominees count
+    for count in [1, 16, 24]:
+        nominees = [2**256 - 1 - i for i in range(count)]
+        if (encoder.encode_nominate(nominees) != enc.encode_nominate(nominees)):
+            print("Error: " + str(count) + " nominees")
+        print(str(count) + " nominees: " + str(encoder.encode_nominate.estimate_gas(nominees)) + " gas")
+
     print("Done")
\ No newline at end of file
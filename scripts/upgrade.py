@@ -0,0 +1,103 @@
+import json
+import os
+import yaml
+from pathlib import Path
+from brownie import *
+from colorama import Fore, init
+
+init(autoreset=True)
+
+
+NETWORK=os.getenv("NETWORK", "polkadot")
+
+GAS_PRICE = "100 gwei"
+GAS_LIMIT = 10*10**6
+
+
+# utils
+def get_opts(sender, gas_price=GAS_PRICE, gas_limit=GAS_LIMIT):
+    return {'from': sender, 'gas_price': gas_price, 'gas_limit': gas_limit}
+
+
+def load_deployments(network):
+    path = './deployments/' + network + '.json'
+    if Path(path).is_file():
+        with open(path) as file:
+            return json.load(file)
+    else:
+        return {}
+
+
+def load_deployment_config(network):
+    with open('./deployment-config.yml') as file:
+        return yaml.safe_load(file)['networks'][network]
+
+
+# upgrade functions
+def upgrade_lido(proxy_admin, lido, lido_impl, ledger_impl, auth_manager, owner, auth_admin, beacon_manager):
+    '''
+    Upgrade Lido proxy to `lido_impl` and ledgers to `ledger_impl`. Ledgers registry of the previous version
+    is migrated and ledger beacon is switched to the new revision by the same transaction, so ledger
+    callbacks never see unmigrated registry and ledgers never run against Lido of another version:
+        1. new ledger implementation is added to the beacon, it is not current yet
+        2. Lido gets ROLE_BEACON_MANAGER to switch beacon revision from migrateLedgers
+        3. ProxyAdmin.upgradeAndCall upgrades Lido, migrates registry and switches beacon revision
+        4. ROLE_BEACON_MANAGER is revoked from Lido
+    '''
+    beacon = LedgerBeacon.at(lido.LEDGER_BEACON())
+    role = web3.keccak(text='ROLE_BEACON_MANAGER')
+
+    print(f'{Fore.GREEN}Adding Ledger implementation {ledger_impl.address} to beacon ...')
+    beacon.addImplementation(ledger_impl, get_opts(beacon_manager))
+    revision = beacon.latestRevision()
+    auth_manager.add(role, lido, get_opts(auth_admin))
+
+    print(f'{Fore.GREEN}Upgrading Lido {lido.address} to {lido_impl.address}, ledgers revision {revision} ...')
+    tx = proxy_admin.upgradeAndCall(lido, lido_impl, lido_impl.migrateLedgers.encode_input(revision), get_opts(owner))
+
+    auth_manager.remove(role, lido, get_opts(auth_admin))
+    return tx
+
+
+def upgrade_oracle_master(proxy_admin, oracle_master, oracle_master_impl, oracle_clone, owner):
+    '''
+    Upgrade OracleMaster proxy to `oracle_master_impl`. Oracle members are indexed and oracles of all ledgers
+    are replaced with clones of `oracle_clone` by the same transaction. It doesn't depend on Lido upgrade
+    '''
+    print(f'{Fore.GREEN}Upgrading OracleMaster {oracle_master.address} to {oracle_master_impl.address}, oracle clone {oracle_clone.address} ...')
+    return proxy_admin.upgradeAndCall(
+        oracle_master, oracle_master_impl, oracle_master_impl.migrateOracles.encode_input(oracle_clone), get_opts(owner)
+    )
+
+
+# upgrade of deployment made by deploy.py
+def main():
+    deployment_config = load_deployment_config(NETWORK)
+    deployments = load_deployments(NETWORK)
+    deployer = accounts.load(deployment_config['deployer'])
+    roles = deployment_config['roles']
+
+    oz = project.load(Path.home() / ".brownie" / "packages" / config["dependencies"][0])
+    proxy_admin = oz.ProxyAdmin.at(deployments['ProxyAdmin'])
+    auth_manager = AuthManager.at(deployments['AuthManager'])
+    oracle_master = OracleMaster.at(deployments['OracleMaster'])
+    lido = Lido.at(deployments['Lido'])
+
+    oracle_master_impl = OracleMaster.deploy(get_opts(deployer))
+    print(f'{Fore.GREEN}OracleMaster implementation deployed at {Fore.YELLOW}{oracle_master_impl.address}')
+    oracle_clone = (OraclePacked if deployment_config.get('oracle_packed', False) else Oracle).deploy(get_opts(deployer))
+    print(f'{Fore.GREEN}Oracle clone template deployed at {Fore.YELLOW}{oracle_clone.address}')
+
+    upgrade_oracle_master(proxy_admin, oracle_master, oracle_master_impl, oracle_clone, deployer)
+    print(f'{Fore.GREEN}OracleMaster storage version: {oracle_master.storageVersion()}')
+
+    lido_impl = Lido.deploy(get_opts(deployer))
+    print(f'{Fore.GREEN}Lido implementation deployed at {Fore.YELLOW}{lido_impl.address}')
+    ledger_impl = Ledger.deploy(get_opts(deployer))
+    print(f'{Fore.GREEN}Ledger implementation deployed at {Fore.YELLOW}{ledger_impl.address}')
+
+    upgrade_lido(
+        proxy_admin, lido, lido_impl, ledger_impl, auth_manager,
+        deployer, deployment_config['auth_sudo'], roles['ROLE_BEACON_MANAGER']
+    )
+    print(f'{Fore.GREEN}Lido storage version: {lido.storageVersion()}, ledgers version: {lido.ledgersVersion()}')
@@ -121,6 +121,26 @@ def lido(Lido, vKSM, controller, auth_manager, oracle_master, withdrawal, proxy_
     return _lido
 
 
+@pytest.fixture(scope="module")
+def lido_v1(LidoV1, LedgerV1, OracleV1, OracleMasterV1, LedgerBeacon, LedgerFactory, vKSM, controller, auth_manager, withdrawal, proxy_admin, chain, accounts, developers, treasury):
+    '''
+    Lido with oracle master and ledgers as deployed before the ledger registry upgrade, see upgrade_test.py
+    '''
+    oc = OracleV1.deploy({'from': accounts[0]})
+    (om, _) = deploy_with_proxy(OracleMasterV1, proxy_admin, oc, 1)
+    lc = LedgerV1.deploy({'from': accounts[0]})
+    (_lido, _) = deploy_with_proxy(LidoV1, proxy_admin, auth_manager, vKSM, controller, developers, treasury, om, withdrawal, 50000 * 10**18, 3000)
+    ledger_beacon = LedgerBeacon.deploy(lc, _lido, {'from': accounts[0]})
+    ledger_factory = LedgerFactory.deploy(_lido, ledger_beacon, {'from': accounts[0]})
+    _lido.setLedgerBeacon(ledger_beacon, {'from': accounts[0]})
+    _lido.setLedgerFactory(ledger_factory, {'from': accounts[0]})
+
+    era_sec = 60 * 60 * 6
+    _lido.setRelaySpec((16, 1, 0, 32), {'from': accounts[0]})
+    om.setAnchorEra(0, chain.time(), era_sec, {'from': accounts[0]})
+    return _lido
+
+
 @pytest.fixture(scope="module")
 def mocklido(Lido, LedgerMock, LedgerBeacon, LedgerFactory, Oracle, OracleMaster, Withdrawal, vKSM, controller, auth_manager, admin, developers, treasury):
     lc = LedgerMock.deploy({'from': admin})
@@ -150,4 +170,25 @@ def mockledger(mocklido, admin, LedgerMock):
 @pytest.fixture(scope="module")
 def wstKSM(lido, WstKSM, vKSM, admin):
     _wstKSM = WstKSM.deploy(lido, vKSM, 12, {'from': admin})
-    return _wstKSM
\ No newline at end of file
+    return _wstKSM
+
+
+@pytest.fixture(scope="module")
+def multicall(Multicall_mock, accounts):
+    return Multicall_mock.deploy({'from': accounts[0]})
+
+@pytest.fixture(scope="module")
+def scenario(request):
+    '''
+    Prebuilt chain state, use with indirect parametrization:
+        @pytest.mark.parametrize('scenario', ['large'], indirect=True)
+    '''
+    from scenarios import is_built, load_scenario
+
+    name = request.param
+    if not is_built(name):
+        pytest.skip(f"scenario '{name}' is not built, run `brownie run build_scenario main {name}`")
+
+    _scenario = load_scenario(name)
+    yield _scenario
+    _scenario.close()
@@ -0,0 +1,70 @@
+import rlp
+from eth_utils import keccak
+
+from scripts.oracle.rpc import RpcError
+
+
+class EvmRpcMock:
+    '''
+    In-memory parachain node: accepts raw transactions and includes them on `mine`
+    '''
+    def __init__(self, reject_nonces=()):
+        self.reject_nonces = list(reject_nonces)
+        self.nonce = 5
+        self.pending = {}
+        self.receipts = {}
+        self.gas_prices = {}
+        # tx hash => (to, data)
+        self.calls = {}
+        self.requests = []
+
+    def mine(self, limit=None):
+        '''
+        Include pending transactions with consecutive nonces
+        '''
+        while self.nonce in self.pending and (limit is None or limit > 0):
+            tx_hash = self.pending.pop(self.nonce)
+            self.receipts[tx_hash] = {'transactionHash': tx_hash, 'status': '0x1', 'gasUsed': '0x1'}
+            self.nonce += 1
+            limit = limit - 1 if limit is not None else None
+
+    def _handle(self, method, params):
+        if method == 'eth_chainId':
+            return '0x1'
+        if method == 'eth_gasPrice':
+            return hex(10**9)
+        if method == 'eth_getTransactionCount':
+            return hex(self.nonce)
+        if method == 'eth_sendRawTransaction':
+            raw = bytes.fromhex(params[0][2:])
+            # legacy transaction: rlp([nonce, gas price, gas, to, value, data, v, r, s])
+            fields = rlp.decode(raw)
+            (nonce, gas_price) = [int.from_bytes(field, 'big') for field in fields[:2]]
+            if nonce in self.reject_nonces:
+                # rejected once per occurrence in reject_nonces, e.g. pool was full
+                self.reject_nonces.remove(nonce)
+                raise RpcError({'message': 'txpool is full'})
+            tx_hash = '0x' + keccak(raw).hex()
+            self.pending[nonce] = tx_hash
+            self.gas_prices[tx_hash] = gas_price
+            self.calls[tx_hash] = ('0x' + fields[3].hex(), fields[5])
+            return tx_hash
+        if method == 'eth_getTransactionReceipt':
+            return self.receipts.get(params[0])
+        raise ValueError(method)
+
+    async def call(self, method, *params):
+        self.requests.append([method])
+        return self._handle(method, params)
+
+    async def batch(self, calls, return_errors=False):
+        self.requests.append([method for (method, _) in calls])
+        results = []
+        for (method, params) in calls:
+            try:
+                results.append(self._handle(method, params))
+            except RpcError as error:
+                if not return_errors:
+                    raise
+                results.append(error)
+        return results
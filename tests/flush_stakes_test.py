@@ -0,0 +1,51 @@
+from helpers import distribute_initial_tokens, idle_report, ledger_stashes, add_ledgers, setup_members
+
+
+def flush(lido, oracle_master, accounts, chain, era, stash):
+    # the first report of era flushes stakes, quorum isn't reached so ledgers get nothing
+    lido.deposit(10**18, {'from': accounts[0]})
+    chain.sleep(6 * 60 * 60)
+    return oracle_master.reportRelay(era, idle_report(stash), {'from': accounts[1]})
+
+
+def test_flush_stakes_gas(lido, oracle_master, vKSM, accounts, chain):
+    distribute_initial_tokens(vKSM, lido, accounts)
+    setup_members(oracle_master, accounts, 2, 2)
+
+    stashes = ledger_stashes(40)
+    add_ledgers(lido, stashes[:10], accounts)
+    # the first flush of new ledgers writes their stakes from zero, so the next one is measured
+    flush(lido, oracle_master, accounts, chain, 1, stashes[0])
+    small = flush(lido, oracle_master, accounts, chain, 2, stashes[0])
+
+    add_ledgers(lido, stashes[10:], accounts)
+    flush(lido, oracle_master, accounts, chain, 3, stashes[0])
+    large = flush(lido, oracle_master, accounts, chain, 4, stashes[0])
+
+    per_ledger = (large.gas_used - small.gas_used) // 30
+    print(f'flush: 10 ledgers {small.gas_used} gas, 40 ledgers {large.gas_used} gas, {per_ledger} gas per ledger')
+    # registry list item, stake with borrow slot, stake update and pending downward slot of ledger which stake is increased
+    assert per_ledger < 15_000
+
+    # pending downward transfers are mirrored in Lido, ledgers aren't called
+    ledgers = set(lido.getLedgerAddresses())
+    assert not any(call.get('to') in ledgers for call in large.subcalls)
+
+
+def test_flush_stake_excess_calls(lido, oracle_master, vKSM, accounts, chain):
+    distribute_initial_tokens(vKSM, lido, accounts)
+    setup_members(oracle_master, accounts, 2, 2)
+
+    stashes = add_ledgers(lido, ledger_stashes(20), accounts)
+    ledgers = lido.getLedgerAddresses()
+    flush(lido, oracle_master, accounts, chain, 1, stashes[0])
+    # ledgers didn't take their stakes, so every ledger has stake excess over borrow
+    assert all(lido.ledgerStake(ledger) > lido.ledgerBorrow(ledger) for ledger in ledgers)
+
+    tx = flush(lido, oracle_master, accounts, chain, 2, stashes[0])
+    balance_calls = [call for call in tx.subcalls if call.get('from') == lido.address and call.get('to') == vKSM.address
+                     and call.get('function', '').startswith('balanceOf')]
+    assert len(balance_calls) == 1
+    # excess is returned to deposits and distributed again
+    assert all(lido.ledgerStake(ledger) > 0 for ledger in ledgers)
+    assert lido.bufferedDeposits() == 0
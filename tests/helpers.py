@@ -1,5 +1,6 @@
 
-from brownie import Ledger
+# ledgers onboarded by one `addLedgers` transaction, limited by block gas limit
+LEDGERS_BATCH_SIZE = 10
 
 class RelayLedger:
     ledger_address = None
@@ -11,6 +12,8 @@ class RelayLedger:
     unlocking_chunks = []
     validators = 0
     status = None
+    # relay balance changes (rewards and slashes) which are not accounted by Lido yet
+    unreported_balance = 0
 
     relay = None
 
@@ -25,6 +28,7 @@ class RelayLedger:
         self.unlocking_chunks = []
         self.validators = 0
         self.status = None
+        self.unreported_balance = 0
 
     def total_balance(self):
         return self.active_balance + self._unlocking_sum() + self.free_balance
@@ -80,6 +84,28 @@ class RelayLedger:
         else:
             return 3
 
+    def dump_state(self):
+        return {
+            'ledger_address': str(self.ledger_address),
+            'stash_account': str(self.stash_account),
+            'controller_account': str(self.controller_account),
+            'active_balance': self.active_balance,
+            'free_balance': self.free_balance,
+            'unlocking_chunks': [list(chunk) for chunk in self.unlocking_chunks],
+            'validators': self.validators,
+            'status': self.status,
+            'unreported_balance': self.unreported_balance,
+        }
+
+    def load_state(self, state):
+        self.active_balance = state['active_balance']
+        self.free_balance = state['free_balance']
+        self.unlocking_chunks = [tuple(chunk) for chunk in state['unlocking_chunks']]
+        self.validators = state['validators']
+        self.status = state['status']
+        # scenarios built before invariant checks don't track unreported balance
+        self.unreported_balance = state.get('unreported_balance', 0)
+
     def get_report_data(self):
         return (
             self.stash_account,
@@ -106,6 +132,7 @@ class RelayChain:
     bond_enabled = True
     transfer_enabled = True
     block_xcm_messages = False
+    invariants = None
 
     def __init__(self, lido, vKSM, oracle_master, accounts, chain):
         self.lido = lido
@@ -121,12 +148,81 @@ class RelayChain:
         self.ledgers = []
         self.era = 0
         self.total_rewards = 0
+        self.invariants = None
 
     def new_ledger(self, stash_account, controller_account):
-        tx = self.lido.addLedger(stash_account, controller_account, 0, {'from': self.accounts[0]})
-        tx.info()
-        self.ledgers.append(RelayLedger(self, tx.events['LedgerAdd'][0]['addr'], stash_account, controller_account))
-        Ledger.at(tx.events['LedgerAdd'][0]['addr']).refreshAllowances({'from': self.accounts[0]})
+        self.new_ledgers([stash_account], [controller_account])
+
+    def new_ledgers(self, stash_accounts, controller_accounts, batch_size=LEDGERS_BATCH_SIZE):
+        assert len(stash_accounts) == len(controller_accounts)
+        for i in range(0, len(stash_accounts), batch_size):
+            stashes = stash_accounts[i:i + batch_size]
+            controllers = controller_accounts[i:i + batch_size]
+            tx = self.lido.addLedgers(stashes, controllers, [0] * len(stashes), {'from': self.accounts[0]})
+            tx.info()
+            for (event, stash, controller) in zip(tx.events['LedgerAdd'], stashes, controllers):
+                self.ledgers.append(RelayLedger(self, event['addr'], stash, controller))
+
+    @classmethod
+    def restore(cls, lido, vKSM, oracle_master, accounts, chain, state):
+        # NOTE: oracle members and quorum are already a part of restored chain state
+        relay = cls.__new__(cls)
+        relay.lido = lido
+        relay.vKSM = vKSM
+        relay.oracle_master = oracle_master
+        relay.accounts = accounts
+        relay.chain = chain
+
+        relay.era = state['era']
+        relay.total_rewards = state['total_rewards']
+        relay.bond_enabled = state['bond_enabled']
+        relay.transfer_enabled = state['transfer_enabled']
+        relay.block_xcm_messages = state['block_xcm_messages']
+        relay.invariants = None
+        relay.ledgers = []
+        for ledger_state in state['ledgers']:
+            ledger = RelayLedger(
+                relay,
+                ledger_state['ledger_address'],
+                ledger_state['stash_account'],
+                ledger_state['controller_account']
+            )
+            ledger.load_state(ledger_state)
+            relay.ledgers.append(ledger)
+        return relay
+
+    def dump_state(self):
+        return {
+            'era': self.era,
+            'total_rewards': self.total_rewards,
+            'bond_enabled': self.bond_enabled,
+            'transfer_enabled': self.transfer_enabled,
+            'block_xcm_messages': self.block_xcm_messages,
+            'ledgers': [ledger.dump_state() for ledger in self.ledgers],
+        }
+
+    def enable_invariants(self, withdrawal, multicall):
+        '''
+        Check protocol invariants after every report, deposit and redeem
+        '''
+        self.invariants = Invariants(self, withdrawal, multicall)
+
+    def disable_invariants(self):
+        self.invariants = None
+
+    def deposit(self, account, amount):
+        tx = self.lido.deposit(amount, {'from': account})
+        self._check_invariants()
+        return tx
+
+    def redeem(self, account, amount):
+        tx = self.lido.redeem(amount, {'from': account})
+        self._check_invariants()
+        return tx
+
+    def _check_invariants(self):
+        if self.invariants is not None:
+            self.invariants.check()
 
     def disable_bond(self):
         self.bond_enabled = False
@@ -195,7 +291,19 @@ class RelayChain:
             self.ledgers[idx].status = 'Chill'
             pass
 
+    def _process_lido_event(self, name, event):
+        if name == 'Rewards':
+            idx = self._ledger_idx_by_ledger_address(event['ledger'])
+            self.ledgers[idx].unreported_balance -= event['rewards']
+        elif name == 'Losses':
+            idx = self._ledger_idx_by_ledger_address(event['ledger'])
+            self.ledgers[idx].unreported_balance += event['losses']
+
     def _after_report(self, tx):
+        for i in range(len(tx.events)):
+            if tx.events[i].address == self.lido.address:
+                self._process_lido_event(tx.events[i].name, tx.events[i])
+
         if not(self.block_xcm_messages):
             for i in range(len(tx.events)):
                 name = tx.events[i].name
@@ -208,10 +316,13 @@ class RelayChain:
                 else:
                     self._process_call(name, event)
 
+        self._check_invariants()
+
     def new_era(self, rewards=[], blocked_quorum=[]):
         self.era += 1
         self.chain.sleep(6 * 60 * 60)
         for i in range(len(self.ledgers)):
+            balance = self.ledgers[i].total_balance()
             if i < len(rewards) and self.ledgers[i].status != 'Chill':
                 self.total_rewards += rewards[i]
                 if (rewards[i] >= 0):
@@ -242,16 +353,22 @@ class RelayChain:
 
                     assert rewards[i] == 0
 
-            for j in range(2):
-                send_report = True
-                if (len(blocked_quorum) > i):
-                    if (blocked_quorum[i] and j == 1):
-                        send_report = False
-                        
-                if send_report:
-                    tx = self.oracle_master.reportRelay(self.era, self.ledgers[i].get_report_data(), {'from': self.accounts[j]})
-                    tx.info()
-                    self._after_report(tx)
+            self.ledgers[i].unreported_balance += self.ledgers[i].total_balance() - balance
+
+        # votes don't change relay state, so reports of both members are built before the first batch
+        reports = [self.ledgers[i].get_report_data() for i in range(len(self.ledgers))]
+        for j in range(2):
+            member_reports = [
+                reports[i] for i in range(len(self.ledgers))
+                if not (j == 1 and i < len(blocked_quorum) and blocked_quorum[i])
+            ]
+            self._send_reports(self.accounts[j], member_reports)
+
+    def _send_reports(self, member, reports):
+        for k in range(0, len(reports), LEDGERS_BATCH_SIZE):
+            tx = self.oracle_master.reportRelayBatch(self.era, reports[k:k + LEDGERS_BATCH_SIZE], {'from': member})
+            tx.info()
+            self._after_report(tx)
 
     def timetravel(self, eras):
         self.chain.sleep(6 * 60 * 60 * eras)
@@ -259,9 +376,120 @@ class RelayChain:
         self.chain.mine()
 
 
+class Invariants:
+    '''
+    Protocol invariants, all required state is fetched by one multicall eth_call per check
+    '''
+    relay = None
+    withdrawal = None
+    multicall = None
+    queue_cap = 0
+
+    def __init__(self, relay, withdrawal, multicall):
+        self.relay = relay
+        self.withdrawal = withdrawal
+        self.multicall = multicall
+        # (first, size, cap, id)
+        self.queue_cap = withdrawal.queue()[2]
+
+    def _aggregate(self, calls):
+        results = self.multicall.tryAggregate.call(
+            [(method._address, method.encode_input(*args)) for (method, args) in calls]
+        )
+        return [
+            method.decode_output(data) if success else None
+            for ((method, _), (success, data)) in zip(calls, results)
+        ]
+
+    def check(self):
+        lido = self.relay.lido
+        vKSM = self.relay.vKSM
+        withdrawal = self.withdrawal
+        ledgers = self.relay.ledgers
+
+        calls = [
+            (lido.fundRaisedBalance, []),
+            (lido.bufferedDeposits, []),
+            (lido.bufferedRedeems, []),
+            (withdrawal.totalVirtualXcKSMAmount, []),
+            (withdrawal.totalXcKSMPoolShares, []),
+            (withdrawal.queue, []),
+        ]
+        for ledger in ledgers:
+            calls.append((lido.ledgerStake, [ledger.ledger_address]))
+            calls.append((lido.ledgerBorrow, [ledger.ledger_address]))
+            calls.append((vKSM.balanceOf, [ledger.ledger_address]))
+        # queue size isn't known before the call, so request whole capacity (calls outside queue fail)
+        for shift in range(self.queue_cap):
+            calls.append((withdrawal.getQueueBatch, [shift]))
+            calls.append((withdrawal.getxcKSMBalanceForBatch, [shift]))
+
+        values = self._aggregate(calls)
+        (fund_raised, buffered_deposits, buffered_redeems, total_virtual, total_shares, queue) = values[:6]
+        ledger_values = values[6:6 + 3 * len(ledgers)]
+        stakes = ledger_values[0::3]
+        borrows = ledger_values[1::3]
+        ledgers_vksm = ledger_values[2::3]
+        queue_size = queue[1]
+        queue_values = values[6 + 3 * len(ledgers):]
+        batches = queue_values[0::2][:queue_size]
+        batches_xcksm = queue_values[1::2][:queue_size]
+
+        assert sum(stakes) + buffered_deposits - buffered_redeems == fund_raised, \
+            f"ledgers stake {sum(stakes)} + buffered {buffered_deposits - buffered_redeems} != fundRaisedBalance {fund_raised}"
+
+        relay_balance = sum(ledger.total_balance() - ledger.unreported_balance for ledger in ledgers)
+        assert sum(borrows) == sum(ledgers_vksm) + relay_balance, \
+            f"ledgers borrow {sum(borrows)} != ledgers vKSM {sum(ledgers_vksm)} + relay balance {relay_balance}"
+
+        assert total_shares == sum(batch[1] for batch in batches), \
+            f"withdrawal pool shares {total_shares} != queue shares {sum(batch[1] for batch in batches)}"
+        assert sum(batches_xcksm) <= total_virtual, \
+            f"queue xcKSM {sum(batches_xcksm)} > withdrawal virtual xcKSM {total_virtual}"
+        if queue_size == 0:
+            assert total_virtual == 0, f"withdrawal virtual xcKSM {total_virtual} with empty queue"
+
+
 def distribute_initial_tokens(vKSM, lido, accounts):
     for acc in accounts[1:]:
         vKSM.transfer(acc, 10**6 * 10**18, {'from': accounts[0]})
 
     for acc in accounts:
         vKSM.approve(lido, 2**255, {'from': acc})
+
+
+def idle_report(stash, stash_balance=0):
+    # stash, controller, IDLE, active, total, unlocking, claimed rewards, stash balance, slashing spans
+    return (stash, stash, 0, 0, 0, [], [], stash_balance, 0)
+
+
+def ledger_stashes(count, first=0x1000):
+    return [hex(first + i) for i in range(count)]
+
+
+def add_ledger(lido, accounts, stash="0x10", controller="0x11"):
+    '''
+    @return stash account of added ledger
+    '''
+    tx = lido.addLedger(stash, controller, 0, {'from': accounts[0]})
+    return tx.events['LedgerAdd']['stashAccount']
+
+
+def add_ledgers(lido, stashes, accounts):
+    '''
+    Add ledgers with `addLedgers` batches, controller account is stash account + 0x1000
+    @return `stashes`
+    '''
+    for i in range(0, len(stashes), LEDGERS_BATCH_SIZE):
+        chunk = stashes[i:i + LEDGERS_BATCH_SIZE]
+        lido.addLedgers(chunk, [hex(int(stash, 16) + 0x1000) for stash in chunk], [0] * len(chunk), {'from': accounts[0]})
+    return stashes
+
+
+def setup_members(oracle_master, accounts, count, quorum, first=1):
+    '''
+    Add `count` oracle members starting from accounts[first] and set quorum
+    '''
+    for member in accounts[first:first + count]:
+        oracle_master.addOracleMember(member, {'from': accounts[0]})
+    oracle_master.setQuorum(quorum, {'from': accounts[0]})
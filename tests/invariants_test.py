@@ -0,0 +1,63 @@
+import pytest
+from brownie import chain
+from helpers import RelayChain, distribute_initial_tokens
+
+
+def test_invariants_deposit_redeem(lido, oracle_master, vKSM, withdrawal, multicall, accounts):
+    distribute_initial_tokens(vKSM, lido, accounts)
+
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    relay.new_ledger("0x20", "0x21")
+    relay.enable_invariants(withdrawal, multicall)
+
+    relay.deposit(accounts[0], 20 * 10**12)
+    relay.deposit(accounts[1], 5 * 10**12)
+    relay.new_era()
+
+    reward = 3 * 10**12
+    relay.new_era([reward, reward])
+    relay.deposit(accounts[2], 10 * 10**12)
+    relay.redeem(accounts[1], lido.balanceOf(accounts[1]))
+    relay.new_era([reward])
+
+    relay.timetravel(29)
+    for _ in range(4):
+        relay.new_era([reward, reward])
+
+    lido.claimUnbonded({'from': accounts[1]})
+    relay.new_era()
+
+
+def test_invariants_losses(lido, oracle_master, vKSM, withdrawal, multicall, accounts):
+    distribute_initial_tokens(vKSM, lido, accounts)
+
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    relay.enable_invariants(withdrawal, multicall)
+
+    relay.deposit(accounts[0], 100 * 10**12)
+    relay.new_era()
+    relay.new_era()
+
+    relay.redeem(accounts[0], 10 * 10**12)
+    relay.new_era([-10**12])
+    # report is not accepted, slash stays unreported by Lido
+    relay.new_era([-10**12], [True])
+    relay.new_era()
+
+
+def test_invariants_violation(lido, oracle_master, vKSM, withdrawal, multicall, accounts):
+    distribute_initial_tokens(vKSM, lido, accounts)
+
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    relay.enable_invariants(withdrawal, multicall)
+
+    relay.deposit(accounts[0], 20 * 10**12)
+    relay.new_era()
+
+    # donation to ledger isn't accounted by ledger borrow
+    vKSM.transfer(relay.ledgers[0].ledger_address, 10**12, {'from': accounts[0]})
+    with pytest.raises(AssertionError, match="ledgers borrow"):
+        relay.deposit(accounts[0], 10**12)
@@ -0,0 +1,94 @@
+import pytest
+from brownie import reverts
+
+from helpers import ledger_stashes, add_ledgers
+
+
+def test_ledger_registry(lido, accounts):
+    add_ledgers(lido, ledger_stashes(4), accounts)
+    ledgers = list(lido.getLedgerAddresses())
+
+    # the last enabled ledger takes place of disabled one, disabled ledgers follow enabled ones
+    lido.disableLedger(ledgers[0], {'from': accounts[0]})
+    assert lido.getLedgerAddresses() == [ledgers[3], ledgers[1], ledgers[2], ledgers[0]]
+    with reverts("LIDO: LEDGER_NOT_ENABLED"):
+        lido.disableLedger(ledgers[0], {'from': accounts[0]})
+    with reverts("LIDO: LEDGER_NOT_DISABLED"):
+        lido.removeLedger(ledgers[3], {'from': accounts[0]})
+
+    # moved ledger keeps its index valid
+    lido.emergencyPauseLedger(ledgers[3], {'from': accounts[0]})
+    assert lido.getLedgerAddresses() == [ledgers[2], ledgers[1], ledgers[0], ledgers[3]]
+    with reverts("LIDO: LEDGER_NOT_PAUSED"):
+        lido.resumeLedger(ledgers[0], {'from': accounts[0]})
+
+    lido.removeLedger(ledgers[0], {'from': accounts[0]})
+    assert lido.getLedgerAddresses() == [ledgers[2], ledgers[1], ledgers[3]]
+    assert lido.findLedger(hex(0x1000)) == '0x' + '0' * 40
+    with reverts("LIDO: LEDGER_NOT_FOUND"):
+        lido.removeLedger(ledgers[0], {'from': accounts[0]})
+    with reverts("LIDO: LEDGER_NOT_FOUND"):
+        lido.disableLedger(ledgers[0], {'from': accounts[0]})
+
+    # paused flag survives moves and is dropped with the ledger
+    lido.resumeLedger(ledgers[3], {'from': accounts[0]})
+    lido.emergencyPauseLedger(ledgers[2], {'from': accounts[0]})
+    lido.removeLedger(ledgers[3], {'from': accounts[0]})
+    assert lido.getLedgerAddresses() == [ledgers[1], ledgers[2]]
+    lido.resumeLedger(ledgers[2], {'from': accounts[0]})
+    lido.removeLedger(ledgers[2], {'from': accounts[0]})
+    assert lido.getLedgerAddresses() == [ledgers[1]]
+
+
+@pytest.mark.parametrize('count', [5, 50])
+def test_ledger_registry_gas(lido, accounts, count):
+    add_ledgers(lido, ledger_stashes(count), accounts)
+    ledgers = list(lido.getLedgerAddresses())
+
+    # the first ledger was at the end of linear scan: disabling it checked every enabled ledger,
+    # its removal checked every disabled one
+    for ledger in ledgers[1:]:
+        lido.disableLedger(ledger, {'from': accounts[0]})
+    disable_gas = lido.disableLedger(ledgers[0], {'from': accounts[0]}).gas_used
+    remove_gas = lido.removeLedger(ledgers[0], {'from': accounts[0]}).gas_used
+
+    print(f'{count} ledgers: disableLedger {disable_gas} gas, removeLedger {remove_gas} gas')
+    # no per-ledger cold SLOAD (2100 gas)
+    assert disable_gas < 100_000
+    assert remove_gas < 150_000
+
+
+def test_get_ledgers(lido, accounts):
+    add_ledgers(lido, ledger_stashes(5), accounts)
+    ledgers = list(lido.getLedgerAddresses())
+    version = lido.ledgersVersion()
+
+    (page_version, total, page) = lido.getLedgers(0, 2)
+    assert (page_version, total) == (version, 5)
+    assert [info[0] for info in page] == ledgers[:2]
+    # stash is kept in Lido, enabled ledgers are existing and enabled
+    assert page[0][1] == '0x' + '1000'.rjust(64, '0')
+    assert [info[4] for info in page] == [3, 3]
+    # the last page is truncated, offset out of range gives empty page
+    assert [info[0] for info in lido.getLedgers(4, 2)[2]] == ledgers[4:]
+    assert lido.getLedgers(5, 2)[2] == []
+    assert [info[0] for info in lido.getLedgers(1, 2**256 - 1)[2]] == ledgers[1:]
+
+    # any change of ledger set, order or status changes the version
+    lido.disableLedger(ledgers[0], {'from': accounts[0]})
+    assert lido.ledgersVersion() > version
+    version = lido.ledgersVersion()
+    (_, _, page) = lido.getLedgers(0, 5)
+    assert [info[0] for info in page] == lido.getLedgerAddresses()
+    assert [info[4] for info in page] == [3, 3, 3, 3, 1]
+
+    lido.emergencyPauseLedger(ledgers[1], {'from': accounts[0]})
+    assert lido.ledgersVersion() > version
+    version = lido.ledgersVersion()
+    # paused ledger is moved to disabled ones without enabled flag
+    info = lido.getLedgers(4, 1)[2][0]
+    assert (info[0], info[4]) == (ledgers[1], 5)
+
+    lido.removeLedger(ledgers[0], {'from': accounts[0]})
+    assert lido.ledgersVersion() > version
+    assert lido.getLedgers(0, 10)[1] == 4
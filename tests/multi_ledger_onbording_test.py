@@ -1,4 +1,4 @@
-from brownie import chain, Ledger
+from brownie import chain, reverts, Ledger
 from helpers import RelayChain, distribute_initial_tokens
 
 
@@ -150,3 +150,29 @@ def test_redeems_to_disabled_ledger(lido, oracle_master, vKSM, accounts):
     assert relay.ledgers[1].active_balance == Ledger.at(lido.findLedger(hex(stashes[1]))).ledgerStake()
     assert relay.ledgers[1].active_balance == 0
     assert relay.total_rewards + deposit_1 + deposit_2 - redeem_1 - redeem_2 == lido.getTotalPooledKSM()
+
+
+def test_add_ledgers_batch(lido, oracle_master, vKSM, Ledger, accounts):
+    stashes = [hex(0x10 * (i + 1)) for i in range(5)]
+    controllers = [hex(0x10 * (i + 1) + 1) for i in range(5)]
+
+    tx = lido.addLedgers(stashes, controllers, [0] * len(stashes), {'from': accounts[0]})
+    assert len(tx.events['LedgerAdd']) == len(stashes)
+
+    for (stash, controller) in zip(stashes, controllers):
+        ledger = Ledger.at(lido.findLedger(stash))
+        assert ledger.stashAccount() == stash
+        assert ledger.controllerAccount() == controller
+        assert oracle_master.getOracle(ledger) != "0x0000000000000000000000000000000000000000"
+        # allowances are set by the same transaction
+        assert vKSM.allowance(ledger, lido) == 2**256 - 1
+
+    assert len(lido.getLedgerAddresses()) == len(stashes)
+
+
+def test_add_ledgers_batch_incorrect_input(lido, accounts):
+    with reverts("LIDO: INCORRECT_INPUT"):
+        lido.addLedgers(["0x10", "0x20"], ["0x11"], [0, 0], {'from': accounts[0]})
+
+    with reverts("LIDO: STASH_ALREADY_EXISTS"):
+        lido.addLedgers(["0x10", "0x10"], ["0x11", "0x11"], [0, 0], {'from': accounts[0]})
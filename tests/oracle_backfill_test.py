@@ -0,0 +1,95 @@
+import asyncio
+import json
+
+import aiohttp
+from brownie import web3
+from brownie.convert import to_bytes
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.report import LedgerStatus, OracleData, is_consistent
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.backfill import EraBlocks, backfill, get_accepted_reports, report_from_json
+from substrate_mock import SubstrateMock
+from helpers import RelayChain, distribute_initial_tokens
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+async def run_backfill(substrate, from_era, to_era, stashes, accepted, path):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            relay = RelayClient(JsonRpc(session, substrate.url))
+            era_blocks = await EraBlocks(relay, concurrency=4).find(from_era, to_era)
+            with open(path, 'w') as output:
+                summary = await backfill(relay, era_blocks, stashes, accepted, output, workers=2)
+            return (era_blocks, summary)
+    finally:
+        await substrate.stop()
+
+
+def test_backfill(tmp_path):
+    substrate = SubstrateMock()
+    other = bytes.fromhex('20' * 32)
+    substrate.set_active_era(0)
+    substrate.set_ledger(STASH, CONTROLLER, 100)
+    substrate.set_account(STASH, 100)
+    # era 1 starts at block 3, era 2 at block 10, era 3 at block 12
+    boundaries = {3: 1, 10: 2, 12: 3}
+    for number in range(1, 16):
+        if number in boundaries:
+            substrate.set_active_era(boundaries[number])
+            substrate.set_account(STASH, 100 + boundaries[number])
+        substrate.new_block()
+
+    reports = {}
+    for era_id in (1, 2, 3):
+        reports[era_id] = OracleData(STASH, CONTROLLER, LedgerStatus.IDLE, 100, 100, [], [], 100 + era_id, 0)
+    accepted = {
+        (1, STASH): reports[1],
+        (2, STASH): reports[2]._replace(stash_balance=1),
+    }
+
+    path = tmp_path / 'reports.jsonl'
+    (era_blocks, summary) = asyncio.run(run_backfill(substrate, 1, 3, [STASH, other], accepted, path))
+    assert era_blocks == {1: 3, 2: 10, 3: 12}
+    assert summary == {'match': 1, 'mismatch': 1, 'not_reported': 1}
+
+    lines = sorted((json.loads(line) for line in open(path)), key=lambda line: (line['era'], line['report']['stash_account']))
+    assert len(lines) == 6
+    assert [line['relay_block'] for line in lines] == [3, 3, 10, 10, 12, 12]
+    assert report_from_json(lines[0]['report']) == reports[1]
+    assert lines[0]['diff'] == []
+    assert lines[2]['diff'] == ['stash_balance']
+    assert report_from_json(lines[2]['accepted']) == accepted[(2, STASH)]
+    assert lines[4]['accepted'] is None and lines[4]['diff'] is None
+    # stash without relay ledger and accepted report
+    assert lines[5]['diff'] == []
+
+
+def test_accepted_reports(lido, oracle_master, vKSM, Ledger, Completed_mock, accounts, chain):
+    distribute_initial_tokens(vKSM, lido, accounts)
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    lido.deposit(20 * 10**18, {'from': accounts[0]})
+    from_block = chain.height
+    relay.new_era()
+    # event with the same signature from other contract is ignored
+    Completed_mock.deploy({'from': accounts[0]}).complete(1, {'from': accounts[0]})
+    relay.new_era()
+
+    async def fetch():
+        async with aiohttp.ClientSession() as session:
+            client = OracleMasterClient(JsonRpc(session, web3.provider.endpoint_uri), oracle_master.address)
+            return await get_accepted_reports(client, from_block, chain.height)
+
+    accepted = asyncio.run(fetch())
+    stash = bytes(lido.getStashAccounts()[0])
+    assert set(accepted) == {(1, stash), (2, stash)}
+    for report in accepted.values():
+        assert is_consistent(report)
+        assert report.controller_account == to_bytes(relay.ledgers[0].controller_account)
+    assert accepted[(2, stash)].active_balance == Ledger.at(lido.findLedger(stash)).activeBalance()
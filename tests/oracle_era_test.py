@@ -0,0 +1,43 @@
+from brownie import reverts
+
+from helpers import idle_report, add_ledgers, setup_members
+
+
+def test_lazy_era_reset(lido, oracle_master, Oracle, accounts, chain):
+    add_ledgers(lido, ["0x10", "0x20"], accounts)
+    stashes = lido.getStashAccounts()
+    oracles = [Oracle.at(oracle_master.getOracle(ledger)) for ledger in lido.getLedgerAddresses()]
+    setup_members(oracle_master, accounts, 3, 2)
+
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelayBatch(1, [idle_report(stash) for stash in stashes], {'from': accounts[1]})
+    oracle_master.reportRelay(1, idle_report(stashes[0]), {'from': accounts[2]})
+    assert oracle_master.getReportVariants()[1] == [True, False]
+
+    # era transition doesn't touch oracles, the first ledger oracle is reset by its report
+    chain.sleep(6 * 60 * 60)
+    tx = oracle_master.reportRelay(2, idle_report(stashes[0]), {'from': accounts[1]})
+    assert [oracle.reportingEra() for oracle in oracles] == [2, 1]
+    assert tx.events.count('Completed') == 0
+
+    # data of the previous era is not visible
+    assert oracle_master.getReportedStatus(accounts[1]) == (2, stashes, [True, False])
+    assert oracle_master.isReportedLastEra(accounts[1], stashes[1]) == (2, False)
+    (_, is_pushed, variants) = oracle_master.getReportVariants()
+    assert is_pushed == [False, False]
+    assert len(variants[0]) == 1 and variants[1] == []
+
+    # lowered quorum marks only reports of the current era to be pushed
+    oracle_master.setQuorum(1, {'from': accounts[0]})
+    assert oracles[0].quorumVariant() != 0
+    assert oracles[1].quorumVariant() == 0
+    oracle_master.pushQuorumReport(idle_report(stashes[0]), {'from': accounts[2]})
+    assert oracles[0].isPushed()
+    assert not oracles[1].isPushed()
+    assert oracles[1].reportingEra() == 1
+
+    oracle_master.reportRelay(2, idle_report(stashes[1]), {'from': accounts[1]})
+    assert oracles[1].reportingEra() == 2
+    assert oracle_master.getReportVariants()[1] == [True, True]
+    with reverts("ORACLE: ALREADY_SUBMITTED"):
+        oracle_master.reportRelay(2, idle_report(stashes[1]), {'from': accounts[1]})
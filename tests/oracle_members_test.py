@@ -0,0 +1,83 @@
+from brownie import reverts
+
+from helpers import idle_report, add_ledger, setup_members
+
+
+def test_member_index(lido, oracle_master, accounts, chain):
+    stash = add_ledger(lido, accounts)
+    setup_members(oracle_master, accounts, 3, 3)
+
+    with reverts("OM: MEMBER_EXISTS"):
+        oracle_master.addOracleMember(accounts[2], {'from': accounts[0]})
+
+    # the last member takes index of removed one
+    oracle_master.removeOracleMember(accounts[1], {'from': accounts[0]})
+    assert [oracle_master.members(i) for i in range(2)] == [accounts[3], accounts[2]]
+    with reverts("OM: MEMBER_NOT_FOUND"):
+        oracle_master.removeOracleMember(accounts[1], {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    with reverts("OM: MEMBER_NOT_FOUND"):
+        oracle_master.reportRelay(1, idle_report(stash), {'from': accounts[1]})
+
+    oracle_master.reportRelay(1, idle_report(stash), {'from': accounts[3]})
+    assert oracle_master.isReportedLastEra(accounts[3], stash) == (1, True)
+    assert oracle_master.isReportedLastEra(accounts[2], stash) == (1, False)
+    with reverts("ORACLE: ALREADY_SUBMITTED"):
+        oracle_master.reportRelay(1, idle_report(stash), {'from': accounts[3]})
+
+    # removal resets reporting, so moved member bit doesn't mark another member as reported
+    oracle_master.addOracleMember(accounts[1], {'from': accounts[0]})
+    oracle_master.removeOracleMember(accounts[3], {'from': accounts[0]})
+    assert oracle_master.members(0) == accounts[1]
+    assert oracle_master.isReportedLastEra(accounts[1], stash) == (1, False)
+    assert oracle_master.isReportedLastEra(accounts[3], stash) == (1, False)
+
+    oracle_master.reportRelay(1, idle_report(stash), {'from': accounts[1]})
+    oracle_master.reportRelay(1, idle_report(stash), {'from': accounts[2]})
+    assert oracle_master.getReportedStatus(accounts[1])[2] == [True]
+    assert oracle_master.getReportedStatus(accounts[2])[2] == [True]
+
+
+def measure_member_lookup(lido, oracle_master, accounts, chain):
+    '''
+    Fill committee up to MAX_MEMBERS and measure reports of the first and the last member
+    @return (members count, gas of the first member report, gas of the last member report)
+    '''
+    stash = add_ledger(lido, accounts)
+    # addOracleMember keeps members count below MAX_MEMBERS
+    count = oracle_master.MAX_MEMBERS() - 1
+
+    first = accounts[1]
+    last = accounts.add()
+    accounts[0].transfer(last, 10**18)
+    oracle_master.addOracleMember(first, {'from': accounts[0]})
+    for _ in range(count - 2):
+        oracle_master.addOracleMember(accounts.add(), {'from': accounts[0]})
+    oracle_master.addOracleMember(last, {'from': accounts[0]})
+    with reverts("OM: MEMBERS_TOO_MANY"):
+        oracle_master.addOracleMember(accounts.add(), {'from': accounts[0]})
+    oracle_master.setQuorum(3, {'from': accounts[0]})
+
+    # both measured reports are the second vote for existing variant, era transition is paid by the first one
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelay(1, idle_report(stash), {'from': first})
+    last_gas = oracle_master.reportRelay(1, idle_report(stash), {'from': last}).gas_used
+
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelay(2, idle_report(stash), {'from': last})
+    first_gas = oracle_master.reportRelay(2, idle_report(stash), {'from': first}).gas_used
+    return (count, first_gas, last_gas)
+
+
+def test_member_lookup_gas(lido, lido_v1, oracle_master, OracleMasterV1, accounts, chain):
+    (count, first_gas, last_gas) = measure_member_lookup(lido, oracle_master, accounts, chain)
+    # the previous OracleMaster scans members list up to the reporter
+    (count_v1, first_gas_v1, last_gas_v1) = measure_member_lookup(
+        lido_v1, OracleMasterV1.at(lido_v1.ORACLE_MASTER()), accounts, chain
+    )
+    assert count == count_v1
+
+    # report of the last member costs the same as of the first one, scan cost grows with members
+    assert abs(first_gas - last_gas) < 2100
+    assert last_gas - first_gas < last_gas_v1 - first_gas_v1
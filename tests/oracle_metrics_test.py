@@ -0,0 +1,49 @@
+import asyncio
+
+import aiohttp
+
+from scripts.oracle.rpc import JsonRpc, RpcError
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.metrics import start_metrics_server, RELAY_FETCH_SECONDS, RPC_ERRORS
+from substrate_mock import SubstrateMock
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+async def scrape_metrics(substrate, stash):
+    await substrate.start()
+    runner = await start_metrics_server('127.0.0.1', 0)
+    try:
+        async with aiohttp.ClientSession() as session:
+            rpc = JsonRpc(session, substrate.url)
+            client = RelayClient(rpc)
+            await client.get_report(stash, await client.get_finalized_head())
+            try:
+                await rpc.call('system_unknown')
+            except RpcError:
+                pass
+            port = runner.addresses[0][1]
+            async with session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                return (response.headers['Content-Type'], await response.text())
+    finally:
+        await runner.cleanup()
+        await substrate.stop()
+
+
+def test_metrics_endpoint():
+    substrate = SubstrateMock()
+    substrate.set_account(STASH, 10**12)
+    substrate.set_ledger(STASH, CONTROLLER, 10**12)
+    substrate.new_block()
+    ledger_fetches = (RELAY_FETCH_SECONDS.get(item='Staking.Ledger') or [None, 0, 0])[2]
+    errors = RPC_ERRORS.get(method='system_unknown') or 0
+
+    (content_type, text) = asyncio.run(scrape_metrics(substrate, STASH))
+
+    assert content_type.startswith('text/plain')
+    assert '# TYPE oracle_relay_fetch_seconds histogram' in text
+    assert f'oracle_relay_fetch_seconds_count{{item="Staking.Ledger"}} {ledger_fetches + 1}' in text
+    assert 'oracle_relay_fetch_seconds_bucket{item="System.Account",le="+Inf"}' in text
+    assert f'oracle_rpc_errors_total{{method="system_unknown"}} {errors + 1}' in text
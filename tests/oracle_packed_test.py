@@ -0,0 +1,106 @@
+import pytest
+from brownie import reverts
+
+from helpers import idle_report, add_ledgers, setup_members
+
+
+@pytest.fixture(scope="module")
+def oracle_master(OraclePacked, OracleMaster, accounts):
+    o = OraclePacked.deploy({'from': accounts[0]})
+    om = OracleMaster.deploy({'from': accounts[0]})
+    om.initialize(o, 1, {'from': accounts[0]})
+    return om
+
+
+def test_packed_reporting(lido, oracle_master, OraclePacked, accounts, chain):
+    add_ledgers(lido, ["0x10", "0x20"], accounts)
+    stashes = lido.getStashAccounts()
+    oracles = [OraclePacked.at(oracle_master.getOracle(ledger)) for ledger in lido.getLedgerAddresses()]
+    setup_members(oracle_master, accounts, 3, 3)
+
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelayBatch(1, [idle_report(stash) for stash in stashes], {'from': accounts[1]})
+    oracle_master.reportRelay(1, idle_report(stashes[0]), {'from': accounts[2]})
+    oracle_master.reportRelay(1, idle_report(stashes[1], 1), {'from': accounts[2]})
+    with reverts("ORACLE: ALREADY_SUBMITTED"):
+        oracle_master.reportRelay(1, idle_report(stashes[0]), {'from': accounts[2]})
+
+    (_, is_pushed, variants) = oracle_master.getReportVariants()
+    assert is_pushed == [False, False]
+    assert [v & 0xFF for v in variants[0]] == [2]
+    assert [v & 0xFF for v in variants[1]] == [1, 1]
+    assert oracle_master.getReportedStatus(accounts[2])[2] == [True, True]
+    assert oracle_master.getReportedStatus(accounts[3])[2] == [False, False]
+
+    # lowered quorum marks the most frequent variant only, ties aren't pushed
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+    assert oracles[0].quorumVariant() == variants[0][0] & ~0xFF
+    assert oracles[1].quorumVariant() == 0
+    with reverts("ORACLE: NOT_QUORUM_REPORT"):
+        oracle_master.pushQuorumReport(idle_report(stashes[0], 1), {'from': accounts[3]})
+    oracle_master.pushQuorumReport(idle_report(stashes[0]), {'from': accounts[3]})
+    assert oracles[0].isPushed()
+    with reverts("ORACLE: NOTHING_TO_PUSH"):
+        oracle_master.pushQuorumReport(idle_report(stashes[0]), {'from': accounts[3]})
+
+    oracle_master.reportRelay(1, idle_report(stashes[1], 1), {'from': accounts[3]})
+    assert oracle_master.getReportVariants()[1] == [True, True]
+
+    # the next era resets packed state with the first report, previous era data is hidden before
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelay(2, idle_report(stashes[0]), {'from': accounts[1]})
+    assert [oracle.reportingEra() for oracle in oracles] == [2, 1]
+    assert not oracles[0].isPushed()
+    assert oracle_master.getReportedStatus(accounts[1])[2] == [True, False]
+    (_, is_pushed, variants) = oracle_master.getReportVariants()
+    assert is_pushed == [False, False]
+    assert [v & 0xFF for v in variants[0]] == [1] and variants[1] == []
+
+
+def test_packed_members_limit(lido, oracle_master, OraclePacked, accounts):
+    count = OraclePacked.at(oracle_master.ORACLE_CLONE()).MAX_MEMBERS()
+    for _ in range(count):
+        oracle_master.addOracleMember(accounts.add(), {'from': accounts[0]})
+    with reverts("OM: MEMBERS_TOO_MANY"):
+        oracle_master.addOracleMember(accounts.add(), {'from': accounts[0]})
+
+
+def test_packed_quorum_limit(lido, oracle_master, OraclePacked, OracleMaster, accounts):
+    count = OraclePacked.at(oracle_master.ORACLE_CLONE()).MAX_MEMBERS()
+    # quorum above template members limit can never be reached
+    with reverts("OM: QUORUM_WONT_BE_MADE"):
+        oracle_master.setQuorum(count + 1, {'from': accounts[0]})
+    oracle_master.setQuorum(count, {'from': accounts[0]})
+
+    om = OracleMaster.deploy({'from': accounts[0]})
+    with reverts("OM: INCORRECT_QUORUM"):
+        om.initialize(oracle_master.ORACLE_CLONE(), count + 1, {'from': accounts[0]})
+    om.initialize(oracle_master.ORACLE_CLONE(), count, {'from': accounts[0]})
+
+
+def test_packed_vote_gas(Oracle, OraclePacked, accounts):
+    # oracles are driven directly, quorum is never reached so ledger isn't called
+    report = idle_report("0x10")
+    other = idle_report("0x10", 1)
+    quorum = 10
+    gas = {}
+    for template in (Oracle, OraclePacked):
+        oracle = template.deploy({'from': accounts[0]})
+        oracle.initialize(accounts[0], accounts[9], {'from': accounts[0]})
+
+        def vote(index, era, data):
+            return oracle.reportRelay(index, quorum, era, data, {'from': accounts[0]}).gas_used
+
+        # the first era report of a fresh oracle, repeated vote, another variant
+        gas[template._name] = [vote(0, 1, report), vote(1, 1, report), vote(2, 1, other)]
+        for i in range(3, 8):
+            vote(i, 1, report)
+        # era reset with the previous era data
+        gas[template._name].append(vote(0, 2, report))
+        gas[template._name].append(vote(1, 2, report))
+
+    names = ['first', 'repeat', 'new variant', 'era reset', 'repeat after reset']
+    for (i, name) in enumerate(names):
+        print(f'{name}: Oracle {gas["Oracle"][i]} gas, OraclePacked {gas["OraclePacked"][i]} gas')
+    for i in range(len(names)):
+        assert gas['OraclePacked'][i] < gas['Oracle'][i]
@@ -0,0 +1,134 @@
+import pytest
+from brownie import reverts
+from brownie.convert import to_bytes
+
+from scripts.oracle.report import LedgerStatus, OracleData
+from scripts.oracle.quorum import (
+    report_variant, will_push, vote_gas_limit, pack_batches, batch_gas_limit, quorum_variant, COUNT_OUTMASK, PUSH_GAS_LIMIT
+)
+from helpers import RelayChain, add_ledger, setup_members
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+def rewards_report(stash, eras=20):
+    # idle ledger with claimed rewards list, report size doesn't change vote cost
+    return (stash, stash, 0, 0, 0, [], list(range(eras)), 0, 0)
+
+
+def test_push_quorum_report(lido, oracle_master, Oracle, accounts, chain):
+    stash = add_ledger(lido, accounts)
+    oracle = Oracle.at(oracle_master.getOracle(lido.findLedger(stash)))
+    setup_members(oracle_master, accounts, 3, 3)
+    report = rewards_report(stash)
+    other = rewards_report(stash, 21)
+
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelay(1, report, {'from': accounts[1]})
+    oracle_master.reportRelay(1, report, {'from': accounts[2]})
+    with reverts("ORACLE: NOT_QUORUM_REPORT"):
+        oracle_master.pushQuorumReport(report, {'from': accounts[1]})
+
+    # quorum is reached, but report data isn't stored
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+    assert not oracle.isPushed()
+    (_, variants) = oracle.getReportVariants()
+    assert oracle.quorumVariant() == variants[0] & COUNT_OUTMASK
+    assert quorum_variant(variants, 2) == oracle.quorumVariant()
+
+    with reverts("ORACLE: NOT_QUORUM_REPORT"):
+        oracle_master.pushQuorumReport(other, {'from': accounts[1]})
+    with reverts("OM: MEMBER_NOT_FOUND"):
+        oracle_master.pushQuorumReport(report, {'from': accounts[5]})
+
+    tx = oracle_master.pushQuorumReport(report, {'from': accounts[1]})
+    assert 'Completed' in tx.events
+    assert oracle.isPushed()
+    with reverts("ORACLE: NOTHING_TO_PUSH"):
+        oracle_master.pushQuorumReport(report, {'from': accounts[2]})
+
+
+def test_quorum_variant():
+    variant = 0xAB << 8
+    other = 0xCD << 8
+    assert quorum_variant([], 1) is None
+    assert quorum_variant([variant + 2], 2) == variant
+    assert quorum_variant([variant + 1], 2) is None
+    assert quorum_variant([variant + 1, other + 2], 2) == other
+    # tie of the most frequent variants, Oracle doesn't push any
+    assert quorum_variant([variant + 2, other + 2], 2) is None
+
+
+@pytest.mark.parametrize('members,quorum', [(3, 2), (7, 5)])
+def test_committee_gas(lido, oracle_master, accounts, chain, members, quorum):
+    stash = add_ledger(lido, accounts)
+    setup_members(oracle_master, accounts, members, quorum)
+    report = rewards_report(stash)
+
+    chain.sleep(6 * 60 * 60)
+    # era transition and new variant are paid by the first vote, others only increment its counter
+    gas = [oracle_master.reportRelay(1, report, {'from': accounts[i]}).gas_used for i in range(1, quorum + 1)]
+
+    print(f'{quorum} of {members}: votes {gas[:-1]}, push {gas[-1]}, total {sum(gas)} gas')
+    # votes store only variant hash, so their cost doesn't depend on report size
+    assert all(vote < gas[0] for vote in gas[1:-1])
+    assert max(gas[:-1]) <= vote_gas_limit(report)
+    assert oracle_master.getReportVariants()[1] == [True]
+
+
+def test_vote_gas_limit(lido, oracle_master, accounts, chain):
+    stash = add_ledger(lido, accounts)
+    setup_members(oracle_master, accounts, 3, 3)
+    # claimed rewards of full Kusama history depth and the most of unlocking chunks
+    report = (stash, stash, 0, 10**6, 10**6 + 32 * 10, [(10, era) for era in range(32)], list(range(84)), 10**7, 0)
+    assert vote_gas_limit(report) > vote_gas_limit(rewards_report(stash))
+
+    chain.sleep(6 * 60 * 60)
+    tx = oracle_master.reportRelay(1, report, {'from': accounts[1]})
+    assert tx.gas_used <= vote_gas_limit(report)
+
+
+def test_quorum_prediction(lido, oracle_master, vKSM, accounts, chain):
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    relay.ledgers[0].active_balance = 100
+    relay.ledgers[0].unlocking_chunks = [(10, 5), (20, 6), (30, 7)]
+    relay.chain.sleep(6 * 60 * 60)
+
+    report = OracleData(*relay.ledgers[0].get_report_data())
+    report = report._replace(stash_account=to_bytes(report.stash_account), controller_account=to_bytes(report.controller_account))
+    other = report._replace(stash_balance=report.stash_balance + 1)
+
+    (_, is_pushed, variants) = oracle_master.getReportVariants()
+    assert will_push(report, is_pushed[0], variants[0], 2) is False
+
+    tx = oracle_master.reportRelay(1, tuple(report), {'from': accounts[0]})
+    assert tx.gas_used <= vote_gas_limit(report)
+
+    (era, is_pushed, variants) = oracle_master.getReportVariants()
+    assert era == 1
+    assert variants[0] == [report_variant(report) + 1]
+    assert will_push(report, is_pushed[0], variants[0], 2) is True
+    assert will_push(other, is_pushed[0], variants[0], 2) is False
+    assert will_push(other, is_pushed[0], variants[0], 1) is True
+
+    oracle_master.reportRelay(1, tuple(report), {'from': accounts[1]})
+    (_, is_pushed, variants) = oracle_master.getReportVariants()
+    assert is_pushed == [True]
+    assert will_push(report, is_pushed[0], variants[0], 2) is False
+
+
+def test_pack_batches():
+    report = OracleData(STASH, CONTROLLER, LedgerStatus.NOMINATOR, 100, 100, [], [], 100, 0)
+    votes = PUSH_GAS_LIMIT // vote_gas_limit(report)
+    reports = [report] * (votes + 3)
+
+    batches = pack_batches(reports, [False] * len(reports))
+    assert batches == [list(range(votes)), list(range(votes, votes + 3))]
+    assert batch_gas_limit(reports[:3], [False] * 3) == 3 * vote_gas_limit(report)
+    assert batch_gas_limit(reports[:3], [False, True, False]) == PUSH_GAS_LIMIT
+
+    # pushes are packed by expected gas, not by the worst case limit
+    assert len(pack_batches(reports[:5], [True] * 5)) == 1
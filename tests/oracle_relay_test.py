@@ -0,0 +1,96 @@
+import asyncio
+
+import aiohttp
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.report import LedgerStatus, is_consistent
+from substrate_mock import SubstrateMock
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+async def fetch_report(substrate, stash):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = RelayClient(JsonRpc(session, substrate.url))
+            return await client.get_report(stash, await client.get_finalized_head())
+    finally:
+        await substrate.stop()
+
+
+def test_relay_report_nominator():
+    substrate = SubstrateMock()
+    substrate.set_account(STASH, 1000 * 10**12)
+    substrate.set_ledger(STASH, CONTROLLER, 700 * 10**12, [(100 * 10**12, 30), (50, 31)], [1, 2])
+    substrate.set_nominator(STASH, [bytes(32), bytes.fromhex('01' * 32)])
+    substrate.set_slashing_spans(STASH, [3, 5])
+    substrate.new_block()
+
+    report = asyncio.run(fetch_report(substrate, STASH))
+
+    assert report.stash_account == STASH
+    assert report.controller_account == CONTROLLER
+    assert report.stake_status == LedgerStatus.NOMINATOR
+    assert report.active_balance == 700 * 10**12
+    assert report.total_balance == 800 * 10**12 + 50
+    assert report.unlocking == [(100 * 10**12, 30), (50, 31)]
+    assert report.claimed_rewards == [1, 2]
+    assert report.stash_balance == 1000 * 10**12
+    assert report.slashing_spans == 3
+    assert is_consistent(report)
+
+
+def test_relay_report_not_bonded():
+    substrate = SubstrateMock()
+    substrate.set_account(STASH, 10**12)
+    substrate.new_block()
+
+    report = asyncio.run(fetch_report(substrate, STASH))
+
+    assert report.stake_status == LedgerStatus.NONE
+    assert report.active_balance == 0
+    assert report.total_balance == 0
+    assert report.stash_balance == 10**12
+    assert report.slashing_spans == 0
+    assert is_consistent(report)
+
+
+async def fetch_reports(substrate, stashes, block_hash):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = RelayClient(JsonRpc(session, substrate.url))
+            return await client.get_reports(stashes, block_hash)
+    finally:
+        await substrate.stop()
+
+
+def test_relay_reports_batched():
+    stashes = [i.to_bytes(32, 'big') for i in range(1, 101)]
+    substrate = SubstrateMock()
+    for (i, stash) in enumerate(stashes):
+        substrate.set_account(stash, 10**12 + i)
+        if i % 2 == 0:
+            substrate.set_ledger(stash, CONTROLLER[:31] + bytes([i]), 10**12)
+            substrate.set_nominator(stash, [bytes(32)])
+    pinned = substrate.new_block()
+    # changes after pinned block are not visible
+    substrate.set_account(stashes[0], 1)
+    substrate.new_block()
+
+    reports = asyncio.run(fetch_reports(substrate, stashes, pinned))
+
+    # stash items and controller ledgers
+    assert len(substrate.requests) == 2
+    assert [report.stash_account for report in reports] == stashes
+    for (i, report) in enumerate(reports):
+        assert report.stash_balance == 10**12 + i
+        if i % 2 == 0:
+            assert report.stake_status == LedgerStatus.NOMINATOR
+            assert report.active_balance == 10**12
+        else:
+            assert report.stake_status == LedgerStatus.NONE
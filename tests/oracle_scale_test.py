@@ -0,0 +1,123 @@
+import asyncio
+
+import aiohttp
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.scale import ScaleReader
+from scripts.oracle.report import LedgerStatus, is_consistent
+from scripts.oracle.relay import (
+    RelayClient, decode_account_info, decode_active_era, decode_staking_ledger, decode_nominations, decode_slashing_spans,
+    active_era_key, account_key, bonded_key, ledger_key, nominators_key,
+)
+from substrate_mock import SubstrateMock, encode_compact
+
+
+# well-known dev accounts (//Alice, //Bob, //Charlie)
+ALICE = bytes.fromhex('d43593c715fdd31c61141abd04a99fd6822c8558854ccde39a5684e7a56da27d')
+BOB = bytes.fromhex('8eaf04151687736326c9fea17e25fc5287613693c912909cb226aa4794f26a48')
+CHARLIE = bytes.fromhex('90b5ab205c6974c9ea841be688864633dc9ca8a357843eeacf2314649965fe22')
+
+# Storage values are laid out byte by byte from Kusama runtime types and don't use mock encoders.
+
+# AccountInfo { nonce: 7, consumers: 1, providers: 1, sufficients: 0,
+#   data: { free: 2.234567890123 KSM, reserved: 0, misc_frozen: 1.5 KSM, fee_frozen: 1.5 KSM } }, bonded funds are frozen
+ACCOUNT_INFO = bytes.fromhex(
+    '07000000' '01000000' '01000000' '00000000'
+    'cb14a046080200000000000000000000'
+    '00000000000000000000000000000000'
+    '0098f73e5d0100000000000000000000'
+    '0098f73e5d0100000000000000000000'
+)
+
+# StakingLedger { stash: Alice, total: 1.5 KSM, active: 1 KSM,
+#   unlocking: [(0.4 KSM, era 3455), (0.1 KSM, era 3456)], claimed_rewards: [3440, 3441, 3442, 3443] }
+STAKING_LEDGER = bytes.fromhex(
+    ALICE.hex()
+    # compact big integer mode: (bytes - 4) << 2 | 0b11 prefix, then little endian value
+    + '0b' '0098f73e5d01'
+    + '07' '0010a5d4e8'
+    # two unlocking chunks, era is two byte compact: era << 2 | 0b01
+    + '08'
+    + '07' '00a0db215d' 'fd35'
+    + '07' '00e8764817' '0136'
+    + '10' '700d0000' '710d0000' '720d0000' '730d0000'
+)
+
+# ActiveEraInfo { index: 3456, start: Some(1638316800000) }
+ACTIVE_ERA = bytes.fromhex('800d0000' '01' '00784a737d010000')
+
+# Nominations { targets: [Charlie], submitted_in: 3450, suppressed: false }
+NOMINATIONS = bytes.fromhex('04' + CHARLIE.hex() + '7a0d0000' '00')
+
+# SlashingSpans { span_index: 2, last_start: 3300, last_nonzero_slash: 3300, prior: [3290, 3100] }
+SLASHING_SPANS = bytes.fromhex('02000000' 'e40c0000' 'e40c0000' '08' 'da0c0000' '1c0c0000')
+
+
+def test_storage_keys():
+    # keys of Kusama storage, twox128 pallet and item prefixes are fixed by runtime
+    assert active_era_key().hex() == '5f3e4907f716ac89b6347d15ececedca' '487df464e44a534ba6b0cbb32407b587'
+    assert account_key(ALICE).hex() == (
+        '26aa394eea5630e07c48ae0c9558cef7' 'b99d880ec681799c0cf30e8886371da9' 'de1e86a9a8c739864cf3cc5ec2bea59f' + ALICE.hex()
+    )
+    assert bonded_key(ALICE).hex().startswith('5f3e4907f716ac89b6347d15ececedca' '3ed14b45ed20d054f05e37e2542cfe70')
+    assert ledger_key(BOB).hex().startswith('5f3e4907f716ac89b6347d15ececedca' '422adb579f1dbf4f3886c5cfa3bb8cc4')
+    assert nominators_key(ALICE).hex().startswith('5f3e4907f716ac89b6347d15ececedca' '9c6a637f62ae2af1c7e31eed7e96be04')
+
+
+def test_decode_relay_values():
+    assert decode_account_info(ACCOUNT_INFO) == {
+        'free': 2234567890123, 'reserved': 0, 'misc_frozen': 1500 * 10**9, 'fee_frozen': 1500 * 10**9,
+    }
+    assert decode_staking_ledger(STAKING_LEDGER) == {
+        'stash': ALICE,
+        'total': 1500 * 10**9,
+        'active': 10**12,
+        'unlocking': [(400 * 10**9, 3455), (100 * 10**9, 3456)],
+        'claimed_rewards': [3440, 3441, 3442, 3443],
+    }
+    assert decode_active_era(ACTIVE_ERA) == 3456
+    assert decode_nominations(NOMINATIONS) == {'targets': [CHARLIE], 'submitted_in': 3450, 'suppressed': False}
+    # current span and two prior ones
+    assert decode_slashing_spans(SLASHING_SPANS) == 3
+
+
+def test_compact_modes():
+    # single byte, two byte, four byte and big integer modes
+    for (value, encoded) in [(1, '04'), (63, 'fc'), (64, '0101'), (3455, 'fd35'), (2**14, '02000100'), (2**30, '0300000040')]:
+        reader = ScaleReader(bytes.fromhex(encoded))
+        assert reader.compact() == value
+        assert reader.offset == len(encoded) // 2
+        # the mock encodes as the chain does
+        assert encode_compact(value).hex() == encoded
+
+
+async def fetch_report(substrate, stash):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = RelayClient(JsonRpc(session, substrate.url))
+            return await client.get_report(stash, await client.get_finalized_head())
+    finally:
+        await substrate.stop()
+
+
+def test_report_from_relay_values():
+    substrate = SubstrateMock()
+    substrate.storage[active_era_key()] = ACTIVE_ERA
+    substrate.storage[account_key(ALICE)] = ACCOUNT_INFO
+    substrate.storage[bonded_key(ALICE)] = BOB
+    substrate.storage[ledger_key(BOB)] = STAKING_LEDGER
+    substrate.storage[nominators_key(ALICE)] = NOMINATIONS
+    substrate.new_block()
+
+    report = asyncio.run(fetch_report(substrate, ALICE))
+
+    assert report.stash_account == ALICE
+    assert report.controller_account == BOB
+    assert report.stake_status == LedgerStatus.NOMINATOR
+    assert report.active_balance == 10**12
+    assert report.total_balance == 1500 * 10**9
+    assert report.unlocking == [(400 * 10**9, 3455), (100 * 10**9, 3456)]
+    assert report.claimed_rewards == [3440, 3441, 3442, 3443]
+    assert report.stash_balance == 2234567890123
+    assert is_consistent(report)
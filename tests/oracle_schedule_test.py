@@ -0,0 +1,48 @@
+import asyncio
+
+import aiohttp
+from brownie import web3
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.submitter import Submitter
+from scripts.oracle.service import OracleService, ERA_MARGIN
+
+
+async def check_schedule(oracle_master, member, actions):
+    async with aiohttp.ClientSession() as session:
+        para_rpc = JsonRpc(session, web3.provider.endpoint_uri)
+        service = OracleService(None, OracleMasterClient(para_rpc, oracle_master.address), Submitter(para_rpc, member.private_key))
+        results = []
+        for action in actions:
+            action()
+            (schedule, timestamp) = await service.get_schedule()
+            service.last_era = schedule.era_at(timestamp)
+            results.append((schedule.era_at(timestamp), service.next_delay(), oracle_master.getCurrentEraId()))
+        return results
+
+
+def test_era_schedule(lido, oracle_master, accounts, chain):
+    member = accounts.add()
+    era_sec = oracle_master.SECONDS_PER_ERA()
+
+    def next_eras():
+        chain.sleep(era_sec * 2 + 10)
+        chain.mine()
+
+    def new_anchor():
+        timestamp = chain.time()
+        tx = oracle_master.setAnchorEra(5, timestamp, 100, {'from': accounts[0]})
+        assert tx.events['AnchorEraChanged'] == {'ANCHOR_ERA_ID': 5, 'ANCHOR_TIMESTAMP': timestamp, 'SECONDS_PER_ERA': 100}
+
+    results = asyncio.run(check_schedule(oracle_master, member, [lambda: None, next_eras, new_anchor]))
+
+    for (era, _, current_era) in results:
+        assert era == current_era
+    # era is reported, so the next check is on the next era boundary plus margin
+    assert abs(results[0][1] - (era_sec + ERA_MARGIN)) <= 5
+    assert results[1][0] == 2
+    assert abs(results[1][1] - (era_sec - 10 + ERA_MARGIN)) <= 5
+    # setAnchorEra event invalidates cached schedule
+    assert results[2][0] == 5
+    assert abs(results[2][1] - (100 + ERA_MARGIN)) <= 5
@@ -0,0 +1,125 @@
+import asyncio
+
+import aiohttp
+from brownie import web3
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.report import LedgerStatus
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.submitter import Submitter
+from scripts.oracle.service import OracleService
+from scripts.oracle.metrics import REPORT_BATCH_GAS_USED, STASH_REPORT_LAG, LAST_REPORTED_ERA
+from substrate_mock import SubstrateMock
+from helpers import RelayChain
+
+
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+async def fetch_report(substrate, stash):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            client = RelayClient(JsonRpc(session, substrate.url))
+            return await client.get_report(stash, await client.get_finalized_head())
+    finally:
+        await substrate.stop()
+
+
+async def run_service(substrate, oracle_master, member):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            para_rpc = JsonRpc(session, web3.provider.endpoint_uri)
+            service = OracleService(
+                RelayClient(JsonRpc(session, substrate.url)),
+                OracleMasterClient(para_rpc, oracle_master.address),
+                Submitter(para_rpc, member.private_key),
+            )
+            return (await service.run_once(), await service.run_once())
+    finally:
+        await substrate.stop()
+
+
+def test_service_reports_era(lido, oracle_master, Ledger, Oracle, accounts, chain):
+    lido.addLedger("0x10", "0x11", 0, {'from': accounts[0]})
+    stash = bytes(lido.getStashAccounts()[0])
+
+    member = accounts.add()
+    accounts[0].transfer(member, 10**18)
+    oracle_master.addOracleMember(member, {'from': accounts[0]})
+    oracle_master.setQuorum(1, {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    chain.mine()
+
+    substrate = SubstrateMock()
+    substrate.set_active_era(1)
+    substrate.set_account(stash, 150)
+    substrate.set_ledger(stash, CONTROLLER, 100)
+    substrate.set_nominator(stash, [bytes(32)])
+    substrate.new_block()
+
+    pushed_batches = (REPORT_BATCH_GAS_USED.get(pushed='true') or [None, 0, 0])[2]
+
+    (reported, repeated) = asyncio.run(run_service(substrate, oracle_master, member))
+
+    assert reported == 1
+    # era is reported only once
+    assert repeated is None
+    assert oracle_master.eraId() == 1
+    # quorum 1, so the batch pushed report to ledger
+    assert REPORT_BATCH_GAS_USED.get(pushed='true')[2] == pushed_batches + 1
+    assert STASH_REPORT_LAG.get(stash='0x' + stash.hex()) == 0
+    assert LAST_REPORTED_ERA.get() == 1
+
+    ledger = Ledger.at(lido.findLedger(stash))
+    assert Oracle.at(oracle_master.getOracle(ledger)).isPushed()
+    assert ledger.status() == LedgerStatus.NOMINATOR
+    assert ledger.activeBalance() == 100
+    assert ledger.cachedTotalBalance() == 150
+
+
+def test_reported_status(lido, oracle_master, vKSM, accounts, chain):
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledgers(["0x10", "0x20", "0x30"], ["0x11", "0x21", "0x31"])
+
+    (era, stashes, reported) = oracle_master.getReportedStatus(accounts[0])
+    assert era == 0
+    assert stashes == lido.getStashAccounts()
+    assert reported == [False, False, False]
+
+    relay.chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelay(1, relay.ledgers[1].get_report_data(), {'from': accounts[0]})
+    assert oracle_master.getReportedStatus(accounts[0]) == (1, stashes, [False, True, False])
+    assert oracle_master.getReportedStatus(accounts[1]) == (1, stashes, [False, False, False])
+    assert oracle_master.getReportedStatus(accounts[2]) == (1, stashes, [False, False, False])
+
+
+def test_service_skips_reported(lido, oracle_master, accounts, chain):
+    lido.addLedgers(["0x10", "0x20"], ["0x11", "0x21"], [0, 0], {'from': accounts[0]})
+    stashes = [bytes(stash) for stash in lido.getStashAccounts()]
+
+    member = accounts.add()
+    accounts[0].transfer(member, 10**18)
+    oracle_master.addOracleMember(member, {'from': accounts[0]})
+    oracle_master.addOracleMember(accounts[1], {'from': accounts[0]})
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    chain.mine()
+
+    substrate = SubstrateMock()
+    substrate.set_active_era(1)
+    for stash in stashes:
+        substrate.set_account(stash, 0)
+    substrate.new_block()
+
+    # member already reported the first stash before restart
+    report = asyncio.run(fetch_report(substrate, stashes[0]))
+    oracle_master.reportRelay(1, tuple(report), {'from': member})
+
+    (reported, _) = asyncio.run(run_service(substrate, oracle_master, member))
+    assert reported == 1
+    assert oracle_master.getReportedStatus(member) == (1, lido.getStashAccounts(), [True, True])
@@ -0,0 +1,183 @@
+import asyncio
+import multiprocessing
+
+import aiohttp
+import pytest
+from brownie import web3
+from eth_account import Account
+
+from scripts.oracle import submitter as submitter_module
+from scripts.oracle.rpc import JsonRpc, RpcError
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.submitter import Submitter
+from scripts.oracle.sharding import HashRing, SharedNonceManager, ShardWorker, Coordinator
+from substrate_mock import SubstrateMock
+from evm_rpc_mock import EvmRpcMock
+
+
+STASH = bytes.fromhex('10' * 32)
+MEMBER_KEY = '0x' + '01' * 32
+TARGET = '0x' + '22' * 20
+
+
+def test_hash_ring():
+    stashes = [i.to_bytes(32, 'big') for i in range(1000)]
+    ring = HashRing(range(4))
+
+    shards = ring.partition(stashes)
+    assert sorted(stash for shard in shards.values() for stash in shard) == stashes
+    assert all(150 < len(shard) < 350 for shard in shards.values())
+
+    # worker removal moves only stashes of this worker
+    smaller = HashRing(range(3))
+    for stash in stashes:
+        if ring.owner(stash) != 3:
+            assert smaller.owner(stash) == ring.owner(stash)
+
+
+async def allocate_shared(managers):
+    first = await asyncio.gather(*[manager.allocate(2) for manager in managers])
+    managers[0].mark_sent(first[0], 2)
+    second = await managers[0].allocate(1)
+    return (first, second)
+
+
+def test_shared_nonce_manager():
+    # counter is initialized by coordinator, workers never ask node for nonce
+    counter = multiprocessing.Value('q', 5)
+    allocations = multiprocessing.Array('q', 6, lock=False)
+    managers = [SharedNonceManager(counter, allocations, index) for index in range(3)]
+
+    (first, second) = asyncio.run(allocate_shared(managers))
+
+    # workers get disjoint ranges, sent nonces aren't tracked
+    assert sorted(first) == [5, 7, 9]
+    assert second == 11
+    assert counter.value == 12
+    assert list(allocations) == [11, 1, first[1], 2, first[2], 2]
+
+    # worker doesn't allocate over nonces which it failed to send, coordinator cancels them after exit
+    with pytest.raises(SystemExit):
+        asyncio.run(managers[1].allocate(1))
+    assert counter.value == 12
+
+
+async def fill_exited_worker_gap(node, counter, coordinator):
+    workers = [Submitter(node, MEMBER_KEY, nonces=SharedNonceManager(counter, coordinator.allocations, index)) for index in range(2)]
+    first = await workers[0].send_batch([(TARGET, b'\x01')] * 2)
+    # worker 1 exits between allocation and broadcast
+    await workers[1].nonces.allocate(2)
+    coordinator.take_allocation(1)
+    await coordinator.fill_gaps(Submitter(node, MEMBER_KEY))
+    second = await workers[0].send_batch([(TARGET, b'\x02')])
+    return first + second
+
+
+def test_coordinator_fills_gaps(monkeypatch):
+    monkeypatch.setattr(submitter_module, 'RECEIPT_POLL_INTERVAL', 0)
+    node = EvmRpcMock()
+    original_batch = node.batch
+
+    async def batch(calls, return_errors=False):
+        results = await original_batch(calls, return_errors)
+        node.mine()
+        return results
+    node.batch = batch
+    coordinator = Coordinator(None, 2)
+    counter = multiprocessing.Value('q', 5)
+
+    receipts = asyncio.run(fill_exited_worker_gap(node, counter, coordinator))
+
+    # nonces of exited worker are filled with empty self transfers, transactions after them are included
+    assert [receipt['status'] for receipt in receipts] == ['0x1'] * 3
+    member = Account.from_key(MEMBER_KEY).address.lower()
+    included = [node.calls[receipt['transactionHash']] for receipt in node.receipts.values()]
+    assert sorted(included) == sorted([(TARGET, b'\x01')] * 2 + [(member, b'')] * 2 + [(TARGET, b'\x02')])
+    assert node.nonce == 10
+    assert coordinator.gaps == []
+    assert list(coordinator.allocations) == [9, 0, 7, 0]
+
+
+async def run_shard_workers(substrate, oracle_master, member, workers, counter, allocations, epoch):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            para_rpc = JsonRpc(session, web3.provider.endpoint_uri)
+            ring = HashRing(range(workers))
+            services = []
+            for index in range(workers):
+                submitter = Submitter(para_rpc, member.private_key)
+                submitter.nonces = SharedNonceManager(counter, allocations, index)
+                services.append(ShardWorker(
+                    RelayClient(JsonRpc(session, substrate.url)), OracleMasterClient(para_rpc, oracle_master.address),
+                    submitter, 0, 0, None, ring, index, epoch,
+                ))
+            reported = await asyncio.gather(*[service.report_era(1, await service.relay.get_finalized_head()) for service in services])
+            return [[stash for (stash, _) in shard] for shard in reported]
+    finally:
+        await substrate.stop()
+
+
+def test_sharded_workers(lido, oracle_master, accounts, chain):
+    lido.addLedgers(["0x10", "0x20", "0x30", "0x40"], ["0x11", "0x21", "0x31", "0x41"], [0, 0, 0, 0], {'from': accounts[0]})
+    stashes = [bytes(stash) for stash in lido.getStashAccounts()]
+
+    member = accounts.add()
+    accounts[0].transfer(member, 10**18)
+    oracle_master.addOracleMember(member, {'from': accounts[0]})
+    oracle_master.addOracleMember(accounts[1], {'from': accounts[0]})
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    chain.mine()
+
+    substrate = SubstrateMock()
+    substrate.set_active_era(1)
+    for stash in stashes:
+        substrate.set_account(stash, 0)
+    substrate.new_block()
+
+    counter = multiprocessing.Value('q', member.nonce)
+    allocations = multiprocessing.Array('q', 4, lock=False)
+    epoch = multiprocessing.Value('q', 0)
+    shards = asyncio.run(run_shard_workers(substrate, oracle_master, member, 2, counter, allocations, epoch))
+
+    # workers report disjoint stash sets with nonces from the shared counter
+    assert sorted(shards[0] + shards[1]) == sorted(stashes)
+    assert set(shards[0]).isdisjoint(shards[1])
+    assert counter.value == member.nonce
+    assert oracle_master.getReportedStatus(member) == (1, lido.getStashAccounts(), [True] * 4)
+
+
+class LedgersStub:
+    '''
+    OracleMasterClient replacement for Lido with or without ledgersVersion
+    '''
+    def __init__(self, version):
+        self.version = version
+        self.stashes = [STASH]
+
+    async def get_ledgers_version(self, lido):
+        if self.version is None:
+            raise RpcError({'message': 'execution reverted'})
+        return self.version
+
+    async def get_stash_accounts(self):
+        return list(self.stashes)
+
+
+async def ledgers_states(oracle_master):
+    coordinator = Coordinator(None, 1)
+    first = await coordinator.get_ledgers_state(oracle_master, None)
+    oracle_master.stashes.append(STASH[::-1])
+    return (first, await coordinator.get_ledgers_state(oracle_master, None), coordinator.legacy_lido)
+
+
+def test_coordinator_ledgers_state():
+    # version isn't changed by stashes
+    assert asyncio.run(ledgers_states(LedgersStub(3))) == (3, 3, False)
+    # Lido before upgrade: stash set is compared instead of failing every poll
+    (first, second, legacy) = asyncio.run(ledgers_states(LedgersStub(None)))
+    assert legacy
+    assert first == (STASH,) and second == (STASH, STASH[::-1])
@@ -0,0 +1,91 @@
+import asyncio
+
+import aiohttp
+from brownie import web3
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.relay import RelayClient
+from scripts.oracle.report import LedgerStatus, OracleData
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.submitter import Submitter
+from scripts.oracle.service import OracleService
+from scripts.oracle.store import StateStore, HISTORY_ERAS
+from substrate_mock import SubstrateMock
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+def test_state_store(tmp_path):
+    report = OracleData(STASH, CONTROLLER, LedgerStatus.NOMINATOR, 100, 150, [(50, 3)], [1, 2], 200, 1)
+    oracle_master = OracleMasterClient(None, '0x' + '33' * 20)
+
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get_last_era() is None
+    store.save_reports(5, '0x01', [report])
+    # snapshot of era is not overwritten
+    store.save_reports(5, '0x02', [report._replace(stash_balance=1)])
+    store.save_receipts(5, [(STASH, {'transactionHash': '0xaa', 'status': '0x1'})])
+    store.set_last_era(5)
+    store.close()
+
+    store = StateStore(str(tmp_path / 'state.db'))
+    assert store.get_last_era() == 5
+    saved = store.get_reports(5)[STASH]
+    assert saved == report
+    assert oracle_master.encode_report_relay(5, saved) == oracle_master.encode_report_relay(5, report)
+    assert store.get_receipts(5) == {STASH: ('0xaa', 1)}
+
+    # old eras are pruned
+    store.set_last_era(5 + HISTORY_ERAS)
+    assert store.get_reports(5) == {}
+
+
+async def run_service_with_store(substrate, oracle_master, member, store):
+    await substrate.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            para_rpc = JsonRpc(session, web3.provider.endpoint_uri)
+            service = OracleService(
+                RelayClient(JsonRpc(session, substrate.url)),
+                OracleMasterClient(para_rpc, oracle_master.address),
+                Submitter(para_rpc, member.private_key),
+                store=store,
+            )
+            return await service.run_once()
+    finally:
+        await substrate.stop()
+
+
+def test_service_restart(lido, oracle_master, accounts, chain, tmp_path):
+    lido.addLedger("0x10", "0x11", 0, {'from': accounts[0]})
+    stash = bytes(lido.getStashAccounts()[0])
+
+    member = accounts.add()
+    accounts[0].transfer(member, 10**18)
+    oracle_master.addOracleMember(member, {'from': accounts[0]})
+    oracle_master.addOracleMember(accounts[1], {'from': accounts[0]})
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    chain.mine()
+
+    substrate = SubstrateMock()
+    substrate.set_active_era(1)
+    substrate.set_account(stash, 150)
+    substrate.new_block()
+
+    path = str(tmp_path / 'state.db')
+    assert asyncio.run(run_service_with_store(substrate, oracle_master, member, StateStore(path))) == 1
+    saved = StateStore(path).get_reports(1)[stash]
+
+    # restarted service doesn't repeat reported era and doesn't read relay ledgers
+    substrate.requests.clear()
+    assert asyncio.run(run_service_with_store(substrate, oracle_master, member, StateStore(path))) is None
+    methods = [request['method'] for payload in substrate.requests for request in (payload if isinstance(payload, list) else [payload])]
+    assert 'state_queryStorageAt' not in methods
+
+    # the same report bytes are accepted as the second vote
+    oracle_master.reportRelay(1, tuple(saved), {'from': accounts[1]})
+    assert oracle_master.getReportVariants()[1] == [True]
@@ -0,0 +1,119 @@
+import asyncio
+
+from eth_account import Account
+
+from scripts.oracle import submitter
+from scripts.oracle.submitter import Submitter
+from evm_rpc_mock import EvmRpcMock
+
+
+MEMBER_KEY = '0x' + '01' * 32
+TARGET = '0x' + '22' * 20
+
+
+async def send_batches(node, batches, **kwargs):
+    tx_submitter = Submitter(node, MEMBER_KEY, **kwargs)
+    return [await tx_submitter.send_batch(batch) for batch in batches]
+
+
+def test_submitter_pipelines_batch(monkeypatch):
+    monkeypatch.setattr(submitter, 'RECEIPT_POLL_INTERVAL', 0)
+    node = EvmRpcMock()
+    original_batch = node.batch
+
+    async def batch(calls, return_errors=False):
+        results = await original_batch(calls, return_errors)
+        # every transaction is included on the next receipts poll
+        if calls[0][0] == 'eth_sendRawTransaction':
+            node.mine()
+        return results
+    node.batch = batch
+
+    (first, second) = asyncio.run(send_batches(node, [[(TARGET, b'\x01')] * 3, [(TARGET, b'\x02', 100_000)] * 2]))
+
+    assert [receipt['status'] for receipt in first + second] == ['0x1'] * 5
+    # nonce is requested from node only once, next batch continues locally
+    assert [request for request in node.requests if request == ['eth_getTransactionCount']] == [['eth_getTransactionCount']]
+    # every batch is broadcast with one request and its receipts are polled with one request
+    assert ['eth_sendRawTransaction'] * 3 in node.requests
+    assert ['eth_getTransactionReceipt'] * 3 in node.requests
+    assert ['eth_sendRawTransaction'] * 2 in node.requests
+
+
+def test_submitter_replaces_stuck_tx(monkeypatch):
+    monkeypatch.setattr(submitter, 'RECEIPT_POLL_INTERVAL', 0)
+    node = EvmRpcMock()
+    original_batch = node.batch
+
+    async def batch(calls, return_errors=False):
+        results = await original_batch(calls, return_errors)
+        if calls[0][0] == 'eth_sendRawTransaction':
+            # only the first transaction is included until the second one is replaced
+            node.mine(1 if len(node.receipts) == 0 else None)
+        return results
+    node.batch = batch
+
+    (receipts,) = asyncio.run(send_batches(node, [[(TARGET, b'\x01'), (TARGET, b'\x02')]], replace_after=0))
+
+    assert len(receipts) == 2
+    assert node.gas_prices[receipts[0]['transactionHash']] == 10**9
+    assert node.gas_prices[receipts[1]['transactionHash']] == int(10**9 * submitter.GAS_PRICE_BUMP)
+
+
+def test_submitter_rejected_tx(monkeypatch):
+    monkeypatch.setattr(submitter, 'RECEIPT_POLL_INTERVAL', 0)
+    # the middle transaction of batch is rejected, the last one is queued behind the nonce gap
+    node = EvmRpcMock(reject_nonces=[6])
+    original_batch = node.batch
+
+    async def batch(calls, return_errors=False):
+        results = await original_batch(calls, return_errors)
+        node.mine()
+        return results
+    node.batch = batch
+
+    (receipts, retried) = asyncio.run(send_batches(node, [[(TARGET, b'\x01')] * 3, [(TARGET, b'\x02')]]))
+
+    assert receipts[0]['status'] == '0x1'
+    assert receipts[1:] == [None, None]
+    # the gap is filled and queued transaction is replaced with empty self transfers, calls after the gap aren't executed
+    member = Account.from_key(MEMBER_KEY).address.lower()
+    included = [node.calls[receipt['transactionHash']] for receipt in node.receipts.values()]
+    assert sorted(included) == sorted([(TARGET, b'\x01'), (member, b''), (member, b''), (TARGET, b'\x02')])
+    queued = [tx_hash for (tx_hash, call) in node.calls.items() if call == (TARGET, b'\x01') and tx_hash not in node.receipts]
+    assert len(queued) == 1
+    assert max(price for (tx_hash, price) in node.gas_prices.items() if node.calls[tx_hash][1] == b'') == int(10**9 * submitter.GAS_PRICE_BUMP)
+
+    # the next batch follows the cancelled nonces without asking node
+    assert len([request for request in node.requests if request == ['eth_getTransactionCount']]) == 1
+    assert retried[0]['status'] == '0x1'
+    assert node.nonce == 9
+
+
+def test_submitter_retries_gap_fill(monkeypatch):
+    monkeypatch.setattr(submitter, 'RECEIPT_POLL_INTERVAL', 0)
+    monkeypatch.setattr(submitter, 'CANCEL_RETRY_INTERVAL', 0)
+    # the gap is rejected with the batch and with the first two cancellations
+    node = EvmRpcMock(reject_nonces=[6, 6, 6])
+    original_batch = node.batch
+
+    async def batch(calls, return_errors=False):
+        results = await original_batch(calls, return_errors)
+        node.mine()
+        return results
+    node.batch = batch
+
+    (receipts, retried) = asyncio.run(send_batches(node, [[(TARGET, b'\x01')] * 3, [(TARGET, b'\x02')]]))
+
+    assert receipts[0]['status'] == '0x1'
+    assert receipts[1:] == [None, None]
+    # the gap is filled by cancellation with bumped gas price, call queued after the gap isn't executed
+    member = Account.from_key(MEMBER_KEY).address.lower()
+    included = [node.calls[receipt['transactionHash']] for receipt in node.receipts.values()]
+    assert sorted(included) == sorted([(TARGET, b'\x01'), (member, b''), (member, b''), (TARGET, b'\x02')])
+    gap_fill = next(tx_hash for tx_hash in node.receipts if node.calls[tx_hash] == (member, b'') and node.gas_prices[tx_hash] != int(10**9 * submitter.GAS_PRICE_BUMP))
+    assert node.gas_prices[gap_fill] == int(int(10**9 * submitter.GAS_PRICE_BUMP) * submitter.GAS_PRICE_BUMP)
+
+    # queued nonces are used by cancellations, the next batch continues after them
+    assert retried[0]['status'] == '0x1'
+    assert node.nonce == 9
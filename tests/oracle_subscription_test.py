@@ -0,0 +1,152 @@
+import asyncio
+
+import aiohttp
+
+from scripts.oracle.metrics import RPC_ERRORS
+from scripts.oracle.relay import active_era_key
+from scripts.oracle.subscription import SubscriptionTrigger, subscribe_active_era, subscribe_logs, _log_position
+from ws_node_mock import WsNodeMock
+
+
+def evm_log(block, index=0):
+    return {'blockNumber': hex(block), 'logIndex': hex(index), 'data': '0x'}
+
+
+async def receive_logs_with_reconnect():
+    logs = []
+    node = WsNodeMock(lambda method, params: [log for log in logs if int(log['blockNumber'], 16) >= int(params[0]['fromBlock'], 16)])
+    await node.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            events = subscribe_logs(session, node.url, '0x' + '33' * 20, backoff_min=0.01)
+            received = []
+
+            async def receive(count):
+                async for event in events:
+                    received.append(_log_position(event))
+                    if len(received) == count:
+                        return
+
+            task = asyncio.create_task(receive(4))
+            await node.wait_connections(1)
+            logs.extend([evm_log(1), evm_log(2)])
+            await node.publish('eth_subscribe', logs[0])
+            await node.publish('eth_subscribe', logs[1])
+            await asyncio.sleep(0.05)
+
+            await node.disconnect()
+            # logs emitted while disconnected are fetched after reconnect
+            logs.extend([evm_log(2, 1), evm_log(3)])
+            await node.wait_connections(2)
+            await asyncio.wait_for(task, 5)
+            return (received, node.connections)
+    finally:
+        await node.stop()
+
+
+def test_subscription_reconnect():
+    (received, connections) = asyncio.run(receive_logs_with_reconnect())
+
+    assert connections == 2
+    assert received == [(1, 0), (2, 0), (2, 1), (3, 0)]
+
+
+async def resume_with_error_response():
+    failures = [ValueError('header not found')]
+
+    def handler(method, params):
+        if failures:
+            raise failures.pop()
+        return [evm_log(2)]
+
+    node = WsNodeMock(handler)
+    await node.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            events = subscribe_logs(session, node.url, '0x' + '33' * 20, backoff_min=0.01)
+            received = []
+
+            async def receive(count):
+                async for event in events:
+                    received.append(_log_position(event))
+                    if len(received) == count:
+                        return
+
+            task = asyncio.create_task(receive(2))
+            await node.wait_connections(1)
+            await node.publish('eth_subscribe', evm_log(1))
+            await asyncio.sleep(0.05)
+
+            await node.disconnect()
+            # the first eth_getLogs after reconnect gets an error response, the next one succeeds
+            await node.wait_connections(3)
+            await asyncio.wait_for(task, 5)
+            return received
+    finally:
+        await node.stop()
+
+
+def test_subscription_error_counted_once():
+    get_logs_errors = RPC_ERRORS.get(method='eth_getLogs') or 0
+    subscribe_errors = RPC_ERRORS.get(method='eth_subscribe') or 0
+
+    assert asyncio.run(resume_with_error_response()) == [(1, 0), (2, 0)]
+
+    assert RPC_ERRORS.get(method='eth_getLogs') == get_logs_errors + 1
+    assert (RPC_ERRORS.get(method='eth_subscribe') or 0) == subscribe_errors
+
+
+class ServiceStub:
+    '''
+    OracleService replacement: finalized relay era lags the pushed one by `lag` run_once calls
+    '''
+    def __init__(self, lag):
+        self.last_era = None
+        self.lag = lag
+        self.calls = 0
+        self.trigger = None
+
+    async def run_once(self):
+        self.calls += 1
+        if self.calls > self.lag:
+            self.last_era = self.trigger.target_era
+
+
+def active_era_change(era):
+    return {'block': '0x' + era.to_bytes(32, 'big').hex(), 'changes': [['0x' + active_era_key().hex(), '0x' + era.to_bytes(4, 'little').hex() + '00']]}
+
+
+async def empty_events():
+    await asyncio.Event().wait()
+    yield
+
+
+async def trigger_on_era_change(lag):
+    # node sends the current value on subscription
+    node = WsNodeMock(on_subscribe=lambda method, params: [active_era_change(1)])
+    await node.start()
+    try:
+        async with aiohttp.ClientSession() as session:
+            service = ServiceStub(lag)
+            trigger = SubscriptionTrigger(service, subscribe_active_era(session, node.url), empty_events(), retry_interval=0.01)
+            service.trigger = trigger
+            task = asyncio.create_task(trigger.run())
+            await node.wait_connections(1)
+            await asyncio.sleep(0.1)
+            first = (service.last_era, service.calls)
+
+            await node.publish('state_subscribeStorage', active_era_change(2))
+            await asyncio.sleep(0.1)
+            task.cancel()
+            return (first, (service.last_era, service.calls))
+    finally:
+        await node.stop()
+
+
+def test_subscription_trigger():
+    # the first check on start and one per pushed era, no polling after era is reported
+    assert asyncio.run(trigger_on_era_change(0)) == ((1, 2), (2, 3))
+    # finalized head is behind the pushed era: checks are repeated with retry interval until era is reported
+    (first, second) = asyncio.run(trigger_on_era_change(3))
+    assert first == (1, 4)
+    assert second == (2, 5)
@@ -0,0 +1,82 @@
+import asyncio
+
+import aiohttp
+from brownie import web3, reverts
+from brownie.convert import to_bytes
+
+from scripts.oracle.rpc import JsonRpc
+from scripts.oracle.report import LedgerStatus, OracleData
+from scripts.oracle.parachain import OracleMasterClient
+from scripts.oracle.validation import LedgerState, ReportValidator, validate_report, process_relay_transfers
+from helpers import RelayChain, distribute_initial_tokens
+
+
+STASH = bytes.fromhex('10' * 32)
+CONTROLLER = bytes.fromhex('11' * 32)
+
+
+def test_validate_report():
+    report = OracleData(STASH, CONTROLLER, LedgerStatus.NOMINATOR, 100, 100, [], [], 1000, 0)
+    state = LedgerState(
+        cached_total_balance=1000, total_balance=1000, locked_balance=100,
+        transfer_upward_balance=0, transfer_downward_balance=0, pending_bonds=0, vksm_balance=0,
+    )
+
+    assert validate_report(report, state, 10000, 3000) is None
+    assert validate_report(report._replace(total_balance=101), state, 10000, 3000) == 'OM: INCORRECT_REPORT'
+    assert validate_report(report._replace(stash_balance=3999), state, 10000, 3000) is None
+    assert validate_report(report._replace(stash_balance=4000), state, 10000, 3000) == 'LEDGER: DIFFERENCE_EXCEEDS_BALANCE'
+    # no total supply, no check
+    assert validate_report(report._replace(stash_balance=4000), state, 0, 3000) is None
+
+    # completed downward transfer decreases cached balance before the check
+    downward = state._replace(transfer_downward_balance=3000, vksm_balance=3000)
+    assert process_relay_transfers(downward, report) == (-2000, True)
+    assert validate_report(report, downward, 10000, 3000) == 'LEDGER: DIFFERENCE_EXCEEDS_BALANCE'
+    # pending transfer, pushData returns before the check
+    assert process_relay_transfers(downward._replace(vksm_balance=2999), report) == (1000, False)
+    assert validate_report(report._replace(stash_balance=10**6), downward._replace(vksm_balance=2999), 10000, 3000) is None
+
+    # upward transfer is completed when relay free balance grows by the transferred amount
+    upward = state._replace(transfer_upward_balance=500)
+    assert process_relay_transfers(upward, report._replace(stash_balance=1499)) == (1000, False)
+    assert process_relay_transfers(upward, report._replace(stash_balance=1500)) == (1500, True)
+
+
+async def validate_reports(oracle_master, era_id, reports):
+    async with aiohttp.ClientSession() as session:
+        validator = ReportValidator(OracleMasterClient(JsonRpc(session, web3.provider.endpoint_uri), oracle_master.address))
+        return await validator.validate(era_id, reports)
+
+
+def test_report_validation_matches_ledger(lido, oracle_master, vKSM, Ledger, accounts, chain):
+    distribute_initial_tokens(vKSM, lido, accounts)
+    relay = RelayChain(lido, vKSM, oracle_master, accounts, chain)
+    relay.new_ledger("0x10", "0x11")
+    lido.deposit(20 * 10**18, {'from': accounts[0]})
+    # deposit is bonded and upward transfer is completed
+    relay.new_era()
+    relay.new_era()
+
+    oracle_master.addOracleMember(accounts[2], {'from': accounts[0]})
+    chain.sleep(6 * 60 * 60)
+    era = relay.era + 1
+    report = OracleData(*relay.ledgers[0].get_report_data())
+    report = report._replace(stash_account=to_bytes(report.stash_account), controller_account=to_bytes(report.controller_account))
+    reward = report.stash_balance
+    doomed = report._replace(stash_balance=report.stash_balance + reward, active_balance=report.active_balance + reward, total_balance=report.total_balance + reward)
+    inconsistent = report._replace(total_balance=report.total_balance + 1)
+
+    errors = asyncio.run(validate_reports(oracle_master, era, [report, doomed, inconsistent]))
+    assert errors == [None, 'LEDGER: DIFFERENCE_EXCEEDS_BALANCE', 'OM: INCORRECT_REPORT']
+
+    oracle_master.reportRelay(era, tuple(doomed), {'from': accounts[0]})
+    with reverts(errors[1]):
+        oracle_master.reportRelay(era, tuple(doomed), {'from': accounts[1]})
+    with reverts(errors[2]):
+        oracle_master.reportRelay(era, tuple(inconsistent), {'from': accounts[1]})
+
+    # the era is still pushed by the valid report
+    oracle_master.reportRelay(era, tuple(report), {'from': accounts[1]})
+    oracle_master.reportRelay(era, tuple(report), {'from': accounts[2]})
+    assert Ledger.at(lido.findLedger(report.stash_account)).cachedTotalBalance() == report.stash_balance
@@ -0,0 +1,44 @@
+import pytest
+
+
+def scale_compact(value):
+    if value < 1 << 6:
+        return (value << 2).to_bytes(1, 'little')
+    if value < 1 << 14:
+        return ((value << 2) | 1).to_bytes(2, 'little')
+    if value < 1 << 30:
+        return ((value << 2) | 2).to_bytes(4, 'little')
+    length = (value.bit_length() + 7) // 8
+    return bytes([((length - 4) << 2) + 3]) + value.to_bytes(length, 'little')
+
+
+def nominate_call(nominees):
+    # the same encoding as IRelayEncoder precompile: chain byte, call index, compact length, MultiAddress::Id list
+    return bytes.fromhex('0605') + scale_compact(len(nominees)) + b''.join(b'\x00' + n.to_bytes(32, 'big') for n in nominees)
+
+
+@pytest.fixture(scope="module")
+def encoder(RelayEncoder, accounts):
+    return RelayEncoder.deploy("0x06", {'from': accounts[0]})
+
+
+def test_scale_compact(encoder):
+    values = [0, 1, 63, 64, 2**14 - 1, 2**14, 2**30 - 1, 2**30, 2**32, 10**18, 2**128, 2**256 - 1]
+    for value in values:
+        assert encoder.encode_bond_extra(value) == '0x0601' + scale_compact(value).hex()
+
+
+def test_encode_nominate(encoder):
+    for count in [0, 1, 16, 24, 64, 65]:
+        nominees = [2**256 - 1 - i if i % 2 else i + 1 for i in range(count)]
+        assert encoder.encode_nominate(nominees) == '0x' + nominate_call(nominees).hex()
+
+
+def test_encode_nominate_gas(encoder):
+    gas = {count: encoder.encode_nominate.estimate_gas([2**255 + i for i in range(count)]) for count in [1, 16, 24]}
+    print(f'encode_nominate: {gas}')
+    # buffer isn't copied on every nominee, so the cost of nominee doesn't grow with their count
+    per_nominee = (gas[16] - gas[1]) / 15
+    assert (gas[24] - gas[16]) / 8 < per_nominee * 1.1
+    # calldata and the returned word dominate the cost of nominee
+    assert per_nominee < 1_500
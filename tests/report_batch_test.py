@@ -0,0 +1,76 @@
+import pytest
+from brownie import reverts
+
+from helpers import idle_report, ledger_stashes, add_ledgers, setup_members
+
+
+def test_report_relay_batch(lido, oracle_master, accounts, chain):
+    stashes = add_ledgers(lido, ledger_stashes(3), accounts)
+    setup_members(oracle_master, accounts, 3, 2, first=0)
+    chain.sleep(6 * 60 * 60)
+
+    reports = [idle_report(stash) for stash in stashes]
+    oracle_master.reportRelayBatch(1, reports, {'from': accounts[0]})
+    assert oracle_master.eraId() == 1
+    assert oracle_master.getReportedStatus(accounts[0])[2] == [True] * 3
+    assert oracle_master.getReportVariants()[1] == [False] * 3
+
+    # the second member reaches quorum for two ledgers, the third one gets another variant
+    oracle_master.reportRelayBatch(1, reports[:2] + [idle_report(stashes[2], 1)], {'from': accounts[1]})
+    assert oracle_master.getReportVariants()[1] == [True, True, False]
+
+    # batch and single reports are interchangeable
+    oracle_master.reportRelay(1, reports[2], {'from': accounts[2]})
+    assert oracle_master.getReportVariants()[1] == [True] * 3
+
+
+def test_report_relay_batch_checks(lido, oracle_master, accounts, chain):
+    stashes = add_ledgers(lido, ledger_stashes(2), accounts)
+    setup_members(oracle_master, accounts, 2, 2, first=0)
+    chain.sleep(6 * 60 * 60)
+    reports = [idle_report(stash) for stash in stashes]
+
+    with reverts("OM: MEMBER_NOT_FOUND"):
+        oracle_master.reportRelayBatch(1, reports, {'from': accounts[5]})
+    with reverts("OM: UNEXPECTED_NEW_ERA"):
+        oracle_master.reportRelayBatch(2, reports, {'from': accounts[0]})
+    with reverts("OM: ORACLE_FOR_LEDGER_NOT_FOUND"):
+        oracle_master.reportRelayBatch(1, reports + [idle_report("0x99")], {'from': accounts[0]})
+    # total balance doesn't match active balance
+    with reverts("OM: INCORRECT_REPORT"):
+        oracle_master.reportRelayBatch(1, [reports[0], (stashes[1], stashes[1], 0, 0, 1, [], [], 1, 0)], {'from': accounts[0]})
+    with reverts("ORACLE: ALREADY_SUBMITTED"):
+        oracle_master.reportRelayBatch(1, [reports[0], reports[0]], {'from': accounts[0]})
+
+    # failed batches don't change reporting state
+    assert oracle_master.eraId() == 0
+    oracle_master.reportRelayBatch(1, reports, {'from': accounts[0]})
+    with reverts("ORACLE: ALREADY_SUBMITTED"):
+        oracle_master.reportRelay(1, reports[1], {'from': accounts[0]})
+
+    chain.sleep(6 * 60 * 60)
+    oracle_master.reportRelayBatch(2, reports[:1], {'from': accounts[1]})
+    with reverts("OM: ERA_TOO_OLD"):
+        oracle_master.reportRelayBatch(1, reports[1:], {'from': accounts[1]})
+
+
+@pytest.mark.parametrize('ledgers', [10, 50, 100])
+def test_report_relay_batch_gas(lido, oracle_master, accounts, chain, ledgers):
+    stashes = add_ledgers(lido, ledger_stashes(ledgers), accounts)
+    # quorum isn't reached, so both modes measure the same vote path: existing variant counter increment
+    setup_members(oracle_master, accounts, 3, 3, first=0)
+    reports = [idle_report(stash) for stash in stashes]
+
+    chain.sleep(6 * 60 * 60)
+    for report in reports:
+        oracle_master.reportRelay(1, report, {'from': accounts[0]})
+    single_gas = sum(oracle_master.reportRelay(1, report, {'from': accounts[1]}).gas_used for report in reports)
+
+    chain.sleep(6 * 60 * 60)
+    for report in reports:
+        oracle_master.reportRelay(2, report, {'from': accounts[0]})
+    batch_gas = oracle_master.reportRelayBatch(2, reports, {'from': accounts[1]}).gas_used
+
+    print(f'{ledgers} ledgers: reportRelay x{ledgers} {single_gas} gas, reportRelayBatch {batch_gas} gas ({batch_gas * 100 // single_gas}%)')
+    assert batch_gas < single_gas
+    assert oracle_master.getReportedStatus(accounts[1])[2] == [True] * ledgers
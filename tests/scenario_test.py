@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.parametrize('scenario', ['small', 'large'], indirect=True)
+def test_scenario_state(scenario):
+    lido = scenario.lido
+    relay = scenario.relay
+
+    assert len(lido.getLedgerAddresses()) == scenario.params['ledgers']
+    assert len(relay.ledgers) == scenario.params['ledgers']
+    assert relay.era == scenario.params['eras']
+    assert scenario.oracle_master.eraId() == relay.era
+
+    for ledger in relay.ledgers[:5]:
+        assert lido.findLedger(ledger.stash_account) == ledger.ledger_address
+
+
+@pytest.mark.parametrize('scenario', ['small', 'large'], indirect=True)
+def test_scenario_continue(scenario):
+    lido = scenario.lido
+    relay = scenario.relay
+    holder = scenario.holders[0]
+
+    deposit = 10 * 10**18
+    pooled = lido.getTotalPooledKSM()
+    lido.deposit(deposit, {'from': holder})
+    relay.new_era()
+    relay.new_era()
+
+    assert lido.getTotalPooledKSM() == pooled + deposit
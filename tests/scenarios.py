@@ -0,0 +1,115 @@
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from brownie import network, chain, accounts, web3
+from brownie import Lido, OracleMaster, Withdrawal, vKSM_mock, Controller_mock
+from brownie._config import CONFIG
+
+from helpers import RelayChain
+
+
+# prebuilt scenarios are stored in the project root, see scripts/build_scenario.py
+SCENARIOS_DIR = Path(__file__).resolve().parent.parent / "scenarios"
+
+MANIFEST = "manifest.json"
+CHAIN_DB = "chain"
+
+
+def scenario_path(name):
+    return SCENARIOS_DIR / name
+
+
+def is_built(name):
+    return (scenario_path(name) / MANIFEST).is_file()
+
+
+def holder_account(name, index):
+    # holders keys are derived from scenario name, so they are not stored on disk
+    return accounts.add(web3.keccak(text=f"{name}:holder:{index}").hex())
+
+
+def relaunch_rpc(db_path=None):
+    '''
+    Restart local ganache, if `db_path` is set chain data is persisted in (or loaded from) that directory
+    '''
+    settings = CONFIG.active_network
+    cmd = settings['cmd']
+    if db_path is not None:
+        cmd += f" --db {db_path}"
+
+    network.rpc.kill(False)
+    network.rpc.launch(cmd, **settings['cmd_settings'])
+
+
+def save_scenario(name, params, contracts, relay, holders):
+    path = scenario_path(name)
+    # make sure that all state is written to chain database
+    chain.mine()
+
+    manifest = {
+        'name': name,
+        'params': params,
+        'contracts': {key: str(value) for key, value in contracts.items()},
+        'holders': holders,
+        'time': chain.time(),
+        'height': chain.height,
+        'relay': relay.dump_state(),
+    }
+    with open(path / MANIFEST, 'w') as file:
+        json.dump(manifest, file, indent=2)
+
+
+class Scenario:
+    name = None
+    params = None
+    lido = None
+    vKSM = None
+    oracle_master = None
+    withdrawal = None
+    controller = None
+    holders = None
+    relay = None
+
+    _db_copy = None
+
+    def __init__(self, name):
+        path = scenario_path(name)
+        with open(path / MANIFEST) as file:
+            manifest = json.load(file)
+
+        # chain database is mutated by ganache, so always work with a copy
+        self._db_copy = tempfile.mkdtemp(prefix=f"scenario-{name}-")
+        shutil.copytree(path / CHAIN_DB, self._db_copy, dirs_exist_ok=True)
+        relaunch_rpc(self._db_copy)
+
+        assert chain.height >= manifest['height'], "chain database is outdated, rebuild scenario"
+        # ganache doesn't persist time offset, move clock to the last scenario block
+        if manifest['time'] > chain.time():
+            chain.sleep(manifest['time'] - chain.time())
+            chain.mine()
+
+        contracts = manifest['contracts']
+        self.name = name
+        self.params = manifest['params']
+        self.lido = Lido.at(contracts['lido'])
+        self.vKSM = vKSM_mock.at(contracts['vKSM'])
+        self.oracle_master = OracleMaster.at(contracts['oracle_master'])
+        self.withdrawal = Withdrawal.at(contracts['withdrawal'])
+        self.controller = Controller_mock.at(contracts['controller'])
+        self.holders = [holder_account(name, i) for i in range(manifest['holders'])]
+        self.relay = RelayChain.restore(
+            self.lido, self.vKSM, self.oracle_master, accounts, chain, manifest['relay']
+        )
+
+    def close(self):
+        relaunch_rpc()
+        shutil.rmtree(self._db_copy, ignore_errors=True)
+
+
+def load_scenario(name):
+    '''
+    Load prebuilt scenario chain state and linked RelayChain state
+    '''
+    return Scenario(name)
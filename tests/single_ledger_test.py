@@ -640,8 +640,11 @@ def test_soften_quorum(lido, oracle_master, vKSM, accounts):
 
     assert ledger_1.free_balance == 0
 
-    tx = oracle_master.setQuorum(2, {'from': accounts[0]})
+    oracle_master.setQuorum(2, {'from': accounts[0]})
+    assert ledger_1.free_balance == 0
 
+    # oracle keeps only report hash, report which got quorum is submitted again
+    tx = oracle_master.pushQuorumReport(ledger_1.get_report_data(), {'from': accounts[0]})
     relay._after_report(tx)
 
     assert ledger_1.free_balance == deposit
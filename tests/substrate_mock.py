@@ -0,0 +1,133 @@
+import hashlib
+
+from aiohttp import web
+
+from scripts.oracle import relay
+
+
+def encode_uint(value, size):
+    return value.to_bytes(size, 'little')
+
+
+def encode_compact(value):
+    if value < 1 << 6:
+        return encode_uint(value << 2, 1)
+    elif value < 1 << 14:
+        return encode_uint(value << 2 | 0b01, 2)
+    elif value < 1 << 30:
+        return encode_uint(value << 2 | 0b10, 4)
+    length = (value.bit_length() + 7) // 8
+    return encode_uint((length - 4) << 2 | 0b11, 1) + encode_uint(value, length)
+
+
+def encode_vec(items, encode_item):
+    return encode_compact(len(items)) + b''.join(encode_item(item) for item in items)
+
+
+class SubstrateMock:
+    '''
+    Substrate JSON-RPC server with in-memory storage, every `new_block` snapshots the storage
+    '''
+    storage = None
+    blocks = None
+    requests = None
+    url = None
+
+    def __init__(self):
+        self.storage = {}
+        self.blocks = []
+        self.requests = []
+        self._runner = None
+        self.new_block()
+
+    @property
+    def head(self):
+        return self.blocks[-1][0]
+
+    def new_block(self):
+        number = len(self.blocks)
+        block_hash = '0x' + hashlib.blake2b(encode_uint(number, 4), digest_size=32).hexdigest()
+        self.blocks.append((block_hash, dict(self.storage)))
+        return block_hash
+
+    def set_active_era(self, era):
+        self.storage[relay.active_era_key()] = encode_uint(era, 4) + b'\x00'
+
+    def set_account(self, stash, free, reserved=0):
+        self.storage[relay.account_key(stash)] = (
+            encode_uint(0, 4) * 4 + encode_uint(free, 16) + encode_uint(reserved, 16) + encode_uint(0, 16) * 2
+        )
+
+    def set_ledger(self, stash, controller, active, unlocking=[], claimed_rewards=[]):
+        total = active + sum(value for (value, _) in unlocking)
+        self.storage[relay.bonded_key(stash)] = controller
+        self.storage[relay.ledger_key(controller)] = (
+            stash + encode_compact(total) + encode_compact(active)
+            + encode_vec(unlocking, lambda chunk: encode_compact(chunk[0]) + encode_compact(chunk[1]))
+            + encode_vec(claimed_rewards, lambda era: encode_uint(era, 4))
+        )
+
+    def set_nominator(self, stash, targets, submitted_in=0):
+        self.storage[relay.nominators_key(stash)] = (
+            encode_vec(targets, lambda target: target) + encode_uint(submitted_in, 4) + b'\x00'
+        )
+
+    def set_validator(self, stash, commission=0):
+        self.storage[relay.validators_key(stash)] = encode_compact(commission) + b'\x00'
+
+    def set_slashing_spans(self, stash, prior):
+        self.storage[relay.slashing_spans_key(stash)] = encode_uint(0, 4) * 3 + encode_vec(prior, lambda era: encode_uint(era, 4))
+
+    def _block_storage(self, block_hash):
+        for (hash, storage) in self.blocks:
+            if hash == block_hash or block_hash is None and hash == self.head:
+                return storage
+        raise ValueError(f"unknown block {block_hash}")
+
+    def _value(self, storage, key):
+        value = storage.get(bytes.fromhex(key[2:]))
+        return '0x' + value.hex() if value is not None else None
+
+    def _handle(self, method, params):
+        if method == 'chain_getFinalizedHead':
+            return self.head
+        elif method == 'chain_getBlockHash':
+            return self.blocks[params[0]][0] if params and params[0] is not None else self.head
+        elif method == 'chain_getHeader':
+            block_hash = params[0] if params and params[0] is not None else self.head
+            return {'number': hex([hash for (hash, _) in self.blocks].index(block_hash))}
+        elif method == 'state_getStorage':
+            return self._value(self._block_storage(params[1] if len(params) > 1 else None), params[0])
+        elif method == 'state_queryStorageAt':
+            block_hash = params[1] if len(params) > 1 and params[1] is not None else self.head
+            storage = self._block_storage(block_hash)
+            return [{'block': block_hash, 'changes': [[key, self._value(storage, key)] for key in params[0]]}]
+        raise ValueError(f"unsupported method {method}")
+
+    def _response(self, request):
+        try:
+            result = self._handle(request['method'], request.get('params', []))
+            return {'jsonrpc': '2.0', 'id': request['id'], 'result': result}
+        except ValueError as e:
+            return {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': str(e)}}
+
+    async def _rpc(self, http_request):
+        payload = await http_request.json()
+        self.requests.append(payload)
+        if isinstance(payload, list):
+            return web.json_response([self._response(request) for request in payload])
+        return web.json_response(self._response(payload))
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post('/', self._rpc)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}/"
+        return self.url
+
+    async def stop(self):
+        await self._runner.cleanup()
@@ -0,0 +1,178 @@
+from brownie import chain, reverts, web3
+from helpers import RelayChain, RelayLedger, distribute_initial_tokens
+from scripts.upgrade import upgrade_lido, upgrade_oracle_master
+
+
+class RelayChainV1(RelayChain):
+    '''
+    Relay chain mock for contracts deployed before the upgrade, they have no batched methods
+    '''
+    def new_ledgers(self, stash_accounts, controller_accounts, batch_size=None):
+        for (stash, controller) in zip(stash_accounts, controller_accounts):
+            tx = self.lido.addLedger(stash, controller, 0, {'from': self.accounts[0]})
+            self.ledgers.append(RelayLedger(self, tx.events['LedgerAdd']['addr'], stash, controller))
+
+    def _send_reports(self, member, reports):
+        for report in reports:
+            tx = self.oracle_master.reportRelay(self.era, report, {'from': member})
+            self._after_report(tx)
+
+
+def pending_downward(container, ledgers):
+    return [container.at(ledger).transferDownwardBalance() for ledger in ledgers]
+
+
+def test_upgrade_lido(lido_v1, proxy_admin, auth_manager, Lido, LidoV1, Ledger, LedgerV1, LedgerBeacon, OracleMasterV1, vKSM, accounts):
+    oracle_master = OracleMasterV1.at(lido_v1.ORACLE_MASTER())
+    distribute_initial_tokens(vKSM, lido_v1, accounts)
+    relay = RelayChainV1(lido_v1, vKSM, oracle_master, accounts, chain)
+    stashes = ['0x10', '0x20', '0x30', '0x40']
+    relay.new_ledgers(stashes, [hex(int(stash, 16) + 1) for stash in stashes])
+    ledgers = lido_v1.getLedgerAddresses()
+
+    relay.deposit(accounts[0], 40 * 10**18)
+    relay.new_era()
+    relay.new_era()
+    relay.new_era([10**17])
+
+    # unbonded funds come back with downward transfer, the upgrade happens while it is in progress
+    relay.redeem(accounts[0], 8 * 10**18)
+    relay.new_era()
+    relay.timetravel(28)
+    for _ in range(3):
+        relay.new_era()
+        if any(pending_downward(LedgerV1, ledgers)):
+            break
+    pending = pending_downward(LedgerV1, ledgers)
+    assert any(pending)
+
+    lido_v1.disableLedger(ledgers[2], {'from': accounts[0]})
+    lido_v1.emergencyPauseLedger(ledgers[3], {'from': accounts[0]})
+    order = lido_v1.getLedgerAddresses()
+    stakes = [lido_v1.ledgerStake(ledger) for ledger in ledgers]
+    borrows = [lido_v1.ledgerBorrow(ledger) for ledger in ledgers]
+    assert all(stakes) and all(borrows)
+
+    lido_impl = Lido.deploy({'from': accounts[0]})
+    ledger_impl = Ledger.deploy({'from': accounts[0]})
+    beacon = LedgerBeacon.at(lido_v1.LEDGER_BEACON())
+    # migration reverts the whole upgrade if ledgers can't be switched to the new implementation
+    with reverts("LEDGER_BEACON: UNAUTHOROZED"):
+        proxy_admin.upgradeAndCall(lido_v1, lido_impl, lido_impl.migrateLedgers.encode_input(2), {'from': accounts[0]})
+    assert lido_v1.ledgerStake(ledgers[0]) == stakes[0]
+
+    upgrade_lido(proxy_admin, lido_v1, lido_impl, ledger_impl, auth_manager, accounts[0], accounts[0], accounts[0])
+    LidoV1.remove(lido_v1)
+    lido = Lido.at(lido_v1.address)
+    relay.lido = lido
+
+    assert lido.storageVersion() == 1
+    assert beacon.currentRevision() == 2
+    assert not auth_manager.has(web3.keccak(text='ROLE_BEACON_MANAGER'), lido)
+    # VKSM getter is missing in the previous ledger implementation
+    assert [Ledger.at(ledger).VKSM() for ledger in ledgers] == [vKSM] * len(ledgers)
+    assert lido.getLedgerAddresses() == order
+    assert [lido.ledgerStake(ledger) for ledger in ledgers] == stakes
+    assert [lido.ledgerBorrow(ledger) for ledger in ledgers] == borrows
+    assert [lido.ledgerPendingDownward(ledger) for ledger in ledgers] == pending
+    (_, total, page) = lido.getLedgers(0, len(ledgers))
+    assert total == len(ledgers)
+    assert {info[0]: (info[1], info[4]) for info in page} == {
+        ledgers[0]: ('0x' + '10'.rjust(64, '0'), 3),
+        ledgers[1]: ('0x' + '20'.rjust(64, '0'), 3),
+        ledgers[2]: ('0x' + '30'.rjust(64, '0'), 1),
+        ledgers[3]: ('0x' + '40'.rjust(64, '0'), 5),
+    }
+
+    # migration runs once and only in the upgrade transaction
+    with reverts("LIDO: ALREADY_MIGRATED"):
+        proxy_admin.upgradeAndCall(lido, lido_impl, lido_impl.migrateLedgers.encode_input(3), {'from': accounts[0]})
+    with reverts("LIDO: NOT_PROXY_ADMIN"):
+        lido.migrateLedgers(3, {'from': accounts[0]})
+
+    # ledgers callbacks work with migrated registry, downward transfers are completed
+    relay.new_era()
+    assert pending_downward(Ledger, ledgers) == [0] * len(ledgers)
+    assert [lido.ledgerPendingDownward(ledger) for ledger in ledgers] == [0] * len(ledgers)
+
+    with reverts("LIDO: LEDGER_NOT_PAUSED"):
+        lido.resumeLedger(ledgers[2], {'from': accounts[0]})
+    lido.resumeLedger(ledgers[3], {'from': accounts[0]})
+
+    # new downward transfers are reported by ledgers
+    relay.redeem(accounts[0], 8 * 10**18)
+    relay.new_era()
+    relay.timetravel(28)
+    for _ in range(3):
+        relay.new_era()
+        assert [lido.ledgerPendingDownward(ledger) for ledger in ledgers] == pending_downward(Ledger, ledgers)
+
+
+def test_upgrade_oracle_master(lido_v1, proxy_admin, Oracle, OracleMaster, OracleMasterV1, vKSM, accounts):
+    oracle_master = OracleMasterV1.at(lido_v1.ORACLE_MASTER())
+    distribute_initial_tokens(vKSM, lido_v1, accounts)
+    relay = RelayChainV1(lido_v1, vKSM, oracle_master, accounts, chain)
+    oracle_master.addOracleMember(accounts[2], {'from': accounts[0]})
+    relay.new_ledgers(['0x10', '0x20'], ['0x11', '0x21'])
+    ledgers = lido_v1.getLedgerAddresses()
+
+    relay.deposit(accounts[0], 20 * 10**18)
+    relay.new_era()
+    relay.new_era()
+
+    # the upgrade happens in the middle of era: ledger 0 has one vote, ledger 1 is pushed
+    relay.era += 1
+    chain.sleep(6 * 60 * 60)
+    reports = [ledger.get_report_data() for ledger in relay.ledgers]
+    relay._after_report(oracle_master.reportRelay(relay.era, reports[0], {'from': accounts[0]}))
+    relay._after_report(oracle_master.reportRelay(relay.era, reports[1], {'from': accounts[0]}))
+    relay._after_report(oracle_master.reportRelay(relay.era, reports[1], {'from': accounts[1]}))
+    old_oracles = [oracle_master.getOracle(ledger) for ledger in ledgers]
+
+    oracle_master_impl = OracleMaster.deploy({'from': accounts[0]})
+    oracle_clone = Oracle.deploy({'from': accounts[0]})
+    upgrade_oracle_master(proxy_admin, oracle_master, oracle_master_impl, oracle_clone, accounts[0])
+    OracleMasterV1.remove(oracle_master)
+    oracle_master = OracleMaster.at(oracle_master.address)
+    relay.oracle_master = oracle_master
+
+    assert oracle_master.storageVersion() == 1
+    assert oracle_master.ORACLE_CLONE() == oracle_clone
+    oracles = [Oracle.at(oracle_master.getOracle(ledger)) for ledger in ledgers]
+    assert all(oracle.address not in old_oracles for oracle in oracles)
+    assert not oracles[0].isPushed()
+    assert not oracles[0].isReported(0)
+    assert oracles[1].isPushed()
+    assert oracles[1].reportingEra() == relay.era
+
+    # migration runs once and only in the upgrade transaction
+    with reverts("OM: ALREADY_MIGRATED"):
+        proxy_admin.upgradeAndCall(
+            oracle_master, oracle_master_impl, oracle_master_impl.migrateOracles.encode_input(oracle_clone), {'from': accounts[0]}
+        )
+    with reverts("OM: NOT_PROXY_ADMIN"):
+        oracle_master.migrateOracles(oracle_clone, {'from': accounts[0]})
+
+    # pushed era isn't pushed twice, dropped vote is reported again
+    tx = oracle_master.reportRelay(relay.era, reports[1], {'from': accounts[2]})
+    assert tx.events.count('Completed') == 0
+    relay._after_report(oracle_master.reportRelay(relay.era, reports[0], {'from': accounts[0]}))
+    tx = oracle_master.reportRelay(relay.era, reports[0], {'from': accounts[1]})
+    assert 'Completed' in tx.events
+    relay._after_report(tx)
+
+    # members are found by index of the previous version
+    relay.new_era()
+    oracle_master.reportRelay(relay.era, relay.ledgers[0].get_report_data(), {'from': accounts[2]})
+    assert oracles[0].isReported(2)
+    assert oracle_master.isReportedLastEra(accounts[2], '0x' + '10'.rjust(64, '0'))[1]
+
+
+def test_migrate_new_deployment(lido, oracle_master, proxy_admin, auth_manager, Lido, Ledger, accounts):
+    # new deployments are initialized with the current storage version
+    assert lido.storageVersion() == 1
+    assert oracle_master.storageVersion() == 1
+    lido_impl = Lido.deploy({'from': accounts[0]})
+    ledger_impl = Ledger.deploy({'from': accounts[0]})
+    with reverts("LIDO: ALREADY_MIGRATED"):
+        upgrade_lido(proxy_admin, lido, lido_impl, ledger_impl, auth_manager, accounts[0], accounts[0], accounts[0])
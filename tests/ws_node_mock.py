@@ -0,0 +1,97 @@
+import asyncio
+import itertools
+
+from aiohttp import web, WSMsgType
+
+
+class WsNodeMock:
+    '''
+    JSON-RPC websocket node: requests are answered by `handler(method, params)`, subscribe methods
+    return subscription id, `publish` pushes notification to all subscribers, `disconnect` drops connections
+    '''
+    SUBSCRIBE_METHODS = {
+        'state_subscribeStorage': 'state_storage',
+        'eth_subscribe': 'eth_subscription',
+    }
+
+    handler = None
+    url = None
+    # number of accepted connections
+    connections = 0
+
+    def __init__(self, handler=None, on_subscribe=None):
+        self.handler = handler
+        # (method, params) => initial notification results sent right after subscription
+        self.on_subscribe = on_subscribe
+        self.connections = 0
+        self._sockets = set()
+        self._subscriptions = {}
+        self._ids = itertools.count(1)
+        self._runner = None
+
+    async def publish(self, method, result):
+        for (subscription, (ws, subscribe_method)) in list(self._subscriptions.items()):
+            if subscribe_method == method and not ws.closed:
+                await self._notify(ws, method, subscription, result)
+
+    async def _notify(self, ws, method, subscription, result):
+        await ws.send_json({
+            'jsonrpc': '2.0',
+            'method': self.SUBSCRIBE_METHODS[method],
+            'params': {'subscription': subscription, 'result': result},
+        })
+
+    async def disconnect(self):
+        for ws in list(self._sockets):
+            await ws.close()
+        self._subscriptions.clear()
+
+    async def _response(self, ws, request):
+        (method, params) = (request['method'], request.get('params', []))
+        if method in self.SUBSCRIBE_METHODS:
+            subscription = hex(next(self._ids))
+            self._subscriptions[subscription] = (ws, method)
+            await ws.send_json({'jsonrpc': '2.0', 'id': request['id'], 'result': subscription})
+            for result in (self.on_subscribe(method, params) if self.on_subscribe is not None else []):
+                await self._notify(ws, method, subscription, result)
+            return
+        try:
+            response = {'jsonrpc': '2.0', 'id': request['id'], 'result': self.handler(method, params)}
+        except ValueError as e:
+            response = {'jsonrpc': '2.0', 'id': request['id'], 'error': {'code': -32601, 'message': str(e)}}
+        await ws.send_json(response)
+
+    async def _ws(self, http_request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(http_request)
+        self.connections += 1
+        self._sockets.add(ws)
+        try:
+            async for message in ws:
+                if message.type == WSMsgType.TEXT:
+                    await self._response(ws, message.json())
+        finally:
+            self._sockets.discard(ws)
+        return ws
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/', self._ws)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}/"
+        return self.url
+
+    async def stop(self):
+        await self.disconnect()
+        await self._runner.cleanup()
+
+    async def wait_connections(self, count, timeout=5):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while self.connections < count or len(self._subscriptions) == 0:
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f'{self.connections} connections')
+            await asyncio.sleep(0.01)